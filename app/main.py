@@ -8,9 +8,11 @@ from services.api_client import NeogridAPIClient
 from services.processador_pedido import ProcessadorPedido
 from services.processador_pedido_item import ProcessadorPedidoItem
 from services.validador_cliente import ValidadorCliente
-from services.validador_produto import ValidadorProduto
+from services.validador_produto import obter_validador_produto
 from utils.helpers import interpretar_codigo_produto
 from repositories.pedido_repository import PedidoRepository
+from repositories.gravador_pedidos import GravadorPedidosEmGrupo
+from config.settings import settings
 from models.pedido import Pedido
 from utils.error_handler import (
     NeogridError, ErrorHandler, ClienteNaoEncontradoError, 
@@ -34,8 +36,21 @@ def registrar_log(mensagem: str):
     """Registra mensagem no arquivo de log usando o novo sistema"""
     logger.info(mensagem)
 
-def processar_pedido_neogrid(doc, processador_pedido, repo, api_client=None):
-    """Processa um documento de pedido da Neogrid com tratamento robusto de erros"""
+def confirmar_documento_neogrid(api_client, doc_id):
+    """Marca o documento como recebido na Neogrid (falha apenas gera aviso)"""
+    try:
+        api_client.atualizar_status([{"docId": doc_id, "status": "true"}])
+        logger.debug(f"✅ Status atualizado na Neogrid para documento {doc_id}")
+    except APIError as e:
+        logger.warning(f"Falha ao atualizar status do documento {doc_id}: {e.message}")
+
+def processar_pedido_neogrid(doc, processador_pedido, repo, api_client=None, gravador=None, clientes=None):
+    """
+    Processa um documento de pedido da Neogrid com tratamento robusto de erros.
+    Com ``gravador`` (group commit) o pedido validado é apenas enfileirado e o
+    resultado da gravação chega depois pelo callback ``ao_concluir`` do gravador.
+    ``clientes`` são os clientes da página já validados em lote (``resolver_clientes_da_pagina``).
+    """
     doc_id = doc.get("docId", "N/A")
     start_time = time.time()
     
@@ -86,7 +101,7 @@ def processar_pedido_neogrid(doc, processador_pedido, repo, api_client=None):
         
         # Processar usando as classes de negócio
         logger.debug(f"⚙️ Executando processamento de regras de negócio", pedido_neogrid.numero_pedido)
-        pedido_final = processador_pedido.processar(pedido_para_processar)
+        pedido_final = processador_pedido.processar(pedido_para_processar, clientes)
         
         # Calcular tempo de processamento até aqui
         processing_time = time.time() - start_time
@@ -95,6 +110,11 @@ def processar_pedido_neogrid(doc, processador_pedido, repo, api_client=None):
             "itens": len(pedido_final.itens)
         })
         
+        if gravador is not None:
+            logger.debug(f"📥 Pedido enfileirado para gravação em grupo", pedido_final.num_pedido)
+            gravador.adicionar(pedido_final, doc_id)
+            return {"status": "enfileirado", "pedido": pedido_final.num_pedido, "doc_id": doc_id}
+
         # Gravar no banco
         logger.debug(f"💾 Iniciando gravação no banco", pedido_final.num_pedido)
         db_start_time = time.time()
@@ -125,11 +145,7 @@ def processar_pedido_neogrid(doc, processador_pedido, repo, api_client=None):
             repo.log_processamento("INFO", mensagem, pedido_final.num_pedido)
 
             if api_client:
-                try:
-                    api_client.atualizar_status([{"docId": doc_id, "status": "true"}])
-                    logger.debug(f"✅ Status atualizado na Neogrid para documento {doc_id}")
-                except APIError as e:
-                    logger.warning(f"Falha ao atualizar status do documento {doc_id}: {e.message}")
+                confirmar_documento_neogrid(api_client, doc_id)
 
             return {"status": "sucesso", "mensagem": mensagem, "pedido": pedido_final.num_pedido}
         else:
@@ -171,6 +187,59 @@ def processar_pedido_neogrid(doc, processador_pedido, repo, api_client=None):
         repo.log_processamento("ERROR", erro_msg, doc_id)
         return {"status": "erro", "mensagem": erro_msg, "doc_id": doc_id, "error_type": "inesperado"}
 
+def identificar_duplicados(documentos, repo) -> set:
+    """
+    Retorna os docIds da página que já foram gravados, com uma única
+    consulta ao banco, para que reenvios sejam descartados antes das
+    validações de cliente e produto. Documentos ilegíveis ficam de fora
+    e seguem o fluxo normal (que reporta o erro).
+    """
+    candidatos = {}
+    for doc in documentos:
+        try:
+            pedido_neogrid = Pedido(doc["content"][0])
+        except Exception:
+            continue
+        if pedido_neogrid.data_emissao:
+            candidatos[doc.get("docId")] = {
+                "num_pedido_afv": doc.get("docId"),
+                "data_pedido": pedido_neogrid.data_emissao.strftime("%Y-%m-%d"),
+            }
+
+    if not candidatos:
+        return set()
+
+    try:
+        existentes = repo.pedidos_existentes(candidatos.values())
+    except BancoDadosError as e:
+        # A verificação individual em inserir_pedido continua valendo
+        logger.warning(f"⚠️ Verificação de duplicidade em lote indisponível: {e.message}")
+        return set()
+
+    return {
+        doc_id for doc_id, candidato in candidatos.items()
+        if repo.chave_duplicidade(candidato) in existentes
+    }
+
+def resolver_clientes_da_pagina(documentos, processador_pedido, ignorar=()) -> dict:
+    """
+    Valida os clientes de todos os documentos da página com uma consulta
+    ao SA1010 por bloco de CNPJs, em vez de uma por pedido. Documentos em
+    ``ignorar`` (duplicados já conhecidos) e ilegíveis ficam de fora.
+    """
+    cnpjs = []
+    for doc in documentos:
+        if doc.get("docId") in ignorar:
+            continue
+        try:
+            cnpjs.append(Pedido(doc["content"][0]).cnpj_destino)
+        except Exception:
+            continue
+
+    if not cnpjs:
+        return {}
+    return processador_pedido.resolver_clientes(cnpjs)
+
 # Função para carregar CSS externo
 def load_totvs_css():
     """Carrega o CSS customizado da TOTVS a partir de arquivo externo"""
@@ -291,7 +360,6 @@ with st.sidebar:
             # Testar Banco
             try:
                 from services.database import Database
-                from config.settings import settings
                 db = Database(settings.DB_NAME_PROTHEUS)
                 banco_ok = db.test_connection()
                 if banco_ok:
@@ -332,7 +400,11 @@ with st.sidebar:
                 st.success(f"✅ Debug exportado: {filepath}")
             else:
                 st.error("❌ Erro ao exportar debug")
-    
+
+        if st.button("🔌 Métricas do Pool de Conexões"):
+            from services.database import Database
+            st.json(Database(settings.DB_NAME_PROTHEUS).obter_metricas_pool())
+
     # Status do sistema
     status_sistema = "🟢 Online"
     st.markdown(f"""
@@ -410,7 +482,7 @@ with col1:
                 # Inicializar serviços
                 api = NeogridAPIClient()
                 validador_cliente = ValidadorCliente()
-                validador_produto = ValidadorProduto()
+                validador_produto = obter_validador_produto()
                 processador_item = ProcessadorPedidoItem(validador_produto)
                 processador_pedido = ProcessadorPedido(validador_cliente, processador_item)
                 
@@ -447,28 +519,60 @@ with col1:
                     detalhes_processamento = []
                     estatisticas_erro = {"cliente": 0, "produto": 0, "processamento": 0, "inesperado": 0}
                     
+                    def contabilizar(resultado):
+                        detalhes_processamento.append(resultado)
+                        if resultado["status"] == "sucesso":
+                            resultados["sucesso"] += 1
+                        elif resultado["status"] == "duplicado":
+                            resultados["duplicados"] += 1
+                        else:
+                            resultados["erros"] += 1
+                            # Contar tipos de erro
+                            error_type = resultado.get("error_type", "inesperado")
+                            if error_type in estatisticas_erro:
+                                estatisticas_erro[error_type] += 1
+
+                    def ao_gravar_grupo(resultado):
+                        if resultado["status"] == "sucesso" and resultado.get("doc_id"):
+                            confirmar_documento_neogrid(api, resultado["doc_id"])
+                        contabilizar(resultado)
+
                     with PedidoRepository() as repo:
+                        duplicados_conhecidos = identificar_duplicados(documentos, repo)
+                        clientes = resolver_clientes_da_pagina(documentos, processador_pedido, duplicados_conhecidos)
+                        gravador = None
+                        if settings.DB_GROUP_COMMIT_PEDIDOS > 0:
+                            gravador = GravadorPedidosEmGrupo(
+                                repo,
+                                tamanho_grupo=settings.DB_GROUP_COMMIT_PEDIDOS,
+                                intervalo_ms=settings.DB_GROUP_COMMIT_MS,
+                                ao_concluir=ao_gravar_grupo,
+                            )
+
                         for i, doc in enumerate(documentos):
                             status_placeholder.markdown(f'<div class="loading-text">⚙️ Processando documento {i+1} de {total_docs}...</div>', unsafe_allow_html=True)
                             
-                            resultado = processar_pedido_neogrid(doc, processador_pedido, repo, api)
-                            detalhes_processamento.append(resultado)
-                            
-                            # Contar resultados
-                            if resultado["status"] == "sucesso":
-                                resultados["sucesso"] += 1
-                            elif resultado["status"] == "duplicado":
-                                resultados["duplicados"] += 1
+                            doc_id = doc.get("docId", "N/A")
+                            if doc_id in duplicados_conhecidos:
+                                logger.log_pedido_duplicado(doc_id)
+                                resultado = {
+                                    "status": "duplicado",
+                                    "mensagem": f"⚠️ Documento {doc_id} já existia no banco",
+                                    "doc_id": doc_id,
+                                }
                             else:
-                                resultados["erros"] += 1
-                                # Contar tipos de erro
-                                error_type = resultado.get("error_type", "inesperado")
-                                if error_type in estatisticas_erro:
-                                    estatisticas_erro[error_type] += 1
+                                resultado = processar_pedido_neogrid(doc, processador_pedido, repo, api, gravador, clientes)
+
+                            # Pedidos enfileirados são contados quando o grupo for gravado
+                            if resultado["status"] != "enfileirado":
+                                contabilizar(resultado)
                             
                             # Atualizar progress bar
                             progress = 30 + (70 * (i + 1) / total_docs)
                             progress_bar.progress(int(progress))
+
+                        if gravador is not None:
+                            gravador.descarregar()
                     
                     # Etapa 4: Finalização
                     progress_bar.progress(100)
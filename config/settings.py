@@ -17,6 +17,69 @@ class Settings:
     DB_NAME_PROTHEUS = os.getenv("DB_NAME_PROTHEUS", "Protheus_Producao")
     DB_DRIVER = os.getenv("DB_DRIVER", "ODBC Driver 17 for SQL Server")
 
+    # Backend do banco: "sqlserver" (Protheus via ODBC) ou "sqlite" (banco local para testes de carga)
+    DB_BACKEND = os.getenv("DB_BACKEND", "sqlserver").lower()
+    DB_SQLITE_PATH = os.getenv("DB_SQLITE_PATH", "data/neogrid_local.db")
+    # Clientes sintéticos incluídos no SA1010 local além dos CNPJs dos pedidos de exemplo
+    DB_SQLITE_CLIENTES = int(os.getenv("DB_SQLITE_CLIENTES", "1000"))
+
+    # Pool de conexões compartilhado por repositórios e validadores
+    DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+    DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+    DB_POOL_IDLE_TIMEOUT = float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300"))
+    DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "1800"))
+    DB_POOL_CHECKOUT_TIMEOUT = float(os.getenv("DB_POOL_CHECKOUT_TIMEOUT", "30"))
+    # Conexões ociosas há mais que isso (segundos) são validadas no checkout
+    DB_HEALTH_CHECK_IDLE = float(os.getenv("DB_HEALTH_CHECK_IDLE", "30"))
+
+    # Inserção dos itens do pedido em lote via fast_executemany
+    DB_BULK_INSERT_ITENS = os.getenv("DB_BULK_INSERT_ITENS", "true").lower() in ("1", "true", "sim", "yes")
+
+    # Gravação do pedido: "python" (comandos individuais) ou "procedure" (SP_GRAVAR_PEDIDO_SOBEL)
+    DB_MODO_GRAVACAO = os.getenv("DB_MODO_GRAVACAO", "python").lower()
+
+    # Alocação de NUMITEM por faixas de uma SEQUENCE (vazio = MAX()+1 legado)
+    DB_NUMITEM_SEQUENCE = os.getenv("DB_NUMITEM_SEQUENCE", "dbo.SEQ_PEDIDOITEM_SOBEL_NUMITEM")
+    DB_NUMITEM_BLOCO = int(os.getenv("DB_NUMITEM_BLOCO", "500"))
+
+    # Group commit: pedidos por transaction (0 = um commit por pedido) e espera máxima em ms
+    DB_GROUP_COMMIT_PEDIDOS = int(os.getenv("DB_GROUP_COMMIT_PEDIDOS", "0"))
+    DB_GROUP_COMMIT_MS = float(os.getenv("DB_GROUP_COMMIT_MS", "500"))
+
+    # T_LOG_PROCESSAMENTO gravado em lote: registros por lote (1 = imediato) e intervalo em segundos
+    DB_LOG_LOTE = int(os.getenv("DB_LOG_LOTE", "50"))
+    DB_LOG_INTERVALO = float(os.getenv("DB_LOG_INTERVALO", "2"))
+    # Limite da fila de log e arquivo NDJSON com os registros que o banco não recebeu
+    DB_LOG_FILA_MAX = int(os.getenv("DB_LOG_FILA_MAX", "10000"))
+    DB_LOG_ARQUIVO_PENDENTES = os.getenv("DB_LOG_ARQUIVO_PENDENTES", "logs/log_processamento_pendente.ndjson")
+
+    # Cache de clientes (SA1010) do ValidadorCliente: entradas (0 = sem cache), TTL e TTL de "não encontrado"
+    CLIENTES_CACHE_MAX = int(os.getenv("CLIENTES_CACHE_MAX", "5000"))
+    CLIENTES_CACHE_TTL = float(os.getenv("CLIENTES_CACHE_TTL", "300"))
+    CLIENTES_CACHE_TTL_NEGATIVO = float(os.getenv("CLIENTES_CACHE_TTL_NEGATIVO", "60"))
+
+    # Cache de buscas do ValidadorProduto: entradas (0 = sem cache), TTL e TTL de "não encontrado"
+    PRODUTOS_CACHE_MAX = int(os.getenv("PRODUTOS_CACHE_MAX", "10000"))
+    PRODUTOS_CACHE_TTL = float(os.getenv("PRODUTOS_CACHE_TTL", "3600"))
+    PRODUTOS_CACHE_TTL_NEGATIVO = float(os.getenv("PRODUTOS_CACHE_TTL_NEGATIVO", "60"))
+    # Segundos entre verificações de data/produtos.json para recarga a quente (0 = desativado)
+    PRODUTOS_RECARGA_INTERVALO = float(os.getenv("PRODUTOS_RECARGA_INTERVALO", "30"))
+    # Camadas consultadas quando o produto não está no catálogo: snapshot local (arquivo SQLite; vazio = desativado) e SB1010
+    PRODUTOS_SNAPSHOT_PATH = os.getenv("PRODUTOS_SNAPSHOT_PATH", "")
+    PRODUTOS_CONSULTAR_SB1010 = os.getenv("PRODUTOS_CONSULTAR_SB1010", "false").lower() in ("1", "true", "sim", "yes")
+    # SKUs resolvidos nessas camadas: segundos de validade em memória e no snapshot (0 = sem expiração) e máximo em memória (0 = sem limite)
+    PRODUTOS_RESOLVIDOS_TTL = float(os.getenv("PRODUTOS_RESOLVIDOS_TTL", "86400"))
+    PRODUTOS_RESOLVIDOS_MAX = int(os.getenv("PRODUTOS_RESOLVIDOS_MAX", "10000"))
+
+    # Snapshot local do SA1010 (arquivo SQLite; vazio = desativado), coluna de timestamp do delta e intervalos
+    CLIENTES_SNAPSHOT_PATH = os.getenv("CLIENTES_SNAPSHOT_PATH", "")
+    CLIENTES_SNAPSHOT_MARCADOR = os.getenv("CLIENTES_SNAPSHOT_MARCADOR", "S_T_A_M_P_")
+    CLIENTES_SNAPSHOT_INTERVALO = float(os.getenv("CLIENTES_SNAPSHOT_INTERVALO", "300"))
+    CLIENTES_SNAPSHOT_COMPLETA_HORAS = float(os.getenv("CLIENTES_SNAPSHOT_COMPLETA_HORAS", "24"))
+
+    # Segundos que as estatísticas do painel (T_ESTATISTICA_PEDIDO_DIA) ficam em cache no processo
+    DB_ESTATISTICAS_TTL = float(os.getenv("DB_ESTATISTICAS_TTL", "30"))
+
     NEOGRID_USERNAME = os.getenv("NEOGRID_USERNAME", "NG#00000172168716111535")
     NEOGRID_PASSWORD = os.getenv("NEOGRID_PASSWORD", "SObel#24")
     NEOGRID_URL = os.getenv(
@@ -0,0 +1,39 @@
+-- Resumo diário de T_PEDIDO_SOBEL usado por PedidoRepository.get_estatisticas
+-- Database: Protheus_Producao
+--
+-- Uma linha por dia de gravação já encerrado (CAST(DATAGRAVACAOACACIA AS
+-- DATE)); pedidos sem DATAGRAVACAOACACIA ficam no dia 1900-01-01. O resumo
+-- é mantido fora da gravação de pedidos: PedidoRepository.consolidar_estatisticas
+-- acrescenta os dias encerrados (uma vez por dia, na leitura das
+-- estatísticas) e o dia atual é sempre contado direto em T_PEDIDO_SOBEL,
+-- por intervalo de DATAGRAVACAOACACIA (índice IX_PEDIDO_DATAGRAVACAO).
+--
+-- Alterações em dias já consolidados só entram no resumo reconstruindo-o:
+--   python scripts/backfill_estatisticas.py
+
+IF OBJECT_ID('dbo.T_ESTATISTICA_PEDIDO_DIA', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.T_ESTATISTICA_PEDIDO_DIA (
+        DATA DATE NOT NULL PRIMARY KEY,
+        QTDEPEDIDOS INT NOT NULL DEFAULT 0,
+        VALORBRUTO DECIMAL(18,2) NOT NULL DEFAULT 0,
+        DATAATUALIZACAO DATETIME NOT NULL DEFAULT GETDATE()
+    );
+
+    PRINT 'Tabela T_ESTATISTICA_PEDIDO_DIA criada com sucesso';
+END
+ELSE
+BEGIN
+    PRINT 'Tabela T_ESTATISTICA_PEDIDO_DIA já existe';
+END
+GO
+
+-- Dia atual e pedidos sem data contados por intervalo/igualdade em
+-- DATAGRAVACAOACACIA: com este índice a leitura percorre só as linhas de
+-- hoje (e as sem data), sem varrer T_PEDIDO_SOBEL
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_PEDIDO_DATAGRAVACAO' AND object_id = OBJECT_ID('dbo.T_PEDIDO_SOBEL'))
+BEGIN
+    CREATE INDEX IX_PEDIDO_DATAGRAVACAO ON dbo.T_PEDIDO_SOBEL (DATAGRAVACAOACACIA) INCLUDE (VALORBRUTO);
+    PRINT 'Índice IX_PEDIDO_DATAGRAVACAO criado';
+END
+GO
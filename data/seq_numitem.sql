@@ -0,0 +1,23 @@
+-- Sequência usada pelo alocador de NUMITEM em blocos (PedidoRepository)
+-- Database: Protheus_Producao
+--
+-- Substitui o SELECT MAX(NUMITEM)+1 WITH (TABLOCKX, HOLDLOCK): cada importador
+-- reserva faixas com sp_sequence_get_range sem travar T_PEDIDOITEM_SOBEL.
+-- A sequência começa após o maior NUMITEM existente. Importadores antigos
+-- (MAX()+1) não devem rodar em paralelo com os que usam a sequência.
+
+IF OBJECT_ID('dbo.SEQ_PEDIDOITEM_SOBEL_NUMITEM', 'SO') IS NULL
+BEGIN
+    DECLARE @inicio BIGINT = (SELECT ISNULL(MAX(NUMITEM), 0) + 1 FROM T_PEDIDOITEM_SOBEL);
+    DECLARE @sql NVARCHAR(400) =
+        N'CREATE SEQUENCE dbo.SEQ_PEDIDOITEM_SOBEL_NUMITEM AS BIGINT '
+        + N'START WITH ' + CAST(@inicio AS NVARCHAR(20))
+        + N' INCREMENT BY 1 NO CYCLE CACHE 1000';
+    EXEC sp_executesql @sql;
+
+    PRINT 'Sequência SEQ_PEDIDOITEM_SOBEL_NUMITEM criada com sucesso';
+END
+ELSE
+BEGIN
+    PRINT 'Sequência SEQ_PEDIDOITEM_SOBEL_NUMITEM já existe';
+END
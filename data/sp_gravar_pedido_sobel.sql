@@ -0,0 +1,176 @@
+-- Procedure de gravação do pedido em uma única chamada (DB_MODO_GRAVACAO=procedure)
+-- Database: Protheus_Producao
+--
+-- Recebe cabeçalho e itens em JSON (montado por PedidoRepository._payload_pedido_json):
+--   { "cabecalho": { "NUMPEDIDO": ..., "NUMPEDIDOAFV": ..., ... },
+--     "itens": [ { "CODIGOPRODUTO": ..., "QTDEVENDA": ..., ... }, ... ] }
+-- Verifica duplicidade, reserva os NUMITEMs (SEQUENCE quando informada, senão
+-- MAX()+1) e insere cabeçalho e itens na mesma transaction.
+-- Retorna uma linha: STATUS ('GRAVADO' | 'DUPLICADO'), QTDE_ITENS.
+-- Chamada dentro de uma transaction já aberta, usa savepoint próprio.
+
+IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'SP_GRAVAR_PEDIDO_SOBEL')
+    DROP PROCEDURE dbo.SP_GRAVAR_PEDIDO_SOBEL;
+GO
+
+CREATE PROCEDURE dbo.SP_GRAVAR_PEDIDO_SOBEL
+    @Pedido NVARCHAR(MAX),
+    @Sequencia NVARCHAR(256) = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    DECLARE @TranExterna INT = @@TRANCOUNT;
+    DECLARE @QtdeItens INT;
+    DECLARE @PrimeiroItem BIGINT;
+    DECLARE @Faixa SQL_VARIANT;
+
+    -- Cabeçalho
+    SELECT *
+    INTO #Cabecalho
+    FROM OPENJSON(@Pedido, '$.cabecalho') WITH (
+        NUMPEDIDO            BIGINT         '$.NUMPEDIDO',
+        NUMPEDIDOSOBEL       VARCHAR(50)    '$.NUMPEDIDOSOBEL',
+        LOJACLIENTE          VARCHAR(10)    '$.LOJACLIENTE',
+        NUMPEDIDOAFV         VARCHAR(100)   '$.NUMPEDIDOAFV',
+        DATAPEDIDO           DATETIME       '$.DATAPEDIDO',
+        HORAINICIAL          VARCHAR(10)    '$.HORAINICIAL',
+        HORAFINAL            VARCHAR(10)    '$.HORAFINAL',
+        DATAENTREGA          DATETIME       '$.DATAENTREGA',
+        CODIGOCLIENTE        VARCHAR(20)    '$.CODIGOCLIENTE',
+        CODIGOTIPOPEDIDO     VARCHAR(10)    '$.CODIGOTIPOPEDIDO',
+        CODIGOCONDPAGTO      VARCHAR(10)    '$.CODIGOCONDPAGTO',
+        CODIGONOMEENDERECO   VARCHAR(10)    '$.CODIGONOMEENDERECO',
+        CODIGOUNIDFAT        VARCHAR(10)    '$.CODIGOUNIDFAT',
+        CODIGOTABPRECO       VARCHAR(10)    '$.CODIGOTABPRECO',
+        ORDEMCOMPRA          VARCHAR(50)    '$.ORDEMCOMPRA',
+        OBSERVACAOI          VARCHAR(500)   '$.OBSERVACAOI',
+        OBSERVACAOII         VARCHAR(500)   '$.OBSERVACAOII',
+        VALORLIQUIDO         DECIMAL(15,2)  '$.VALORLIQUIDO',
+        VALORBRUTO           DECIMAL(15,2)  '$.VALORBRUTO',
+        CODIGOMOTIVOTIPOPED  VARCHAR(10)    '$.CODIGOMOTIVOTIPOPED',
+        CODIGOVENDEDORESP    VARCHAR(10)    '$.CODIGOVENDEDORESP',
+        CESP_DATAENTREGAFIM  DATETIME       '$.CESP_DATAENTREGAFIM',
+        CESP_NUMPEDIDOASSOC  VARCHAR(50)    '$.CESP_NUMPEDIDOASSOC',
+        DATAGRAVACAOACACIA   DATETIME       '$.DATAGRAVACAOACACIA',
+        DATAINTEGRACAOERP    DATETIME       '$.DATAINTEGRACAOERP',
+        QTDEITENS            INT            '$.QTDEITENS',
+        MSGIMPORTACAO        VARCHAR(500)   '$.MSGIMPORTACAO',
+        VOLUME               INT            '$.VOLUME'
+    );
+
+    -- Itens, na ordem do payload
+    SELECT
+        CAST([key] AS INT) AS ORDEM,
+        I.*
+    INTO #Itens
+    FROM OPENJSON(@Pedido, '$.itens') AS J
+    CROSS APPLY OPENJSON(J.[value]) WITH (
+        CODIGOPRODUTO        VARCHAR(30)    '$.CODIGOPRODUTO',
+        QTDEVENDA            DECIMAL(15,4)  '$.QTDEVENDA',
+        QTDEBONIFICADA       DECIMAL(15,4)  '$.QTDEBONIFICADA',
+        VALORVENDA           DECIMAL(15,2)  '$.VALORVENDA',
+        VALORBRUTO           DECIMAL(15,2)  '$.VALORBRUTO',
+        DESCONTOI            DECIMAL(15,2)  '$.DESCONTOI',
+        DESCONTOII           DECIMAL(15,2)  '$.DESCONTOII',
+        VALORVERBA           DECIMAL(15,2)  '$.VALORVERBA',
+        CODIGOVENDEDORESP    VARCHAR(10)    '$.CODIGOVENDEDORESP',
+        MSGIMPORTACAO        VARCHAR(500)   '$.MSGIMPORTACAO'
+    ) AS I;
+
+    SET @QtdeItens = (SELECT COUNT(*) FROM #Itens);
+
+    BEGIN TRY
+        IF @TranExterna = 0
+            BEGIN TRANSACTION;
+        ELSE
+            SAVE TRANSACTION SP_GRAVAR_PEDIDO;
+
+        -- Duplicidade pela mesma chave de PedidoRepository.pedido_existe
+        IF EXISTS (
+            SELECT 1
+            FROM T_PEDIDO_SOBEL P WITH (UPDLOCK, HOLDLOCK)
+            INNER JOIN #Cabecalho C
+                ON P.NUMPEDIDOAFV = C.NUMPEDIDOAFV
+               AND P.DATAPEDIDO = C.DATAPEDIDO
+               AND P.HORAINICIAL = C.HORAINICIAL
+               AND P.CODIGOCLIENTE = C.CODIGOCLIENTE
+        )
+        BEGIN
+            IF @TranExterna = 0
+                COMMIT TRANSACTION;
+            SELECT 'DUPLICADO' AS STATUS, 0 AS QTDE_ITENS;
+            RETURN;
+        END
+
+        -- Reserva dos NUMITEMs
+        IF @QtdeItens > 0
+        BEGIN
+            IF @Sequencia IS NOT NULL AND OBJECT_ID(@Sequencia, 'SO') IS NOT NULL
+            BEGIN
+                EXEC sys.sp_sequence_get_range
+                    @sequence_name = @Sequencia,
+                    @range_size = @QtdeItens,
+                    @range_first_value = @Faixa OUTPUT;
+                SET @PrimeiroItem = CAST(@Faixa AS BIGINT);
+            END
+            ELSE
+            BEGIN
+                SELECT @PrimeiroItem = ISNULL(MAX(NUMITEM), 0) + 1
+                FROM T_PEDIDOITEM_SOBEL WITH (TABLOCKX, HOLDLOCK);
+            END
+        END
+
+        INSERT INTO T_PEDIDO_SOBEL (
+            NUMPEDIDO, NUMPEDIDOSOBEL, LOJACLIENTE, NUMPEDIDOAFV, DATAPEDIDO,
+            HORAINICIAL, HORAFINAL, DATAENTREGA, CODIGOCLIENTE, CODIGOTIPOPEDIDO,
+            CODIGOCONDPAGTO, CODIGONOMEENDERECO, CODIGOUNIDFAT, CODIGOTABPRECO,
+            ORDEMCOMPRA, OBSERVACAOI, OBSERVACAOII, VALORLIQUIDO, VALORBRUTO,
+            CODIGOMOTIVOTIPOPED, CODIGOVENDEDORESP, CESP_DATAENTREGAFIM,
+            CESP_NUMPEDIDOASSOC, DATAGRAVACAOACACIA, DATAINTEGRACAOERP, QTDEITENS,
+            MSGIMPORTACAO, VOLUME
+        )
+        SELECT
+            NUMPEDIDO, NUMPEDIDOSOBEL, LOJACLIENTE, NUMPEDIDOAFV, DATAPEDIDO,
+            HORAINICIAL, HORAFINAL, DATAENTREGA, CODIGOCLIENTE, CODIGOTIPOPEDIDO,
+            CODIGOCONDPAGTO, CODIGONOMEENDERECO, CODIGOUNIDFAT, CODIGOTABPRECO,
+            ORDEMCOMPRA, OBSERVACAOI, OBSERVACAOII, VALORLIQUIDO, VALORBRUTO,
+            CODIGOMOTIVOTIPOPED, CODIGOVENDEDORESP, CESP_DATAENTREGAFIM,
+            CESP_NUMPEDIDOASSOC, DATAGRAVACAOACACIA, DATAINTEGRACAOERP, QTDEITENS,
+            MSGIMPORTACAO, VOLUME
+        FROM #Cabecalho;
+
+        INSERT INTO T_PEDIDOITEM_SOBEL (
+            NUMPEDIDO, NUMITEM, NUMPEDIDOAFV, DATAPEDIDO, HORAINICIAL,
+            CODIGOCLIENTE, CODIGOPRODUTO, QTDEVENDA, QTDEBONIFICADA, VALORVENDA,
+            VALORBRUTO, DESCONTOI, DESCONTOII, VALORVERBA, CODIGOVENDEDORESP,
+            MSGIMPORTACAO
+        )
+        SELECT
+            C.NUMPEDIDO, @PrimeiroItem + I.ORDEM, C.NUMPEDIDOAFV, C.DATAPEDIDO, C.HORAINICIAL,
+            C.CODIGOCLIENTE, I.CODIGOPRODUTO, I.QTDEVENDA, I.QTDEBONIFICADA, I.VALORVENDA,
+            I.VALORBRUTO, I.DESCONTOI, I.DESCONTOII, I.VALORVERBA,
+            ISNULL(I.CODIGOVENDEDORESP, C.CODIGOVENDEDORESP), I.MSGIMPORTACAO
+        FROM #Itens I
+        CROSS JOIN #Cabecalho C
+        ORDER BY I.ORDEM;
+
+        IF @TranExterna = 0
+            COMMIT TRANSACTION;
+
+        SELECT 'GRAVADO' AS STATUS, @QtdeItens AS QTDE_ITENS;
+    END TRY
+    BEGIN CATCH
+        IF XACT_STATE() = -1
+            ROLLBACK TRANSACTION;
+        ELSE IF XACT_STATE() = 1 AND @TranExterna = 0
+            ROLLBACK TRANSACTION;
+        ELSE IF XACT_STATE() = 1
+            ROLLBACK TRANSACTION SP_GRAVAR_PEDIDO;
+
+        THROW;
+    END CATCH
+END
+GO
+
+PRINT 'Procedure SP_GRAVAR_PEDIDO_SOBEL criada';
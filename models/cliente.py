@@ -5,6 +5,7 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 from dataclasses import dataclass
+from typing import NamedTuple
 
 
 @dataclass(init=False)
@@ -53,7 +54,7 @@ class Cliente:
         self.data_cadastro = kwargs.get("data_cadastro", "")
         self.codigo_entrega = kwargs.get("codigo_entrega", "")
         self.codigo_regiao = kwargs.get("codigo_regiao", 0)
-        self.codigo_tabela_preco = kwargs.get("codigo_tabela_preco", "")
+        self.codigo_tab_preco = kwargs.get("codigo_tab_preco", "")
         self.codigo_cond_pagto = kwargs.get("codigo_cond_pagto", "")
         self.codigo_cliente_pai = kwargs.get("codigo_cliente_pai", "")
         self.obs_fechamento = kwargs.get("obs_fechamento", "")
@@ -140,4 +141,13 @@ class Cliente:
         return f"{self.codigo} - {self.nome}"
     
     def __repr__(self):
-        return f"<Cliente {self.codigo}: {self.nome}>"
\ No newline at end of file
+        return f"<Cliente {self.codigo}: {self.nome}>"
+
+class ClienteResumo(NamedTuple):
+    """Cliente da listagem, sem os demais campos do cadastro"""
+    codigo: str
+    razao_social: str
+    cnpj: str
+    nome_fantasia: str
+    estado: str
+    loja: str
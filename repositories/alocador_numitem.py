@@ -0,0 +1,81 @@
+# repositories/alocador_numitem.py
+import sys
+import os
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import threading
+from typing import Callable, Dict
+from utils.logger import logger
+
+
+class AlocadorNumItem:
+    """
+    Alocador de ``NUMITEM`` por blocos (hi/lo).
+
+    Cada reserva no banco devolve uma faixa de ``tamanho_bloco`` ids que
+    fica em cache no processo; os pedidos consomem a faixa localmente,
+    sem lock de tabela. Ids de faixas não consumidas (ou de transações
+    desfeitas) são descartados, portanto a numeração pode ter lacunas.
+    """
+
+    def __init__(self, tamanho_bloco: int = 500):
+        if tamanho_bloco < 1:
+            raise ValueError("tamanho_bloco deve ser maior que zero")
+        self.tamanho_bloco = tamanho_bloco
+        self._proximo = 0
+        self._limite = 0  # exclusivo
+        self._lock = threading.Lock()
+        self._contadores = {"reservas": 0, "ids_entregues": 0}
+
+    def alocar(self, quantidade: int, reservar_faixa: Callable[[int], int]) -> int:
+        """
+        Retorna o primeiro id de uma faixa contígua de ``quantidade`` ids.
+        ``reservar_faixa(tamanho)`` é chamado apenas quando o bloco em
+        cache não comporta a quantidade pedida e deve devolver o primeiro
+        id da nova faixa reservada no banco.
+        """
+        if quantidade < 1:
+            raise ValueError("quantidade deve ser maior que zero")
+
+        with self._lock:
+            if self._limite - self._proximo < quantidade:
+                tamanho = max(self.tamanho_bloco, quantidade)
+                primeiro = int(reservar_faixa(tamanho))
+                self._proximo = primeiro
+                self._limite = primeiro + tamanho
+                self._contadores["reservas"] += 1
+                logger.debug(f"🔢 Faixa de NUMITEM reservada: {primeiro} - {self._limite - 1}")
+
+            inicio = self._proximo
+            self._proximo += quantidade
+            self._contadores["ids_entregues"] += quantidade
+            return inicio
+
+    def descartar_faixa(self):
+        """Abandona a faixa em cache (a próxima alocação reserva uma nova)"""
+        with self._lock:
+            self._proximo = self._limite = 0
+
+    def metricas(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                **self._contadores,
+                "disponiveis_em_cache": self._limite - self._proximo,
+                "tamanho_bloco": self.tamanho_bloco,
+            }
+
+
+# Alocadores compartilhados pelo processo, um por banco
+_alocadores: Dict[str, AlocadorNumItem] = {}
+_alocadores_lock = threading.Lock()
+
+
+def obter_alocador_numitem(db_name: str, tamanho_bloco: int = 500) -> AlocadorNumItem:
+    """Retorna o alocador do processo para o banco informado"""
+    with _alocadores_lock:
+        alocador = _alocadores.get(db_name)
+        if alocador is None:
+            alocador = AlocadorNumItem(tamanho_bloco)
+            _alocadores[db_name] = alocador
+        return alocador
@@ -0,0 +1,110 @@
+# repositories/gravador_pedidos.py
+import sys
+import os
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import time
+from typing import Callable, List, Optional, Tuple
+from config.settings import settings
+from models.pedido_sobel import PedidoSobel
+from utils.error_handler import BancoDadosError, ErrorHandler, NeogridError, PedidoDuplicadoError
+from utils.logger import logger
+
+
+class GravadorPedidosEmGrupo:
+    """
+    Acumula pedidos já validados e os grava em grupo (group commit).
+
+    O grupo é gravado quando atinge ``tamanho_grupo`` pedidos ou quando o
+    pedido mais antigo está na fila há ``intervalo_ms`` milissegundos
+    (verificado a cada ``adicionar``), além de ``descarregar`` explícito
+    no fim do lote. Cada pedido gravado gera um resultado no mesmo formato
+    de ``processar_pedido_neogrid`` (``sucesso``/``duplicado``/``erro``),
+    entregue a ``ao_concluir`` e devolvido por ``adicionar``/``descarregar``.
+    """
+
+    def __init__(
+        self,
+        repo,
+        tamanho_grupo: int = 50,
+        intervalo_ms: float = settings.DB_GROUP_COMMIT_MS,
+        ao_concluir: Optional[Callable[[dict], None]] = None,
+    ):
+        if tamanho_grupo < 1:
+            raise ValueError("tamanho_grupo deve ser maior que zero")
+        self.repo = repo
+        self.tamanho_grupo = tamanho_grupo
+        self.intervalo_ms = intervalo_ms
+        self.ao_concluir = ao_concluir
+        self._fila: List[Tuple[PedidoSobel, Optional[str]]] = []
+        self._primeiro_em: Optional[float] = None
+
+    @property
+    def pendentes(self) -> int:
+        return len(self._fila)
+
+    def adicionar(self, pedido: PedidoSobel, doc_id: Optional[str] = None) -> List[dict]:
+        """Enfileira o pedido e grava o grupo se o limite de tamanho ou tempo foi atingido"""
+        if not self._fila:
+            self._primeiro_em = time.monotonic()
+        self._fila.append((pedido, doc_id))
+
+        if self.pendentes >= self.tamanho_grupo or self._tempo_esgotado():
+            return self.descarregar()
+        return []
+
+    def descarregar(self) -> List[dict]:
+        """Grava todos os pedidos pendentes em uma transaction e retorna os resultados"""
+        if not self._fila:
+            return []
+
+        grupo, self._fila, self._primeiro_em = self._fila, [], None
+        inicio = time.time()
+        try:
+            falhas = self.repo.inserir_pedidos_em_grupo([pedido for pedido, _ in grupo])
+        except Exception as e:
+            # Falha inesperada: todo documento da fila ainda recebe seu resultado (erro)
+            logger.error(f"❌ Falha ao gravar grupo de {len(grupo)} pedido(s): {e}")
+            erro = e if isinstance(e, NeogridError) else BancoDadosError(
+                f"Erro ao gravar grupo de pedidos: {str(e)}", e, "descarregar"
+            )
+            falhas = [erro] * len(grupo)
+
+        logger.log_performance("GRAVAR_BANCO_GRUPO", time.time() - inicio, {
+            "pedidos": len(grupo),
+            "gravados": falhas.count(None)
+        })
+
+        resultados = [
+            self._resultado(pedido, doc_id, erro)
+            for (pedido, doc_id), erro in zip(grupo, falhas)
+        ]
+        if self.ao_concluir:
+            for resultado in resultados:
+                self.ao_concluir(resultado)
+        return resultados
+
+    def _tempo_esgotado(self) -> bool:
+        if self._primeiro_em is None:
+            return False
+        return (time.monotonic() - self._primeiro_em) * 1000 >= self.intervalo_ms
+
+    def _resultado(self, pedido: PedidoSobel, doc_id: Optional[str], erro) -> dict:
+        """Monta o resultado do pedido como ``processar_pedido_neogrid``"""
+        if erro is None:
+            mensagem = f"✅ Pedido {pedido.num_pedido} processado e gravado com sucesso"
+            logger.log_pedido_processado(
+                pedido.num_pedido, pedido.codigo_cliente, len(pedido.itens), pedido.valor_total
+            )
+            self.repo.log_processamento("INFO", mensagem, pedido.num_pedido)
+            return {"status": "sucesso", "mensagem": mensagem, "pedido": pedido.num_pedido, "doc_id": doc_id}
+
+        erro_msg = ErrorHandler.format_error_for_ui(erro)
+        if isinstance(erro, PedidoDuplicadoError):
+            logger.log_pedido_duplicado(pedido.num_pedido)
+            return {"status": "duplicado", "mensagem": erro_msg, "pedido": pedido.num_pedido, "doc_id": doc_id}
+
+        logger.error(f"Erro ao gravar pedido {pedido.num_pedido} no grupo: {erro.message}")
+        self.repo.log_processamento("ERROR", erro_msg, doc_id or pedido.num_pedido)
+        return {"status": "erro", "mensagem": erro_msg, "doc_id": doc_id, "error_type": "processamento"}
@@ -0,0 +1,311 @@
+# repositories/log_processamento.py
+import sys
+import os
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import atexit
+import json
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from config.settings import settings
+from utils.logger import logger
+
+# Colunas opcionais aceitas para a data do log, em ordem de preferência
+COLUNAS_DATA_LOG = ('DATA_LOG', 'DATETIME_LOG', 'DATA_HORA', 'TIMESTAMP_LOG', 'CREATED_AT')
+
+# SQLSTATE/mensagens que indicam mudança de esquema (tabela ou coluna inexistente)
+SQLSTATES_ESQUEMA = frozenset({"42S02", "42S22"})
+MENSAGENS_ESQUEMA = ("invalid object", "invalid column", "não existe")
+
+
+class EsquemaLogProcessamento:
+    """
+    Cache, por processo, do INSERT em T_LOG_PROCESSAMENTO.
+
+    As colunas são descobertas uma única vez por banco via
+    INFORMATION_SCHEMA e o comando montado é reutilizado; ``invalidar``
+    descarta o cache quando o banco acusa erro de esquema (DDL).
+    Tabela inexistente não fica em cache, para ser detectada ao ser criada.
+    """
+
+    _cache: Dict[str, Tuple[str, Tuple[str, ...]]] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def obter(cls, db_name: str, cursor) -> Optional[Tuple[str, Tuple[str, ...]]]:
+        """Retorna ``(sql_insert, campos)`` ou ``None`` se a tabela não existe"""
+        with cls._lock:
+            comando = cls._cache.get(db_name)
+        if comando is not None:
+            return comando
+
+        comando = cls._montar_insert(cls._carregar_colunas(cursor))
+        if comando is not None:
+            with cls._lock:
+                cls._cache[db_name] = comando
+            logger.debug(f"📝 INSERT de T_LOG_PROCESSAMENTO montado para {db_name}: {comando[1]}")
+        return comando
+
+    @classmethod
+    def invalidar(cls, db_name: Optional[str] = None):
+        with cls._lock:
+            if db_name is None:
+                cls._cache.clear()
+            else:
+                cls._cache.pop(db_name, None)
+
+    @staticmethod
+    def erro_de_esquema(erro: Exception) -> bool:
+        args = getattr(erro, "args", ())
+        if args and isinstance(args[0], str) and args[0] in SQLSTATES_ESQUEMA:
+            return True
+        mensagem = str(erro).lower()
+        return any(texto in mensagem for texto in MENSAGENS_ESQUEMA)
+
+    @staticmethod
+    def _carregar_colunas(cursor) -> List[str]:
+        cursor.execute("""
+            SELECT COLUMN_NAME
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_NAME = 'T_LOG_PROCESSAMENTO'
+            ORDER BY ORDINAL_POSITION
+        """)
+        return [str(row[0]).upper() for row in cursor.fetchall()]
+
+    @staticmethod
+    def _montar_insert(colunas: List[str]) -> Optional[Tuple[str, Tuple[str, ...]]]:
+        if not colunas:
+            return None
+
+        campos = ['TIPO', 'MENSAGEM']
+        if 'NUM_PEDIDO' in colunas:
+            campos.append('NUM_PEDIDO')
+        coluna_data = next((c for c in COLUNAS_DATA_LOG if c in colunas), None)
+        if coluna_data:
+            campos.append(coluna_data)
+
+        placeholders = ', '.join('?' for _ in campos)
+        sql = f"INSERT INTO T_LOG_PROCESSAMENTO ({', '.join(campos)}) VALUES ({placeholders})"
+        return sql, tuple(campos)
+
+
+class GravadorLogProcessamento:
+    """
+    Fila (write-behind) dos registros de T_LOG_PROCESSAMENTO gravados em lote.
+
+    ``registrar`` só acumula o registro (com o horário do evento); uma
+    thread em segundo plano grava a fila via ``executemany`` quando ela
+    atinge ``tamanho_lote`` registros ou a cada ``intervalo`` segundos,
+    usando uma conexão própria do pool, fora da transaction dos pedidos.
+    Com ``tamanho_lote <= 1`` a gravação é imediata, como antes.
+
+    A fila é limitada a ``capacidade`` registros. O excedente, e todo lote
+    que o banco não aceitar, vai para ``arquivo_pendentes`` (NDJSON), que
+    é reenviado ao banco na próxima inicialização do gravador.
+    """
+
+    def __init__(
+        self,
+        db,
+        tamanho_lote: int = settings.DB_LOG_LOTE,
+        intervalo: float = settings.DB_LOG_INTERVALO,
+        capacidade: int = settings.DB_LOG_FILA_MAX,
+        arquivo_pendentes: str = settings.DB_LOG_ARQUIVO_PENDENTES,
+    ):
+        self.db = db
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self.capacidade = capacidade
+        self.arquivo_pendentes = arquivo_pendentes
+        self._buffer: List[Tuple[str, str, Optional[str], datetime]] = []
+        self._lock = threading.Lock()
+        self._gravacao_lock = threading.Lock()
+        self._arquivo_lock = threading.Lock()
+        self._acordar = threading.Event()
+        self._encerrar = False
+        self._thread: Optional[threading.Thread] = None
+
+        if os.path.exists(self.arquivo_pendentes):
+            self._iniciar_thread()
+
+    def registrar(self, tipo: str, mensagem: str, num_pedido: Optional[str] = None):
+        registro = (tipo, mensagem[:500], num_pedido, datetime.now())
+
+        if self.tamanho_lote <= 1:
+            self._gravar([registro])
+            return
+
+        with self._lock:
+            lotado = len(self._buffer) >= self.capacidade
+            if not lotado:
+                self._buffer.append(registro)
+            cheio = len(self._buffer) >= self.tamanho_lote
+
+        if lotado:
+            # Fila cheia: não bloquear o pedido esperando o banco
+            self._despejar([registro])
+        self._iniciar_thread()
+        if cheio:
+            self._acordar.set()
+
+    def descarregar(self):
+        """Grava imediatamente os registros pendentes"""
+        with self._lock:
+            registros, self._buffer = self._buffer, []
+        if registros:
+            self._gravar(registros)
+
+    def fechar(self):
+        """Encerra a thread de gravação e grava o que restou no buffer"""
+        self._encerrar = True
+        self._acordar.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.intervalo + 5)
+            self._thread = None
+        self.descarregar()
+
+    def _iniciar_thread(self):
+        if self._thread is not None or self._encerrar:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._executar, name="gravador-log-processamento", daemon=True
+                )
+                self._thread.start()
+
+    def _executar(self):
+        self._reenviar_pendentes()
+        while not self._encerrar:
+            self._acordar.wait(self.intervalo)
+            self._acordar.clear()
+            self.descarregar()
+
+    def _gravar(self, registros: List[Tuple[str, str, Optional[str], datetime]]) -> bool:
+        """
+        Grava os registros; repete uma vez se o esquema mudou e guarda no
+        arquivo de pendentes se o banco recusar. Nunca propaga erro.
+        """
+        with self._gravacao_lock:
+            for tentativa in range(2):
+                try:
+                    with self.db.conexao() as conn:
+                        cursor = conn.cursor()
+                        try:
+                            comando = EsquemaLogProcessamento.obter(self.db.db_name, cursor)
+                            if comando is None:
+                                logger.debug(f"📝 Tabela de log não disponível: {len(registros)} registro(s) apenas no log local")
+                                return True
+
+                            sql, campos = comando
+                            cursor.fast_executemany = True
+                            cursor.executemany(sql, [self._valores(campos, r) for r in registros])
+                            if not conn.autocommit:
+                                conn.commit()
+                        finally:
+                            cursor.close()
+                    logger.debug(f"📝 {len(registros)} registro(s) gravados em T_LOG_PROCESSAMENTO")
+                    return True
+
+                except Exception as e:
+                    if tentativa == 0 and EsquemaLogProcessamento.erro_de_esquema(e):
+                        logger.debug(f"📝 Esquema de T_LOG_PROCESSAMENTO alterado, recarregando colunas: {e}")
+                        EsquemaLogProcessamento.invalidar(self.db.db_name)
+                        continue
+                    # Não falhar o processo principal por causa de log
+                    logger.warning(f"⚠️ Erro ao gravar {len(registros)} registro(s) de log no banco: {e}")
+                    self._despejar(registros)
+                    return False
+
+    def _despejar(self, registros: List[Tuple[str, str, Optional[str], datetime]]):
+        """Guarda os registros no NDJSON local para reenvio posterior"""
+        try:
+            os.makedirs(os.path.dirname(self.arquivo_pendentes) or ".", exist_ok=True)
+            with self._arquivo_lock, open(self.arquivo_pendentes, "a", encoding="utf-8") as arquivo:
+                for tipo, mensagem, num_pedido, momento in registros:
+                    arquivo.write(json.dumps({
+                        "tipo": tipo,
+                        "mensagem": mensagem,
+                        "num_pedido": num_pedido,
+                        "momento": momento.isoformat(),
+                    }, ensure_ascii=False) + "\n")
+            logger.warning(f"💾 {len(registros)} registro(s) de log guardados em {self.arquivo_pendentes} para reenvio")
+        except OSError as e:
+            logger.error(f"Falha ao guardar registros de log em {self.arquivo_pendentes}: {e}")
+
+    def _reenviar_pendentes(self):
+        """Reenvia ao banco os registros guardados em NDJSON por execuções anteriores"""
+        em_reenvio = self.arquivo_pendentes + ".reenvio"
+        try:
+            with self._arquivo_lock:
+                if os.path.exists(self.arquivo_pendentes):
+                    if os.path.exists(em_reenvio):
+                        # Reenvio anterior interrompido: junta os dois arquivos
+                        with open(self.arquivo_pendentes, encoding="utf-8") as origem, \
+                                open(em_reenvio, "a", encoding="utf-8") as destino:
+                            destino.write(origem.read())
+                        os.remove(self.arquivo_pendentes)
+                    else:
+                        os.replace(self.arquivo_pendentes, em_reenvio)
+            if not os.path.exists(em_reenvio):
+                return
+
+            registros = []
+            with open(em_reenvio, encoding="utf-8") as arquivo:
+                for linha in arquivo:
+                    if not linha.strip():
+                        continue
+                    try:
+                        item = json.loads(linha)
+                        registros.append((
+                            item["tipo"], item["mensagem"], item.get("num_pedido"),
+                            datetime.fromisoformat(item["momento"]),
+                        ))
+                    except (ValueError, KeyError) as e:
+                        logger.warning(f"⚠️ Registro de log pendente inválido ignorado: {e}")
+        except OSError as e:
+            logger.error(f"Falha ao ler registros de log pendentes: {e}")
+            return
+
+        logger.info(f"🔁 Reenviando {len(registros)} registro(s) de log pendentes de {self.arquivo_pendentes}")
+        tamanho = max(self.tamanho_lote, 500)
+        for inicio in range(0, len(registros), tamanho):
+            # Falhas voltam para o arquivo de pendentes via _gravar
+            self._gravar(registros[inicio:inicio + tamanho])
+        os.remove(em_reenvio)
+
+    @staticmethod
+    def _valores(campos: Tuple[str, ...], registro) -> tuple:
+        tipo, mensagem, num_pedido, momento = registro
+        valores = [tipo, mensagem]
+        if 'NUM_PEDIDO' in campos:
+            valores.append(num_pedido)
+        if len(valores) < len(campos):
+            valores.append(momento)
+        return tuple(valores)
+
+
+# Gravadores compartilhados pelo processo, um por banco
+_gravadores: Dict[str, GravadorLogProcessamento] = {}
+_gravadores_lock = threading.Lock()
+
+
+def obter_gravador_log(db) -> GravadorLogProcessamento:
+    """Retorna o gravador de log do processo para o banco de ``db``"""
+    with _gravadores_lock:
+        gravador = _gravadores.get(db.db_name)
+        if gravador is None:
+            gravador = GravadorLogProcessamento(db)
+            _gravadores[db.db_name] = gravador
+        return gravador
+
+
+@atexit.register
+def _fechar_gravadores():
+    with _gravadores_lock:
+        gravadores = list(_gravadores.values())
+        _gravadores.clear()
+    for gravador in gravadores:
+        gravador.fechar()
@@ -4,19 +4,73 @@ import os
 # Adiciona o diretório raiz do projeto ao path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
+import json
+import threading
+import time
 import pyodbc
 from utils.logger import logger
 from models.pedido_sobel import PedidoSobel
 from services.database import Database
 from config.settings import settings
-from utils.error_handler import BancoDadosError, ErrorHandler, PedidoDuplicadoError
-from datetime import datetime
+from repositories.alocador_numitem import obter_alocador_numitem
+from repositories.log_processamento import obter_gravador_log
+from utils.error_handler import BancoDadosError, ErrorHandler, NeogridError, PedidoDuplicadoError
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Tuple
 
 class PedidoRepository:
+    # Marcado quando a conexão cai no meio de uma transação
+    _conexao_perdida = False
+    # Itens enviados em um único executemany (fast_executemany)
+    usar_insercao_em_lote = settings.DB_BULK_INSERT_ITENS
+    # Alocador de NUMITEM por blocos; sem ele usa MAX()+1 com lock de tabela
+    alocador_numitem = None
+    # Buffer de T_LOG_PROCESSAMENTO gravado em lote
+    log_buffer = None
+    # "procedure": pedido inteiro em uma chamada a SP_GRAVAR_PEDIDO_SOBEL; "python": comandos individuais
+    modo_gravacao = settings.DB_MODO_GRAVACAO
+
+    COLUNAS_CABECALHO = (
+        "NUMPEDIDO", "NUMPEDIDOSOBEL", "LOJACLIENTE", "NUMPEDIDOAFV", "DATAPEDIDO",
+        "HORAINICIAL", "HORAFINAL", "DATAENTREGA", "CODIGOCLIENTE", "CODIGOTIPOPEDIDO",
+        "CODIGOCONDPAGTO", "CODIGONOMEENDERECO", "CODIGOUNIDFAT", "CODIGOTABPRECO",
+        "ORDEMCOMPRA", "OBSERVACAOI", "OBSERVACAOII", "VALORLIQUIDO", "VALORBRUTO",
+        "CODIGOMOTIVOTIPOPED", "CODIGOVENDEDORESP", "CESP_DATAENTREGAFIM",
+        "CESP_NUMPEDIDOASSOC", "DATAGRAVACAOACACIA", "DATAINTEGRACAOERP", "QTDEITENS",
+        "MSGIMPORTACAO", "VOLUME",
+    )
+    COLUNAS_ITEM = (
+        "NUMPEDIDO", "NUMITEM", "NUMPEDIDOAFV", "DATAPEDIDO", "HORAINICIAL",
+        "CODIGOCLIENTE", "CODIGOPRODUTO", "QTDEVENDA", "QTDEBONIFICADA", "VALORVENDA",
+        "VALORBRUTO", "DESCONTOI", "DESCONTOII", "VALORVERBA", "CODIGOVENDEDORESP",
+        "MSGIMPORTACAO",
+    )
+    # Listagem por período; DATAPEDIDO, DATAGRAVACAOACACIA e NUMPEDIDO formam a chave do keyset
+    COLUNAS_LISTAGEM = (
+        "NUMPEDIDOSOBEL", "CODIGOCLIENTE", "DATAPEDIDO", "QTDEITENS", "VALORBRUTO",
+        "DATAGRAVACAOACACIA", "NUMPEDIDO",
+    )
+    # Linhas por fetchmany na listagem em streaming
+    LOTE_LISTAGEM = 500
+
+    # Estatísticas lidas do resumo diário T_ESTATISTICA_PEDIDO_DIA; sem a tabela agrega T_PEDIDO_SOBEL
+    usar_resumo_estatisticas = True
+    # Cache das estatísticas compartilhado pelo processo (DB_ESTATISTICAS_TTL)
+    _estatisticas_cache = None
+    _estatisticas_lidas_em = 0.0
+    _estatisticas_lock = threading.Lock()
+    # Dia da última consolidação do resumo (dias encerrados) feita pelo processo
+    _estatisticas_consolidadas_em = None
+
     def __init__(self):
         self.db = Database(settings.DB_NAME_PROTHEUS)
         self.conn = None
         self.cursor = None
+        if settings.DB_NUMITEM_SEQUENCE:
+            self.alocador_numitem = obter_alocador_numitem(
+                settings.DB_NAME_PROTHEUS, settings.DB_NUMITEM_BLOCO
+            )
+        self.log_buffer = obter_gravador_log(self.db)
         self._connect()
 
     def _connect(self):
@@ -30,10 +84,12 @@ class PedidoRepository:
             raise BancoDadosError(f"Falha ao conectar no banco: {str(e)}", e, "conexão inicial")
 
     def _reconnect_if_needed(self):
-        """Reconecta se a conexão foi perdida"""
+        """Reconecta se a conexão foi perdida (sem consultar o banco)"""
         try:
-            if self.conn is None or self.db._is_connection_closed():
+            if self.conn is None or self._conexao_perdida:
                 logger.info("🔄 Reconectando ao banco de dados...")
+                self.db.descartar_conexao()
+                self._conexao_perdida = False
                 self._connect()
         except Exception as e:
             logger.error(f"Falha ao reconectar: {str(e)}")
@@ -50,7 +106,7 @@ class PedidoRepository:
             logger.debug(f"Parâmetros: {params}")
             
             # Executar query
-            self.cursor.execute(query, params)
+            self._executar_com_retry(query, params, operation)
             
             # Log de sucesso
             logger.debug(f"✅ [{operation}] Query executada com sucesso")
@@ -67,6 +123,29 @@ class PedidoRepository:
             # Re-raise o erro
             raise
 
+    def _executar_com_retry(self, query: str, params: tuple, operation: str):
+        """
+        Executa a query e, se a conexão tiver caído fora de uma transação,
+        repete uma única vez em uma conexão nova. Dentro de transação a
+        conexão é marcada como perdida e o erro é propagado.
+        """
+        try:
+            self.cursor.execute(query, params)
+        except pyodbc.Error as e:
+            if not self.db.conexao_perdida(e):
+                raise
+
+            if not self.conn.autocommit:
+                self.db.registrar_conexao_perdida()
+                self._conexao_perdida = True
+                raise
+
+            logger.warning(f"🔄 [{operation}] Conexão perdida ({e.args[0]}), repetindo em nova conexão")
+            self.db.registrar_conexao_perdida(repetindo=True)
+            self._conexao_perdida = True
+            self._reconnect_if_needed()
+            self.cursor.execute(query, params)
+
     def pedido_existe(self, pedido: PedidoSobel) -> bool:
    
         try:
@@ -120,7 +199,79 @@ class PedidoRepository:
                 e,
                 "verificar_existencia"
             )
-    
+
+    # Linhas por consulta: limite do construtor VALUES (1000) e
+    # de parâmetros por comando do SQL Server (2100)
+    LOTE_VERIFICACAO_DUPLICIDADE = 1000
+
+    def pedidos_existentes(self, pedidos) -> set:
+        """
+        Verifica em lote quais pedidos já foram gravados.
+
+        Recebe ``PedidoSobel`` ou dicionários com ``num_pedido_afv`` e
+        ``data_pedido`` e devolve o conjunto de chaves
+        ``(num_pedido_afv, data)`` já existentes em T_PEDIDO_SOBEL.
+        Usa uma única consulta (join com tabela ``VALUES``) por lote de
+        até ``LOTE_VERIFICACAO_DUPLICIDADE`` pedidos, permitindo descartar
+        reenvios antes de validar cliente e produtos. ``pedido_existe``
+        continua sendo a verificação definitiva no momento da inserção.
+        """
+        # dict preserva a ordem e elimina chaves repetidas na mesma página
+        chaves = list(dict.fromkeys(
+            chave for chave in map(self.chave_duplicidade, pedidos) if chave is not None
+        ))
+
+        existentes = set()
+        if not chaves:
+            return existentes
+
+        try:
+            self._reconnect_if_needed()
+
+            for inicio in range(0, len(chaves), self.LOTE_VERIFICACAO_DUPLICIDADE):
+                lote = chaves[inicio:inicio + self.LOTE_VERIFICACAO_DUPLICIDADE]
+                valores = ", ".join(["(?, ?)"] * len(lote))
+                query = f"""
+                    SELECT P.NUMPEDIDOAFV, P.DATAPEDIDO
+                    FROM T_PEDIDO_SOBEL P
+                    INNER JOIN (VALUES {valores}) AS C(NUMPEDIDOAFV, DATAPEDIDO)
+                        ON P.NUMPEDIDOAFV = C.NUMPEDIDOAFV
+                       AND P.DATAPEDIDO = C.DATAPEDIDO
+                """
+                params = []
+                for num_pedido_afv, data in lote:
+                    params.extend([num_pedido_afv, datetime.combine(data, datetime.min.time())])
+
+                self._execute_with_logging(query, tuple(params), "VERIFICAR_EXISTENCIA_LOTE")
+                for num_pedido_afv, data_pedido in self.cursor.fetchall():
+                    existentes.add((str(num_pedido_afv).strip(), self._somente_data(data_pedido)))
+
+            logger.info(f"📋 Verificação de duplicidade em lote: {len(existentes)} de {len(chaves)} pedido(s) já existem")
+            return existentes
+
+        except pyodbc.Error as e:
+            raise BancoDadosError(
+                f"Erro ao verificar existência de {len(chaves)} pedidos em lote: {str(e)}",
+                e,
+                "verificar_existencia_lote"
+            )
+
+    def chave_duplicidade(self, pedido):
+        """Chave ``(num_pedido_afv, data)`` usada por ``pedidos_existentes``"""
+        if isinstance(pedido, dict):
+            num_pedido_afv, data_pedido = pedido.get("num_pedido_afv"), pedido.get("data_pedido")
+        else:
+            num_pedido_afv, data_pedido = pedido.num_pedido_afv, pedido.data_pedido
+
+        data = self._somente_data(data_pedido) if data_pedido else None
+        if not num_pedido_afv or data is None:
+            return None
+        return (str(num_pedido_afv).strip(), data)
+
+    def _somente_data(self, data):
+        data = self._tratar_data(data)
+        return data.date() if isinstance(data, datetime) else data
+
     def inserir_pedido(self, pedido: PedidoSobel) -> bool:
         """
         Insere pedido completo (cabeçalho + itens) no banco de dados
@@ -135,6 +286,11 @@ class PedidoRepository:
         logger.info(f"💾 Iniciando inserção do pedido {pedido.num_pedido}")
         logger.debug(f"Cliente: {pedido.codigo_cliente} | Itens: {len(pedido.itens)} | Valor: R$ {pedido.valor_total:.2f}")
         
+        if self.modo_gravacao == "procedure":
+            gravado = self._inserir_pedido_procedure(pedido)
+            if gravado is not None:
+                return gravado
+
         # Verificar se já existe
         #if self.pedido_existe(pedido.num_pedido):
         if self.pedido_existe(pedido):
@@ -158,6 +314,7 @@ class PedidoRepository:
             
             # Confirmar transação
             self.conn.commit()
+            self.invalidar_estatisticas()
             logger.info(f"🎉 Pedido {pedido.num_pedido} gravado com sucesso no banco!")
             
             return True
@@ -197,6 +354,157 @@ class PedidoRepository:
             except:
                 pass
 
+    def _inserir_pedido_procedure(self, pedido: PedidoSobel) -> Optional[bool]:
+        """
+        Grava cabeçalho e itens em uma única chamada a ``SP_GRAVAR_PEDIDO_SOBEL``
+        (payload JSON lido com OPENJSON). A procedure verifica duplicidade,
+        reserva os NUMITEMs e insere tudo na mesma transaction.
+        Retorna ``None`` quando a procedure não existe no banco; neste caso o
+        repositório volta ao modo "python" (data/sp_gravar_pedido_sobel.sql cria a procedure).
+        """
+        query = "EXEC dbo.SP_GRAVAR_PEDIDO_SOBEL @Pedido = ?, @Sequencia = ?"
+        params = (self._payload_pedido_json(pedido), settings.DB_NUMITEM_SEQUENCE or None)
+
+        try:
+            self._reconnect_if_needed()
+            self._execute_with_logging(query, params, "GRAVAR_PEDIDO_PROCEDURE", str(pedido.num_pedido_afv))
+            status, itens_inseridos = self.cursor.fetchone()
+        except pyodbc.Error as e:
+            mensagem = str(e).lower()
+            if "could not find stored procedure" in mensagem or "(2812)" in mensagem:
+                logger.warning("⚠️ SP_GRAVAR_PEDIDO_SOBEL não encontrada - usando gravação pelo Python")
+                PedidoRepository.modo_gravacao = self.modo_gravacao = "python"
+                return None
+            if "duplicate key" in mensagem or "primary key" in mensagem:
+                raise PedidoDuplicadoError(pedido.num_pedido)
+            raise BancoDadosError(
+                f"Erro de banco ao gravar pedido {pedido.num_pedido} pela procedure: {str(e)}",
+                e,
+                "inserir_pedido_procedure"
+            )
+
+        if status == "DUPLICADO":
+            logger.warning(f"⚠️ Pedido {pedido.num_pedido} ja existe no banco de dados")
+            raise PedidoDuplicadoError(pedido.num_pedido)
+
+        self.invalidar_estatisticas()
+        logger.info(f"🎉 Pedido {pedido.num_pedido} gravado pela procedure ({itens_inseridos} itens)")
+        return True
+
+    def _payload_pedido_json(self, pedido: PedidoSobel) -> str:
+        """Serializa cabeçalho e itens com os nomes de coluna esperados pela procedure"""
+        def valor_json(valor):
+            if isinstance(valor, datetime):
+                return valor.isoformat()
+            return str(valor)
+
+        cabecalho = dict(zip(self.COLUNAS_CABECALHO, self._valores_cabecalho(pedido)))
+        # NUMITEM é reservado pela procedure
+        itens = [
+            {coluna: valor for coluna, valor in zip(self.COLUNAS_ITEM, self._valores_item(pedido, item, None))
+             if coluna in ("CODIGOPRODUTO", "QTDEVENDA", "QTDEBONIFICADA", "VALORVENDA", "VALORBRUTO",
+                           "DESCONTOI", "DESCONTOII", "VALORVERBA", "CODIGOVENDEDORESP", "MSGIMPORTACAO")}
+            for item in pedido.itens
+        ]
+        return json.dumps({"cabecalho": cabecalho, "itens": itens}, default=valor_json, ensure_ascii=False)
+
+    def inserir_pedidos_em_grupo(self, pedidos: List[PedidoSobel]) -> List[Optional[NeogridError]]:
+        """
+        Grava vários pedidos em uma única transaction (group commit).
+
+        Cada pedido fica protegido por um savepoint: se ele falhar, só
+        ele é desfeito e os demais seguem para o commit único do grupo.
+        Retorna, na mesma ordem de ``pedidos``, ``None`` para os gravados
+        ou o erro (``PedidoDuplicadoError``/``BancoDadosError``) do pedido.
+        Se a transaction do grupo não puder ser concluída, ela é desfeita
+        e os pedidos ainda pendentes são gravados um a um.
+        """
+        falhas: List[Optional[NeogridError]] = [None] * len(pedidos)
+        if not pedidos:
+            return falhas
+
+        logger.info(f"💾 Iniciando gravação em grupo de {len(pedidos)} pedido(s)")
+
+        try:
+            self._reconnect_if_needed()
+            self.conn.autocommit = False
+
+            for i, pedido in enumerate(pedidos):
+                savepoint = f"pedido_grupo_{i}"
+                if not all([pedido.num_pedido, pedido.num_pedido_afv, pedido.data_pedido,
+                            pedido.hora_inicio, pedido.codigo_cliente]):
+                    falhas[i] = BancoDadosError("Pedido inválido para inserção", ValueError("Campos obrigatórios ausentes"), "validação")
+                    continue
+
+                self.cursor.execute(f"SAVE TRANSACTION {savepoint}")
+                try:
+                    if self.pedido_existe(pedido):
+                        raise PedidoDuplicadoError(pedido.num_pedido)
+                    self._inserir_cabecalho_pedido(pedido)
+                    self._inserir_itens_pedido(pedido)
+                    logger.debug(f"✅ Pedido {pedido.num_pedido} gravado no grupo (aguardando commit)")
+                except Exception as e:
+                    if self._conexao_perdida:
+                        raise
+                    self.cursor.execute(f"ROLLBACK TRANSACTION {savepoint}")
+                    falhas[i] = self._erro_gravacao(pedido, e)
+                    logger.warning(f"🔄 Pedido {pedido.num_pedido} desfeito no grupo: {falhas[i].message}")
+
+            self.conn.commit()
+            self.invalidar_estatisticas()
+            logger.info(f"🎉 Grupo gravado: {falhas.count(None)} de {len(pedidos)} pedido(s) confirmados em um commit")
+
+        except Exception as e:
+            try:
+                self.conn.rollback()
+            except Exception:
+                pass
+            logger.error(f"🔄 Rollback do grupo de {len(pedidos)} pedido(s): {e} - gravando individualmente")
+            try:
+                self._reconnect_if_needed()
+            except Exception as erro_conexao:
+                # Banco ainda fora: cada pedido pendente recebe o erro, sem perder o resultado
+                logger.error(f"❌ Sem conexão para gravar o grupo individualmente: {erro_conexao}")
+                for i, pedido in enumerate(pedidos):
+                    if falhas[i] is None:
+                        falhas[i] = BancoDadosError(
+                            f"Erro ao gravar pedido {pedido.num_pedido}: sem conexão com o banco",
+                            erro_conexao, "inserir_pedidos_em_grupo",
+                        )
+                return falhas
+
+            for i, pedido in enumerate(pedidos):
+                if falhas[i] is not None:
+                    continue
+                try:
+                    self.inserir_pedido(pedido)
+                except NeogridError as erro:
+                    falhas[i] = erro
+                except Exception as erro:
+                    falhas[i] = self._erro_gravacao(pedido, erro)
+        finally:
+            try:
+                self.conn.autocommit = True
+            except:
+                pass
+
+        return falhas
+
+    def _erro_gravacao(self, pedido: PedidoSobel, erro: Exception) -> NeogridError:
+        """Converte a falha de um pedido do grupo no erro equivalente ao de ``inserir_pedido``"""
+        if isinstance(erro, PedidoDuplicadoError):
+            return erro
+
+        texto = str(erro).lower()
+        if isinstance(erro, BancoDadosError):
+            texto = erro.details.get("original_error", "").lower()
+        if "duplicate key" in texto or "primary key" in texto:
+            return PedidoDuplicadoError(pedido.num_pedido)
+
+        if isinstance(erro, NeogridError):
+            return erro
+        return BancoDadosError(f"Erro ao gravar pedido {pedido.num_pedido}: {str(erro)}", erro, "inserir_pedidos_em_grupo")
+
      # Correção da indentação e melhorias no método _inserir_cabecalho_pedido
      # Este método deve estar dentro da classe PedidoRepository
 
@@ -209,78 +517,8 @@ class PedidoRepository:
         Compatível com os valores de exemplo da query fornecida.
         """
         try:
-            query = """
-                INSERT INTO T_PEDIDO_SOBEL (
-                    NUMPEDIDO,
-                    NUMPEDIDOSOBEL,
-                    LOJACLIENTE,
-                    NUMPEDIDOAFV,
-                    DATAPEDIDO,
-                    HORAINICIAL,
-                    HORAFINAL,
-                    DATAENTREGA,
-                    CODIGOCLIENTE,
-                    CODIGOTIPOPEDIDO,
-                    CODIGOCONDPAGTO,
-                    CODIGONOMEENDERECO,
-                    CODIGOUNIDFAT,
-                    CODIGOTABPRECO,
-                    ORDEMCOMPRA,
-                    OBSERVACAOI,
-                    OBSERVACAOII,
-                    VALORLIQUIDO,
-                    VALORBRUTO,
-                    CODIGOMOTIVOTIPOPED,
-                    CODIGOVENDEDORESP,
-                    CESP_DATAENTREGAFIM,
-                    CESP_NUMPEDIDOASSOC,
-                    DATAGRAVACAOACACIA,
-                    DATAINTEGRACAOERP,
-                    QTDEITENS,
-                    MSGIMPORTACAO,
-                    VOLUME
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """
-
-            # Preparar valores com tratamento robusto e valores padrão baseados na query fornecida
-            qtde_itens_valor = None
-            if getattr(pedido, 'quantidade_itens', None) is not None:
-                qtde_itens_valor = int(pedido.quantidade_itens)
-            elif hasattr(pedido, 'itens'):
-                qtde_itens_valor = len(pedido.itens)
-
-            volume_valor = int(pedido.volume) if pedido.volume is not None else None
-
-            valores = (
-                int(pedido.num_pedido),                           # NUMPEDIDO
-                None,                                                           # NUMPEDIDOSOBEL
-                str(pedido.loja_cliente or '01').strip(),                       # LOJACLIENTE (padrão '01')
-                str(pedido.num_pedido_afv or pedido.num_pedido or '').strip(),  # NUMPEDIDOAFV
-                self._tratar_data(pedido.data_pedido),                          # DATAPEDIDO
-                str(pedido.hora_inicio or '00:00').strip(),                     # HORAINICIAL
-                str(pedido.hora_fim or '').strip() if pedido.hora_fim else None, # HORAFINAL
-                self._tratar_data(pedido.data_entrega),                         # DATAENTREGA
-                str(pedido.codigo_cliente or '').strip(),                       # CODIGOCLIENTE
-                str(pedido.codigo_tipo_pedido or 'N').strip(),                  # CODIGOTIPOPEDIDO (padrão 'N')
-                str(pedido.codigo_cond_pagto or '055').strip(),                 # CODIGOCONDPAGTO (padrão '055')
-                str(pedido.codigo_nome_endereco or 'E').strip(),                # CODIGONOMEENDERECO (padrão 'E')
-                str(pedido.codigo_unidade_faturamento or '01').strip(),         # CODIGOUNIDFAT (padrão '01')
-                str(pedido.codigo_tabela_preco or '038').strip(),               # CODIGOTABPRECO (padrão '038')
-                str(pedido.ordem_compra or '').strip(),                         # ORDEMCOMPRA
-                str(pedido.observacao_1 or '').strip(),                      # OBSERVACAOI (padrão 'CIF')
-                str(pedido.observacao_2 or '').strip() if pedido.observacao_2 else None, # OBSERVACAOII
-                self._tratar_valor_decimal(pedido.valor_liquido),               # VALORLIQUIDO
-                self._tratar_valor_decimal(pedido.valor_bruto),                 # VALORBRUTO
-                str(pedido.codigo_motivo_tipo_pedido or '').strip() if pedido.codigo_motivo_tipo_pedido else None, # CODIGOMOTIVOTIPOPED
-                str(pedido.codigo_vendedor_resp or '000559').strip(),           # CODIGOVENDEDORESP (padrão '000559')
-                self._tratar_data(pedido.data_entrega_fim or pedido.data_entrega), # CESP_DATAENTREGAFIM
-                str(pedido.num_pedido_assoc or '').strip() if pedido.num_pedido_assoc else None, # CESP_NUMPEDIDOASSOC
-                self._tratar_data_hora(pedido.data_gravacao_acacia or datetime.now()), # DATAGRAVACAOACACIA
-                self._tratar_data_hora(pedido.data_integracao_erp) if pedido.data_integracao_erp else None, # DATAINTEGRACAOERP
-                qtde_itens_valor,
-                str(pedido.mensagem_importacao or '').strip() if pedido.mensagem_importacao else None,
-                volume_valor                                         # VOLUME
-            )
+            query = self._sql_insert("T_PEDIDO_SOBEL", self.COLUNAS_CABECALHO)
+            valores = self._valores_cabecalho(pedido)
 
             # Log dos valores para debug (similar ao exemplo da query)
             logger.debug(f"💾 Valores do cabeçalho do pedido {pedido.num_pedido}:")
@@ -308,8 +546,87 @@ class PedidoRepository:
                 "inserir_cabecalho"
             )
 
+    def _valores_cabecalho(self, pedido: PedidoSobel) -> tuple:
+        """Monta a tupla de parâmetros do cabeçalho na ordem de ``COLUNAS_CABECALHO``"""
+        # Preparar valores com tratamento robusto e valores padrão baseados na query fornecida
+        qtde_itens_valor = None
+        if getattr(pedido, 'quantidade_itens', None) is not None:
+            qtde_itens_valor = int(pedido.quantidade_itens)
+        elif hasattr(pedido, 'itens'):
+            qtde_itens_valor = len(pedido.itens)
+
+        volume_valor = int(pedido.volume) if pedido.volume is not None else None
+
+        valores = (
+            int(pedido.num_pedido),                           # NUMPEDIDO
+            None,                                                           # NUMPEDIDOSOBEL
+            str(pedido.loja_cliente or '01').strip(),                       # LOJACLIENTE (padrão '01')
+            str(pedido.num_pedido_afv or pedido.num_pedido or '').strip(),  # NUMPEDIDOAFV
+            self._tratar_data(pedido.data_pedido),                          # DATAPEDIDO
+            str(pedido.hora_inicio or '00:00').strip(),                     # HORAINICIAL
+            str(pedido.hora_fim or '').strip() if pedido.hora_fim else None, # HORAFINAL
+            self._tratar_data(pedido.data_entrega),                         # DATAENTREGA
+            str(pedido.codigo_cliente or '').strip(),                       # CODIGOCLIENTE
+            str(pedido.codigo_tipo_pedido or 'N').strip(),                  # CODIGOTIPOPEDIDO (padrão 'N')
+            str(pedido.codigo_cond_pagto or '055').strip(),                 # CODIGOCONDPAGTO (padrão '055')
+            str(pedido.codigo_nome_endereco or 'E').strip(),                # CODIGONOMEENDERECO (padrão 'E')
+            str(pedido.codigo_unidade_faturamento or '01').strip(),         # CODIGOUNIDFAT (padrão '01')
+            str(pedido.codigo_tabela_preco or '038').strip(),               # CODIGOTABPRECO (padrão '038')
+            str(pedido.ordem_compra or '').strip(),                         # ORDEMCOMPRA
+            str(pedido.observacao_1 or '').strip(),                      # OBSERVACAOI (padrão 'CIF')
+            str(pedido.observacao_2 or '').strip() if pedido.observacao_2 else None, # OBSERVACAOII
+            self._tratar_valor_decimal(pedido.valor_liquido),               # VALORLIQUIDO
+            self._tratar_valor_decimal(pedido.valor_bruto),                 # VALORBRUTO
+            str(pedido.codigo_motivo_tipo_pedido or '').strip() if pedido.codigo_motivo_tipo_pedido else None, # CODIGOMOTIVOTIPOPED
+            str(pedido.codigo_vendedor_resp or '000559').strip(),           # CODIGOVENDEDORESP (padrão '000559')
+            self._tratar_data(pedido.data_entrega_fim or pedido.data_entrega), # CESP_DATAENTREGAFIM
+            str(pedido.num_pedido_assoc or '').strip() if pedido.num_pedido_assoc else None, # CESP_NUMPEDIDOASSOC
+            self._tratar_data_hora(pedido.data_gravacao_acacia or datetime.now()), # DATAGRAVACAOACACIA
+            self._tratar_data_hora(pedido.data_integracao_erp) if pedido.data_integracao_erp else None, # DATAINTEGRACAOERP
+            qtde_itens_valor,
+            str(pedido.mensagem_importacao or '').strip() if pedido.mensagem_importacao else None,
+            volume_valor                                         # VOLUME
+        )
+        return valores
+
+    def _reservar_numitens(self, quantidade: int) -> int:
+        """
+        Retorna o primeiro ``NUMITEM`` de uma faixa contígua de ``quantidade``
+        ids. Usa o alocador por blocos (SEQUENCE) e, se a sequência não
+        existir no banco, volta ao ``MAX()+1`` com lock de tabela.
+        """
+        alocador = self.alocador_numitem
+        if alocador is None:
+            return self._get_next_numitem()
+
+        try:
+            return alocador.alocar(quantidade, self._reservar_faixa_numitem)
+        except pyodbc.Error as e:
+            if self.db.conexao_perdida(e):
+                raise
+            logger.warning(
+                f"⚠️ Sequência {settings.DB_NUMITEM_SEQUENCE} indisponível, "
+                f"usando MAX(NUMITEM)+1 (execute data/seq_numitem.sql): {e}"
+            )
+            self.alocador_numitem = None
+            return self._get_next_numitem()
+
+    def _reservar_faixa_numitem(self, tamanho: int) -> int:
+        """Reserva ``tamanho`` valores da SEQUENCE de NUMITEM e devolve o primeiro"""
+        query = """
+            SET NOCOUNT ON;
+            DECLARE @primeiro SQL_VARIANT;
+            EXEC sys.sp_sequence_get_range
+                @sequence_name = ?,
+                @range_size = ?,
+                @range_first_value = @primeiro OUTPUT;
+            SELECT CAST(@primeiro AS BIGINT);
+        """
+        self._execute_with_logging(query, (settings.DB_NUMITEM_SEQUENCE, tamanho), "RESERVAR_NUMITEM")
+        return int(self.cursor.fetchone()[0])
+
     def _get_next_numitem(self) -> int:
-        """Obtém o próximo valor de ``NUMITEM`` de forma segura."""
+        """Obtém o próximo valor de ``NUMITEM`` de forma segura (legado, trava a tabela)."""
         query = (
             "SELECT ISNULL(MAX(NUMITEM), 0) + 1 "
             "FROM T_PEDIDOITEM_SOBEL WITH (TABLOCKX, HOLDLOCK)"
@@ -319,57 +636,46 @@ class PedidoRepository:
         return int(result[0] or 1)
 
     def _inserir_itens_pedido(self, pedido: PedidoSobel) -> int:
-        """Insere os itens do pedido na tabela ``T_PEDIDOITEM_SOBEL`` evitando duplicidade."""
+        """
+        Insere os itens do pedido na tabela ``T_PEDIDOITEM_SOBEL`` evitando duplicidade.
+        Com ``usar_insercao_em_lote`` todos os itens seguem em um único
+        ``executemany`` (``fast_executemany``); se o lote falhar, os itens são
+        reenviados um a um para identificar o item com problema.
+        """
+        if not pedido.itens:
+            return 0  # nada a inserir nem NUMITEM a reservar
+
         try:
-            query = """
-                INSERT INTO T_PEDIDOITEM_SOBEL (
-                    NUMPEDIDO,
-                    NUMITEM,
-                    NUMPEDIDOAFV,
-                    DATAPEDIDO,
-                    HORAINICIAL,
-                    CODIGOCLIENTE,
-                    CODIGOPRODUTO,
-                    QTDEVENDA,
-                    QTDEBONIFICADA,
-                    VALORVENDA,
-                    VALORBRUTO,
-                    DESCONTOI,
-                    DESCONTOII,
-                    VALORVERBA,
-                    CODIGOVENDEDORESP,
-                    MSGIMPORTACAO
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """
+            query = self._sql_insert("T_PEDIDOITEM_SOBEL", self.COLUNAS_ITEM)
 
-            start_idx = self._get_next_numitem()
+            start_idx = self._reservar_numitens(len(pedido.itens))
+            parametros = [
+                self._valores_item(pedido, item, start_idx + offset)
+                for offset, item in enumerate(pedido.itens)
+            ]
 
-            count = 0
-            for offset, item in enumerate(pedido.itens):
-                valores = (
-                    int(pedido.num_pedido),
-                    start_idx + offset,
-                    str(pedido.num_pedido_afv or pedido.num_pedido or "").strip(),
-                    self._tratar_data(pedido.data_pedido),
-                    str(pedido.hora_inicio or "00:00").strip(),
-                    str(pedido.codigo_cliente or "").strip(),
-                    str(item.cod_produto).strip(),
-                    float(item.quantidade),
-                    float(getattr(item, "qtde_bonificada", 0) or 0),
-                    self._tratar_valor_decimal(item.valor_unitario),
-                    self._tratar_valor_decimal(getattr(item, "valor_bruto", item.valor_total)),
-                    self._tratar_valor_decimal(getattr(item, "desconto_i", 0)),
-                    self._tratar_valor_decimal(getattr(item, "desconto_ii", 0)),
-                    self._tratar_valor_decimal(getattr(item, "valor_verba", 0)),
-                    str(getattr(item, "codigo_vendedor_resp", pedido.codigo_vendedor_resp or "")).strip() or None,
-                    str(getattr(item, "msg_importacao", "") or "").strip() or None,
-                )
+            if self.usar_insercao_em_lote and len(parametros) > 1:
+                if self._inserir_itens_em_lote(query, parametros, pedido):
+                    return len(parametros)
 
-                self._execute_with_logging(query, valores, "INSERIR_ITENS", str(pedido.num_pedido_afv))
+            count = 0
+            for offset, valores in enumerate(parametros):
+                try:
+                    self._execute_with_logging(query, valores, "INSERIR_ITENS", str(pedido.num_pedido_afv))
+                except pyodbc.Error as e:
+                    item = pedido.itens[offset]
+                    raise BancoDadosError(
+                        f"Erro ao inserir item {offset + 1} (produto {item.cod_produto}) "
+                        f"do pedido {pedido.num_pedido}: {str(e)}",
+                        e,
+                        "inserir_itens"
+                    )
                 count += 1
 
             return count
 
+        except BancoDadosError:
+            raise
         except pyodbc.Error as e:
             raise BancoDadosError(
                 f"Erro ao inserir itens do pedido {pedido.num_pedido}: {str(e)}",
@@ -383,6 +689,63 @@ class PedidoRepository:
                 "inserir_itens"
             )
 
+    def _inserir_itens_em_lote(self, query: str, parametros: list, pedido: PedidoSobel) -> bool:
+        """
+        Envia todos os itens em um único ``executemany``. Retorna ``False``
+        (após desfazer o lote parcial) quando o lote falha e os itens devem
+        ser reenviados individualmente.
+        """
+        em_transacao = not self.conn.autocommit
+        try:
+            if em_transacao:
+                self.cursor.execute("SAVE TRANSACTION itens_lote")
+
+            logger.debug(f"🔍 [INSERIR_ITENS_LOTE] {len(parametros)} itens via fast_executemany")
+            logger.debug(f"SQL: {query.strip()}")
+            self.cursor.fast_executemany = True
+            self.cursor.executemany(query, parametros)
+            logger.debug(f"✅ [INSERIR_ITENS_LOTE] {len(parametros)} itens inseridos em lote")
+            return True
+
+        except pyodbc.Error as e:
+            if self.db.conexao_perdida(e):
+                raise
+            logger.warning(
+                f"⚠️ Inserção em lote dos itens do pedido {pedido.num_pedido} falhou, "
+                f"reenviando item a item: {e}"
+            )
+            if em_transacao:
+                self.cursor.execute("ROLLBACK TRANSACTION itens_lote")
+            return False
+
+    @staticmethod
+    def _sql_insert(tabela: str, colunas: tuple) -> str:
+        return (
+            f"INSERT INTO {tabela} ({', '.join(colunas)}) "
+            f"VALUES ({', '.join('?' for _ in colunas)})"
+        )
+
+    def _valores_item(self, pedido: PedidoSobel, item, numitem: int) -> tuple:
+        """Monta a tupla de parâmetros de um item na ordem de ``COLUNAS_ITEM``"""
+        return (
+            int(pedido.num_pedido),
+            numitem,
+            str(pedido.num_pedido_afv or pedido.num_pedido or "").strip(),
+            self._tratar_data(pedido.data_pedido),
+            str(pedido.hora_inicio or "00:00").strip(),
+            str(pedido.codigo_cliente or "").strip(),
+            str(item.cod_produto).strip(),
+            float(item.quantidade),
+            float(getattr(item, "qtde_bonificada", 0) or 0),
+            self._tratar_valor_decimal(item.valor_unitario),
+            self._tratar_valor_decimal(getattr(item, "valor_bruto", item.valor_total)),
+            self._tratar_valor_decimal(getattr(item, "desconto_i", 0)),
+            self._tratar_valor_decimal(getattr(item, "desconto_ii", 0)),
+            self._tratar_valor_decimal(getattr(item, "valor_verba", 0)),
+            str(getattr(item, "codigo_vendedor_resp", pedido.codigo_vendedor_resp or "")).strip() or None,
+            str(getattr(item, "msg_importacao", "") or "").strip() or None,
+        )
+
     def _tratar_data(self, data) -> datetime:
         """
         Trata diferentes tipos de data e converte para datetime.
@@ -674,153 +1037,347 @@ class PedidoRepository:
             )
 
     def listar_pedidos_por_periodo(self, data_inicio: str, data_fim: str) -> list:
-        """Lista pedidos por período com tratamento de erro"""
+        """
+        Lista pedidos por período com tratamento de erro.
+        Materializa todo o período; para períodos longos prefira
+        ``iterar_pedidos_por_periodo`` ou ``pagina_pedidos_por_periodo``.
+        """
+        resultado = list(self.iterar_pedidos_por_periodo(data_inicio, data_fim))
+        logger.debug(f"🔍 Encontrados {len(resultado)} pedidos no período {data_inicio} - {data_fim}")
+        return resultado
+
+    def iterar_pedidos_por_periodo(
+        self, data_inicio: str, data_fim: str, tamanho_lote: int = LOTE_LISTAGEM
+    ) -> Iterator:
+        """
+        Gera os pedidos do período em blocos de ``fetchmany``, sem carregar
+        o resultado inteiro em memória. Usa uma conexão própria do pool,
+        mantida até o gerador ser consumido ou fechado, para não ocupar o
+        cursor do repositório com um resultado pendente.
+        """
+        query = f"""
+            SELECT {', '.join(self.COLUNAS_LISTAGEM)}
+            FROM T_PEDIDO_SOBEL
+            WHERE DATAPEDIDO BETWEEN ? AND ?
+            ORDER BY DATAPEDIDO DESC, DATAGRAVACAOACACIA DESC, NUMPEDIDO DESC
+        """
+        params = (data_inicio, data_fim)
         try:
-            self._reconnect_if_needed()
-            
-            query = """
-                SELECT NUMPEDIDOSOBEL, 
-                       CODIGOCLIENTE, 
-                       DATAPEDIDO,
-                       QTDEITENS, 
-                       VALORBRUTO, 
-                       DATAGRAVACAOACACIA
-                FROM T_PEDIDO_SOBEL
-                WHERE DATAPEDIDO BETWEEN ? AND ?
-                ORDER BY DATAPEDIDO DESC, DATAGRAVACAOACACIA DESC
-            """
-            
-            params = (data_inicio, data_fim)
-            self._execute_with_logging(query, params, "LISTAR_PEDIDOS")
-            resultado = self.cursor.fetchall()
-            
-            logger.debug(f"🔍 Encontrados {len(resultado)} pedidos no período {data_inicio} - {data_fim}")
-            return resultado
-            
+            with self.db.conexao() as conn:
+                cursor = conn.cursor()
+                try:
+                    logger.sql(query, params)
+                    cursor.execute(query, params)
+                    while True:
+                        linhas = cursor.fetchmany(tamanho_lote)
+                        if not linhas:
+                            break
+                        yield from linhas
+                finally:
+                    cursor.close()
+
         except Exception as e:
             raise BancoDadosError(
-                f"Erro ao listar pedidos no período {data_inicio} - {data_fim}: {str(e)}", 
-                e, 
+                f"Erro ao listar pedidos no período {data_inicio} - {data_fim}: {str(e)}",
+                e,
                 "listar_pedidos"
             )
 
-    def _get_log_table_columns(self):
-        """Verifica as colunas disponíveis na tabela de log"""
+    def pagina_pedidos_por_periodo(
+        self,
+        data_inicio: str,
+        data_fim: str,
+        tamanho_pagina: int = 100,
+        apos: Optional[Tuple] = None,
+    ) -> Tuple[list, Optional[Tuple]]:
+        """
+        Página do período por keyset em (DATAPEDIDO, DATAGRAVACAOACACIA, NUMPEDIDO),
+        na mesma ordem decrescente da listagem.
+
+        ``apos`` é o cursor devolvido pela página anterior (``None`` na
+        primeira). Retorna ``(linhas, proximo_cursor)``; ``proximo_cursor``
+        é ``None`` na última página. O custo por página independe da
+        posição, ao contrário de OFFSET. Pedidos sem DATAGRAVACAOACACIA
+        (gravados fora do importador) não entram na paginação.
+        """
         try:
-            query = """
-                SELECT COLUMN_NAME 
-                FROM INFORMATION_SCHEMA.COLUMNS 
-                WHERE TABLE_NAME = 'T_LOG_PROCESSAMENTO'
-                ORDER BY ORDINAL_POSITION
+            self._reconnect_if_needed()
+
+            filtro_keyset = ""
+            params: list = [tamanho_pagina, data_inicio, data_fim]
+            if apos is not None:
+                data_pedido, data_gravacao, num_pedido = apos
+                filtro_keyset = """
+                AND (DATAPEDIDO < ?
+                     OR (DATAPEDIDO = ? AND DATAGRAVACAOACACIA < ?)
+                     OR (DATAPEDIDO = ? AND DATAGRAVACAOACACIA = ? AND NUMPEDIDO < ?))"""
+                params += [data_pedido, data_pedido, data_gravacao, data_pedido, data_gravacao, num_pedido]
+
+            query = f"""
+                SELECT TOP (?) {', '.join(self.COLUNAS_LISTAGEM)}
+                FROM T_PEDIDO_SOBEL
+                WHERE DATAPEDIDO BETWEEN ? AND ?
+                AND DATAGRAVACAOACACIA IS NOT NULL{filtro_keyset}
+                ORDER BY DATAPEDIDO DESC, DATAGRAVACAOACACIA DESC, NUMPEDIDO DESC
             """
-            params = ()
-            self._execute_with_logging(query, params, "VERIFICAR_COLUNAS_LOG")
-            columns = [row[0] for row in self.cursor.fetchall()]
-            return columns
-        except:
-            return []
+            self._execute_with_logging(query, tuple(params), "PAGINAR_PEDIDOS")
+            linhas = self.cursor.fetchall()
+
+            proximo = None
+            if len(linhas) == tamanho_pagina:
+                ultima = linhas[-1]
+                proximo = (ultima.DATAPEDIDO, ultima.DATAGRAVACAOACACIA, ultima.NUMPEDIDO)
+            return linhas, proximo
+
+        except Exception as e:
+            raise BancoDadosError(
+                f"Erro ao paginar pedidos no período {data_inicio} - {data_fim}: {str(e)}",
+                e,
+                "paginar_pedidos"
+            )
 
     def log_processamento(self, tipo: str, mensagem: str, num_pedido: str = None):
-        """Registra log de processamento com detecção automática de colunas"""
+        """
+        Registra log de processamento em T_LOG_PROCESSAMENTO.
+        O registro entra na fila do ``GravadorLogProcessamento`` do processo e é
+        gravado em lote em segundo plano; falhas nunca interrompem o pedido.
+        """
         try:
-            self._reconnect_if_needed()
-            
-            # Verificar se tabela existe e quais colunas estão disponíveis
-            try:
-                columns = self._get_log_table_columns()
-                
-                if not columns:
-                    logger.debug(f"📝 Tabela de log não disponível: [{tipo}] {mensagem}")
-                    return
-                
-                # Preparar query baseada nas colunas disponíveis
-                base_columns = ['TIPO', 'MENSAGEM']
-                base_values = [tipo, mensagem[:500]]  # Limitar mensagem
-                
-                # Adicionar colunas opcionais se existirem
-                if 'NUM_PEDIDO' in columns and num_pedido:
-                    base_columns.append('NUM_PEDIDO')
-                    base_values.append(num_pedido)
-                
-                # Verificar possíveis nomes para coluna de data
-                date_column = None
-                for col_name in ['DATA_LOG', 'DATETIME_LOG', 'DATA_HORA', 'TIMESTAMP_LOG', 'CREATED_AT']:
-                    if col_name in columns:
-                        date_column = col_name
-                        break
-                
-                if date_column:
-                    base_columns.append(date_column)
-                    base_values.append(datetime.now())
-                
-                # Montar query
-                placeholders = ', '.join(['?' for _ in base_values])
-                query = f"""
-                    INSERT INTO T_LOG_PROCESSAMENTO ({', '.join(base_columns)})
-                    VALUES ({placeholders})
-                """
-                
-                params = tuple(base_values)
-                self._execute_with_logging(query, params, "LOG_PROCESSAMENTO")
-                self.conn.commit()
-                
-            except pyodbc.Error as e:
-                error_msg = str(e).lower()
-                if any(x in error_msg for x in ["invalid object", "table", "não existe", "invalid column"]):
-                    logger.debug(f"📝 Tabela de log não disponível: [{tipo}] {mensagem}")
-                else:
-                    logger.warning(f"⚠️ Erro ao registrar log no banco: {e}")
-                    logger.debug(f"📝 Log local: [{tipo}] {mensagem}")
-                    
+            if self.log_buffer is None:
+                logger.debug(f"📝 Log local: [{tipo}] {mensagem}")
+                return
+            self.log_buffer.registrar(tipo, mensagem, num_pedido)
         except Exception as e:
             # Não falhar o processo principal por causa de log
             logger.warning(f"⚠️ Erro no sistema de log: {e}")
             logger.debug(f"📝 Log local: [{tipo}] {mensagem}")
 
-    def get_estatisticas(self) -> dict:
-        """Retorna estatísticas básicas dos pedidos"""
+    def get_estatisticas(self, usar_cache: bool = True) -> dict:
+        """
+        Retorna estatísticas básicas dos pedidos.
+        Dias anteriores vêm do resumo diário T_ESTATISTICA_PEDIDO_DIA
+        (consolidado fora da gravação, ver ``consolidar_estatisticas``) e
+        o dia atual de uma consulta por intervalo em T_PEDIDO_SOBEL; o
+        resultado fica em cache por ``DB_ESTATISTICAS_TTL`` segundos.
+        """
+        with self._estatisticas_lock:
+            cache = PedidoRepository._estatisticas_cache
+            idade = time.monotonic() - PedidoRepository._estatisticas_lidas_em
+            if usar_cache and cache is not None and idade < settings.DB_ESTATISTICAS_TTL:
+                return dict(cache)
+
         try:
             self._reconnect_if_needed()
-            
-            stats = {}
-            
-            # Total de pedidos
-            query1 = "SELECT COUNT(*) FROM T_PEDIDO_SOBEL"
-            self._execute_with_logging(query1, (), "STATS_TOTAL")
-            stats['total_pedidos'] = self.cursor.fetchone()[0]
-            
-            # Pedidos hoje
-            query2 = """
-                SELECT COUNT(*) FROM T_PEDIDO_SOBEL 
-                WHERE CAST(DATAGRAVACAOACACIA AS DATE) = CAST(GETDATE() AS DATE)
-            """
-            self._execute_with_logging(query2, (), "STATS_HOJE")
-            stats['pedidos_hoje'] = self.cursor.fetchone()[0]
-            
-            # Valor total hoje
-            query3 = """
-                SELECT ISNULL(SUM(VALORBRUTO), 0) FROM T_PEDIDO_SOBEL 
-                WHERE CAST(DATAGRAVACAOACACIA AS DATE) = CAST(GETDATE() AS DATE)
-            """
-            self._execute_with_logging(query3, (), "STATS_VALOR")
-            stats['valor_hoje'] = float(self.cursor.fetchone()[0])
-            
-            return stats
-            
+
+            stats = None
+            if self.usar_resumo_estatisticas:
+                stats = self._estatisticas_resumo()
+            if stats is None:
+                stats = self._estatisticas_agregadas()
+
+            with self._estatisticas_lock:
+                PedidoRepository._estatisticas_cache = stats
+                PedidoRepository._estatisticas_lidas_em = time.monotonic()
+            return dict(stats)
+
         except Exception as e:
             logger.error(f"⚠️ Erro ao obter estatísticas: {e}")
             return {'total_pedidos': 0, 'pedidos_hoje': 0, 'valor_hoje': 0.0}
 
+    def _estatisticas_resumo(self) -> Optional[dict]:
+        """
+        Resumo dos dias anteriores (consolidado uma vez por dia) mais os
+        pedidos gravados a partir de hoje; ``None`` se a tabela não existir
+        """
+        hoje = datetime.combine(datetime.now().date(), datetime.min.time())
+        try:
+            if PedidoRepository._estatisticas_consolidadas_em != hoje.date():
+                try:
+                    self.consolidar_estatisticas()
+                except BancoDadosError as e:
+                    if self._tabela_inexistente(e):
+                        raise
+                    # Consolidação concorrente ou falha passageira: o resumo atual continua valendo
+                    logger.warning(f"⚠️ {e.message}")
+            self._execute_with_logging(
+                "SELECT ISNULL(SUM(QTDEPEDIDOS), 0) FROM T_ESTATISTICA_PEDIDO_DIA", (), "STATS_RESUMO"
+            )
+        except (pyodbc.ProgrammingError, BancoDadosError) as e:
+            if not self._tabela_inexistente(e):
+                raise
+            logger.warning("⚠️ T_ESTATISTICA_PEDIDO_DIA não encontrada - agregando T_PEDIDO_SOBEL")
+            PedidoRepository.usar_resumo_estatisticas = self.usar_resumo_estatisticas = False
+            return None
+        anteriores = self.cursor.fetchone()[0]
+
+        # Por intervalo: busca no IX_PEDIDO_DATAGRAVACAO (data/estatisticas_pedido.sql), só as linhas de hoje
+        query = """
+            SELECT COUNT(*),
+                   ISNULL(SUM(CASE WHEN DATAGRAVACAOACACIA < ? THEN 1 ELSE 0 END), 0),
+                   ISNULL(SUM(CASE WHEN DATAGRAVACAOACACIA < ? THEN VALORBRUTO ELSE 0 END), 0)
+            FROM T_PEDIDO_SOBEL
+            WHERE DATAGRAVACAOACACIA >= ?
+        """
+        amanha = hoje + timedelta(days=1)
+        self._execute_with_logging(query, (amanha, amanha, hoje), "STATS_HOJE")
+        a_partir_de_hoje, pedidos_hoje, valor_hoje = self.cursor.fetchone()
+        return {
+            'total_pedidos': int(anteriores) + int(a_partir_de_hoje),
+            'pedidos_hoje': int(pedidos_hoje),
+            'valor_hoje': float(valor_hoje),
+        }
+
+    @staticmethod
+    def _tabela_inexistente(erro: Exception) -> bool:
+        mensagem = str(erro).lower()
+        return "42s02" in mensagem or "invalid object name" in mensagem
+
+    def _estatisticas_agregadas(self) -> dict:
+        """Estatísticas calculadas direto em T_PEDIDO_SOBEL (sem o resumo diário)"""
+        stats = {}
+
+        # Total de pedidos
+        query1 = "SELECT COUNT(*) FROM T_PEDIDO_SOBEL"
+        self._execute_with_logging(query1, (), "STATS_TOTAL")
+        stats['total_pedidos'] = self.cursor.fetchone()[0]
+
+        # Pedidos e valor de hoje, por intervalo para poder usar índice em DATAGRAVACAOACACIA
+        hoje = datetime.combine(datetime.now().date(), datetime.min.time())
+        query2 = """
+            SELECT COUNT(*), ISNULL(SUM(VALORBRUTO), 0) FROM T_PEDIDO_SOBEL
+            WHERE DATAGRAVACAOACACIA >= ? AND DATAGRAVACAOACACIA < ?
+        """
+        self._execute_with_logging(query2, (hoje, hoje + timedelta(days=1)), "STATS_HOJE")
+        pedidos_hoje, valor_hoje = self.cursor.fetchone()
+        stats['pedidos_hoje'] = pedidos_hoje
+        stats['valor_hoje'] = float(valor_hoje)
+
+        return stats
+
+    @classmethod
+    def invalidar_estatisticas(cls):
+        """Descarta as estatísticas em cache (chamado após cada commit de pedidos)"""
+        with cls._estatisticas_lock:
+            cls._estatisticas_cache = None
+
+    def consolidar_estatisticas(self) -> int:
+        """
+        Acrescenta a T_ESTATISTICA_PEDIDO_DIA os dias já encerrados que
+        ainda não estão no resumo e recalcula o grupo de pedidos sem
+        DATAGRAVACAOACACIA (dia 1900-01-01). Roda fora da gravação de
+        pedidos (no máximo uma vez por dia, na leitura das estatísticas)
+        e só lê intervalos de DATAGRAVACAOACACIA, sem bloquear inserções.
+        Retorna a quantidade de dias acrescentados.
+        """
+        try:
+            self._reconnect_if_needed()
+            self.conn.autocommit = False
+            dias = self._acrescentar_dias_encerrados()
+            self.conn.commit()
+            PedidoRepository._estatisticas_consolidadas_em = datetime.now().date()
+            if dias:
+                logger.info(f"📊 Resumo diário consolidado: {dias} dia(s) acrescentado(s)")
+            return dias
+
+        except Exception as e:
+            try:
+                self.conn.rollback()
+            except Exception:
+                pass
+            raise BancoDadosError(f"Erro ao consolidar estatísticas: {str(e)}", e, "consolidar_estatisticas")
+        finally:
+            try:
+                self.conn.autocommit = True
+            except:
+                pass
+
+    def _acrescentar_dias_encerrados(self) -> int:
+        """Corpo de ``consolidar_estatisticas``, na transaction de quem chama"""
+        hoje = datetime.combine(datetime.now().date(), datetime.min.time())
+        dia = "CAST(DATAGRAVACAOACACIA AS DATE)"
+        self._execute_with_logging(
+            "SELECT MAX(DATA) FROM T_ESTATISTICA_PEDIDO_DIA WHERE DATA > '1900-01-01'", (), "STATS_ULTIMO_DIA"
+        )
+        ultimo = self.cursor.fetchone()[0]
+        filtro, params = "DATAGRAVACAOACACIA < ?", [hoje]
+        if ultimo is not None:
+            if isinstance(ultimo, str):
+                ultimo = datetime.fromisoformat(ultimo[:10])
+            inicio = datetime.combine(ultimo, datetime.min.time()) + timedelta(days=1)
+            filtro, params = "DATAGRAVACAOACACIA >= ? AND DATAGRAVACAOACACIA < ?", [inicio, hoje]
+
+        self._execute_with_logging(f"""
+            INSERT INTO T_ESTATISTICA_PEDIDO_DIA (DATA, QTDEPEDIDOS, VALORBRUTO, DATAATUALIZACAO)
+            SELECT {dia}, COUNT(*), ISNULL(SUM(VALORBRUTO), 0), GETDATE()
+            FROM T_PEDIDO_SOBEL
+            WHERE {filtro}
+            GROUP BY {dia}
+        """, tuple(params), "STATS_CONSOLIDAR")
+        dias = max(self.cursor.rowcount, 0)
+
+        self._execute_with_logging(
+            "DELETE FROM T_ESTATISTICA_PEDIDO_DIA WHERE DATA = '1900-01-01'", (), "STATS_SEM_DATA_LIMPAR"
+        )
+        self._execute_with_logging("""
+            INSERT INTO T_ESTATISTICA_PEDIDO_DIA (DATA, QTDEPEDIDOS, VALORBRUTO, DATAATUALIZACAO)
+            SELECT '1900-01-01', COUNT(*), ISNULL(SUM(VALORBRUTO), 0), GETDATE()
+            FROM T_PEDIDO_SOBEL
+            WHERE DATAGRAVACAOACACIA IS NULL
+            HAVING COUNT(*) > 0
+        """, (), "STATS_SEM_DATA")
+
+        return dias
+
+    def reconstruir_estatisticas(self) -> int:
+        """
+        Recalcula T_ESTATISTICA_PEDIDO_DIA a partir de todo o histórico de
+        T_PEDIDO_SOBEL até ontem (carga inicial e correção de divergências).
+        O dia atual é sempre lido de T_PEDIDO_SOBEL, então a reconstrução
+        não bloqueia as inserções.
+        Retorna a quantidade de dias gravados no resumo.
+        """
+        try:
+            self._reconnect_if_needed()
+            self.conn.autocommit = False
+            self._execute_with_logging("DELETE FROM T_ESTATISTICA_PEDIDO_DIA", (), "STATS_LIMPAR")
+            self._acrescentar_dias_encerrados()
+
+            self._execute_with_logging(
+                "SELECT COUNT(*), ISNULL(SUM(QTDEPEDIDOS), 0) FROM T_ESTATISTICA_PEDIDO_DIA", (), "STATS_DIAS"
+            )
+            dias, total_pedidos = self.cursor.fetchone()
+            self.conn.commit()
+            PedidoRepository._estatisticas_consolidadas_em = datetime.now().date()
+            self.invalidar_estatisticas()
+            logger.info(f"📊 Resumo diário reconstruído: {total_pedidos} pedido(s) em {dias} dia(s)")
+            return dias
+
+        except Exception as e:
+            try:
+                self.conn.rollback()
+            except Exception:
+                pass
+            raise BancoDadosError(f"Erro ao reconstruir estatísticas: {str(e)}", e, "reconstruir_estatisticas")
+        finally:
+            try:
+                self.conn.autocommit = True
+            except:
+                pass
+
     def close(self):
         """Fecha conexões com tratamento de erro"""
         try:
+            if self.log_buffer:
+                # O gravador é do processo: só descarrega o que este repositório registrou
+                self.log_buffer.descarregar()
             if self.cursor:
                 self.cursor.close()
                 self.cursor = None
             if self.conn:
-                self.conn.close()
+                # Devolve a conexão ao pool compartilhado
+                self.db.close()
                 self.conn = None
-            logger.debug("🔌 Conexão com banco fechada")
+            logger.debug("🔌 Conexão com banco devolvida ao pool")
         except Exception as e:
             logger.warning(f"⚠️ Erro ao fechar conexão: {e}")
 
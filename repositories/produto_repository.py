@@ -5,53 +5,162 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 import re
-from typing import Optional
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional, Set, Tuple
 import pyodbc
 from models.produto import Produto
+from services.catalogo_produtos import codigo_base, indexar_gtins
+from services.database import Database
+from config.settings import settings
+from utils.gtin import formas_gtin, grafias_gtin
 from utils.logger import logger
+from utils.mapeador_linhas import MapeadorLinhas, texto
+
+# Curingas do LIKE, escapados nos códigos base
+_RE_CURINGA = re.compile(r"[\\%_\[]")
 
 class ProdutoRepository:
-    def __init__(self, conn: pyodbc.Connection):
+    # Parâmetros por consulta em resolver_produtos (o limite do SQL Server é 2100)
+    LIMITE_PARAMETROS = 2000
+
+    COLUNAS_PRODUTO = """
+                    B1_COD AS CODIGO,
+                    B1_DESC AS DESCRICAO,
+                    B1_CODBAR AS EAN13,
+                    B1_ZZCODBA AS DUN14,
+                    B1_PESBRU AS PESOBRUTO,
+                    B1_PESO AS PESOLIQUIDO,
+                    B1_QE AS QTDEEMBALAGEM,
+                    B1_UM AS UNIDPRODUTO,
+                    0 AS PERCACRESCMAX,
+                    CASE WHEN B1_MSBLQL = '1' THEN 0 ELSE 1 END AS FLAGUSO,
+                    0 AS CESP_FLAGVERBA"""
+
+    # Coluna do SB1010 -> atributo de Produto (números como vieram do banco)
+    MAPEADOR = MapeadorLinhas(Produto, (
+        ("CODIGO", "codigo", texto),
+        ("DESCRICAO", "descricao", texto),
+        ("EAN13", "ean13", texto),
+        ("DUN14", "dun14", texto),
+        ("PESOBRUTO", "peso_bruto", None),
+        ("PESOLIQUIDO", "peso_liquido", None),
+        ("QTDEEMBALAGEM", "qtde_embalagem", None),
+        ("UNIDPRODUTO", "unidade", texto),
+        ("PERCACRESCMAX", "perc_acresc_max", None),
+        ("FLAGUSO", "flag_uso", None),
+        ("CESP_FLAGVERBA", "flag_verba", None),
+    ))
+
+    def __init__(self, conn: Optional[pyodbc.Connection] = None):
+        """
+        Sem ``conn`` explícita, cada consulta empresta uma conexão
+        do pool compartilhado do banco Protheus.
+        """
         self.conn = conn
+        self.db = Database(settings.DB_NAME_PROTHEUS) if conn is None else None
+
+    @contextmanager
+    def _conexao(self):
+        if self.conn is not None:
+            yield self.conn
+        else:
+            with self.db.conexao() as conn:
+                yield conn
 
     def buscar_produto(self, ean13: str, dun14: str, codprod: str) -> Optional[Produto]:
-        cursor = self.conn.cursor()
-
-        # 1ª tentativa: EAN13
-        query_ean = "SELECT * FROM SB1010 WHERE B1_CODBAR = ?"
-        logger.sql(query_ean, ean13)
-        row = cursor.execute(query_ean, ean13).fetchone()
-        if row:
-            return self._mapear(row)
-
-        # 2ª tentativa: DUN14
-        query_dun = "SELECT * FROM SB1010 WHERE B1_ZZCODBA = ?"
-        logger.sql(query_dun, dun14)
-        row = cursor.execute(query_dun, dun14).fetchone()
-        if row:
-            return self._mapear(row)
-
-        # 3ª tentativa: CODPROD (sem sufixo)
-        cod_sem_sufixo = re.sub(r"\.\w+$", "", codprod)
-        query_cod = "SELECT * FROM SB1010 WHERE B1_COD LIKE ?"
-        logger.sql(query_cod, f"{cod_sem_sufixo}.%")
-        row = cursor.execute(query_cod, f"{cod_sem_sufixo}.%").fetchone()
-        if row:
-            return self._mapear(row)
-
-        return None
+        chave = (ean13, dun14, codprod)
+        return self.resolver_produtos([chave])[chave]
+
+    def resolver_produtos(self, itens: Iterable[Tuple[str, str, str]]) -> Dict[Tuple[str, str, str], Optional[Produto]]:
+        """
+        Resolve os itens ``(ean13, dun14, codprod)`` de um pedido (ou de uma
+        página de pedidos) com uma consulta ao SB1010 por bloco de até
+        ``LIMITE_PARAMETROS`` parâmetros, em vez de até três consultas por item.
+
+        Mesma prioridade do catálogo em memória: EAN13, depois DUN14 (cada
+        um em qualquer grafia de GTIN, em B1_CODBAR ou B1_ZZCODBA), depois
+        código exato (``B1_COD IN``) e só então código base: um produto com
+        sufixo cujo ``codigo_base`` é o do código informado (``B1_COD LIKE
+        'base.%'`` sem outro ``.``), o de menor B1_COD entre os irmãos.
+        Retorna um dict com cada item informado e o ``Produto`` ou ``None``.
+        """
+        normalizados = {}
+        for chave in dict.fromkeys(itens):
+            ean13, dun14, codprod = (_limpar(codigo) for codigo in chave)
+            gtins = formas_gtin(ean13) + formas_gtin(dun14)
+            grafias = set(grafias_gtin(gtins)) | {codigo for codigo in (ean13, dun14) if codigo.isdigit()}
+            normalizados[chave] = (gtins, grafias, codprod, codigo_base(codprod) if codprod else "")
+
+        resultado: Dict[Tuple[str, str, str], Optional[Produto]] = {}
+        with self._conexao() as conn:
+            cursor = conn.cursor()
+            bloco, parametros = {}, 0
+            for chave, item in normalizados.items():
+                custo = 2 * len(item[1]) + 3
+                if bloco and parametros + custo > self.LIMITE_PARAMETROS:
+                    resultado.update(self._resolver_bloco(cursor, bloco))
+                    bloco, parametros = {}, 0
+                bloco[chave] = item
+                parametros += custo
+            if bloco:
+                resultado.update(self._resolver_bloco(cursor, bloco))
+        return resultado
+
+    def _resolver_bloco(self, cursor, normalizados: dict) -> Dict[Tuple[str, str, str], Optional[Produto]]:
+        grafias = sorted(set().union(*(item[1] for item in normalizados.values())))
+        codigos = sorted({codprod for _, _, codprod, _ in normalizados.values() if codprod})
+        bases = sorted({base for _, _, _, base in normalizados.values() if base})
+
+        filtros, params = [], []
+        if grafias:
+            marcadores = ', '.join('?' * len(grafias))
+            filtros.append(f"B1_CODBAR IN ({marcadores}) OR B1_ZZCODBA IN ({marcadores})")
+            params += grafias + grafias
+        if codigos:
+            filtros.append(f"B1_COD IN ({', '.join('?' * len(codigos))})")
+            params += codigos
+        for base in bases:
+            filtros.append("(B1_COD LIKE ? ESCAPE '\\' AND B1_COD NOT LIKE ? ESCAPE '\\')")
+            escapado = _RE_CURINGA.sub(r"\\\g<0>", base)
+            params += [escapado + ".%", escapado + ".%.%"]
+
+        por_gtin: Dict[int, Produto] = {}
+        por_codigo: Dict[str, Produto] = {}
+        por_base: Dict[str, Produto] = {}
+        if filtros:
+            query = f"""
+                SELECT {self.COLUNAS_PRODUTO}
+                FROM SB1010
+                WHERE D_E_L_E_T_ = ''
+                AND ({' OR '.join(filtros)})
+                ORDER BY B1_COD
+            """
+            logger.sql(query, params)
+            cursor.execute(query, params)
+            produtos = [self._mapear(row) for row in cursor.fetchall()]
+            # De trás para frente: em GTIN repetido vale o primeiro B1_COD
+            exatas: Set[int] = set()
+            for produto in reversed(produtos):
+                indexar_gtins(por_gtin, exatas, produto, produto)
+            for produto in produtos:
+                por_codigo.setdefault(produto.codigo, produto)
+                base = codigo_base(produto.codigo)
+                if base != produto.codigo:
+                    por_base.setdefault(base, produto)
+
+        return {
+            chave: (
+                next((por_gtin[gtin] for gtin in gtins if gtin in por_gtin), None)
+                or por_codigo.get(codprod)
+                or (base and por_base.get(base))
+                or None
+            )
+            for chave, (gtins, _, codprod, base) in normalizados.items()
+        }
 
     def _mapear(self, row) -> Produto:
-        return Produto(
-            codigo=row.CODIGO.strip(),
-            descricao=row.DESCRICAO.strip(),
-            ean13=row.EAN13.strip(),
-            dun14=row.DUN14.strip(),
-            peso_bruto=row.PESOBRUTO,
-            peso_liquido=row.PESOLIQUIDO,
-            qtde_embalagem=row.QTDEEMBALAGEM,
-            unidade=row.UNIDPRODUTO.strip(),
-            perc_acresc_max=row.PERCACRESCMAX,
-            flag_uso=row.FLAGUSO,
-            flag_verba=row.CESP_FLAGVERBA
-        )
+        return self.MAPEADOR.mapear_por_nome(row)
+
+
+def _limpar(valor: Optional[str]) -> str:
+    return valor.strip() if valor else ""
@@ -0,0 +1,34 @@
+# scripts/backfill_estatisticas.py
+"""
+Carga do resumo diário T_ESTATISTICA_PEDIDO_DIA a partir do histórico de
+T_PEDIDO_SOBEL. Rode uma vez depois de data/estatisticas_pedido.sql e
+sempre que quiser corrigir divergências; o resumo (até ontem) é
+recalculado do zero sem bloquear a gravação de pedidos.
+
+    python scripts/backfill_estatisticas.py
+"""
+import sys
+import os
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import time
+from repositories.pedido_repository import PedidoRepository
+
+
+def main():
+    argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter).parse_args()
+
+    with PedidoRepository() as repo:
+        inicio = time.perf_counter()
+        dias = repo.reconstruir_estatisticas()
+        duracao = time.perf_counter() - inicio
+        stats = repo.get_estatisticas(usar_cache=False)
+
+    print(f"Resumo reconstruído em {duracao:.2f}s: {dias} dia(s), {stats['total_pedidos']} pedido(s)")
+    print(f"Hoje: {stats['pedidos_hoje']} pedido(s), R$ {stats['valor_hoje']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# scripts/bench_importacao.py
+"""
+Benchmark da importação completa (documento Neogrid -> validação ->
+gravação) contra o banco local SQLite (DB_BACKEND=sqlite).
+
+Gera N documentos a partir de data/dois_pedidos.json (docId e número do
+pedido variam), processa cada um pelo mesmo caminho do app e mostra a
+vazão e a latência por pedido (p50/p95/p99). Roda sem SQL Server.
+
+    python scripts/bench_importacao.py [--pedidos 500] [--banco /tmp/bench.db] [--grupo 0]
+"""
+import sys
+import os
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import copy
+import json
+import tempfile
+import time
+from datetime import datetime
+from typing import List
+
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pedidos", type=int, default=500, help="documentos importados")
+    parser.add_argument("--banco", default=None, help="arquivo SQLite (padrão: temporário, recriado)")
+    parser.add_argument("--grupo", type=int, default=0, help="pedidos por group commit (0 = um commit por pedido)")
+    parser.add_argument("--modelo", default=os.path.join("data", "dois_pedidos.json"), help="documentos usados como modelo")
+    return parser.parse_args()
+
+
+def _gerar_documentos(modelo: str, quantidade: int) -> List[dict]:
+    with open(modelo, encoding="utf-8") as arquivo:
+        modelos = json.load(arquivo)["documents"]
+
+    documentos = []
+    for n in range(quantidade):
+        doc = copy.deepcopy(modelos[n % len(modelos)])
+        # Numéricos, como os da Neogrid, fora da faixa dos pedidos reais
+        doc["docId"] = str(900000000 + n)
+        cabecalho = doc["content"][0]["order"]["cabecalho"]
+        cabecalho["numeroPedidoComprador"] = str(900000000 + n)
+        documentos.append(doc)
+    return documentos
+
+
+def _falhas(resultados: List[dict]) -> int:
+    return sum(1 for resultado in resultados if resultado["status"] != "sucesso")
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def main():
+    args = _argumentos()
+    banco = args.banco or os.path.join(tempfile.mkdtemp(prefix="bench_neogrid_"), "neogrid_local.db")
+
+    # O backend precisa estar definido antes de carregar config.settings
+    os.environ["DB_BACKEND"] = "sqlite"
+    os.environ["DB_SQLITE_PATH"] = banco
+
+    from models.pedido import Pedido
+    from repositories.gravador_pedidos import GravadorPedidosEmGrupo
+    from repositories.pedido_repository import PedidoRepository
+    from services.processador_pedido import ProcessadorPedido
+    from services.processador_pedido_item import ProcessadorPedidoItem
+    from services.validador_cliente import ValidadorCliente
+    from services.validador_produto import ValidadorProduto
+    from utils.error_handler import NeogridError
+    from utils.helpers import interpretar_codigo_produto
+
+    documentos = _gerar_documentos(args.modelo, args.pedidos)
+    processador = ProcessadorPedido(ValidadorCliente(), ProcessadorPedidoItem(ValidadorProduto()))
+    latencias: List[float] = []
+    erros = 0
+
+    with PedidoRepository() as repo:
+        gravador = GravadorPedidosEmGrupo(repo, tamanho_grupo=args.grupo) if args.grupo > 0 else None
+        inicio_total = time.perf_counter()
+        # Clientes de todos os documentos validados em lote, como a página no app
+        clientes = processador.resolver_clientes(
+            Pedido(doc["content"][0]).cnpj_destino for doc in documentos
+        )
+
+        for doc in documentos:
+            inicio = time.perf_counter()
+            try:
+                pedido = Pedido(doc["content"][0])
+                pedido_json = {
+                    "num_pedido": pedido.numero_pedido,
+                    "num_pedido_afv": doc["docId"],
+                    "ordem_compra": pedido.numero_pedido,
+                    "data_pedido": pedido.data_emissao.strftime("%Y-%m-%d") if pedido.data_emissao else "",
+                    "data_entrega": pedido.data_entrega.strftime("%Y-%m-%d") if pedido.data_entrega else None,
+                    "hora_inicio": datetime.now().strftime("%H:%M"),
+                    "hora_fim": None,
+                    "observacao": pedido.condicao_entrega or "",
+                    "cnpj": pedido.cnpj_destino,
+                    "itens": [],
+                }
+                for item in pedido.itens:
+                    ean13, dun14, codprod = interpretar_codigo_produto(item.codigo_produto)
+                    pedido_json["itens"].append({
+                        "ean13": ean13, "dun14": dun14, "codprod": codprod,
+                        "qtd": float(item.quantidade), "valor": float(item.preco_unitario),
+                    })
+
+                pedido_final = processador.processar(pedido_json, clientes)
+                if gravador is not None:
+                    erros += _falhas(gravador.adicionar(pedido_final, doc["docId"]))
+                else:
+                    repo.inserir_pedido(pedido_final)
+            except NeogridError as e:
+                erros += 1
+                if erros == 1:
+                    print(f"Primeiro erro: {e.message}")
+            latencias.append(time.perf_counter() - inicio)
+
+        if gravador is not None:
+            erros += _falhas(gravador.descarregar())
+        duracao = time.perf_counter() - inicio_total
+        repo.log_buffer.descarregar()
+
+    gravados = len(latencias) - erros
+    print(f"Banco local: {banco}")
+    print(f"Pedidos: {len(latencias)} | gravados: {gravados} | erros: {erros}")
+    print(f"Vazão: {len(latencias) / duracao:,.1f} pedidos/s em {duracao:.2f}s")
+    print(
+        "Latência por pedido (ms): "
+        f"p50={_percentil(latencias, 50) * 1e3:.2f} "
+        f"p95={_percentil(latencias, 95) * 1e3:.2f} "
+        f"p99={_percentil(latencias, 99) * 1e3:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
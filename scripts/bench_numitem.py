@@ -0,0 +1,85 @@
+# scripts/bench_numitem.py
+"""
+Benchmark da alocação de NUMITEM: MAX(NUMITEM)+1 x reserva em blocos.
+
+Usa SQLite em memória como substituto do SQL Server apenas para mostrar
+a tendência: o custo do MAX()+1 cresce com a tabela (sem índice em
+NUMITEM, como no legado), enquanto a reserva em blocos fica constante.
+
+    python scripts/bench_numitem.py [--itens-por-pedido 5] [--pedidos 200]
+"""
+import sys
+import os
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import sqlite3
+import time
+from repositories.alocador_numitem import AlocadorNumItem
+
+TAMANHOS = (1_000, 10_000, 100_000, 1_000_000)
+
+
+def _criar_banco() -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    conn.execute("CREATE TABLE T_PEDIDOITEM_SOBEL (NUMITEM INTEGER, NUMPEDIDOSOBEL TEXT)")
+    conn.execute("CREATE TABLE T_NUMITEM_HILO (PROXIMO INTEGER NOT NULL)")
+    conn.execute("INSERT INTO T_NUMITEM_HILO VALUES (1)")
+    return conn
+
+
+def _crescer_tabela(conn: sqlite3.Connection, ate: int):
+    atual = conn.execute("SELECT COUNT(*) FROM T_PEDIDOITEM_SOBEL").fetchone()[0]
+    conn.executemany(
+        "INSERT INTO T_PEDIDOITEM_SOBEL VALUES (?, 'BENCH')",
+        ((n,) for n in range(atual + 1, ate + 1)),
+    )
+    conn.execute("UPDATE T_NUMITEM_HILO SET PROXIMO = ?", (ate + 1,))
+
+
+def _max_mais_um(conn: sqlite3.Connection, pedidos: int, itens: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(pedidos):
+        conn.execute("BEGIN IMMEDIATE")  # equivalente ao TABLOCKX
+        conn.execute("SELECT COALESCE(MAX(NUMITEM), 0) + 1 FROM T_PEDIDOITEM_SOBEL").fetchone()
+        conn.execute("ROLLBACK")
+    return (time.perf_counter() - inicio) / pedidos
+
+
+def _reserva_em_blocos(conn: sqlite3.Connection, pedidos: int, itens: int, bloco: int) -> float:
+    def reservar_faixa(tamanho: int) -> int:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("UPDATE T_NUMITEM_HILO SET PROXIMO = PROXIMO + ?", (tamanho,))
+        primeiro = conn.execute("SELECT PROXIMO - ? FROM T_NUMITEM_HILO", (tamanho,)).fetchone()[0]
+        conn.execute("COMMIT")
+        return primeiro
+
+    alocador = AlocadorNumItem(bloco)
+    inicio = time.perf_counter()
+    for _ in range(pedidos):
+        alocador.alocar(itens, reservar_faixa)
+    return (time.perf_counter() - inicio) / pedidos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pedidos", type=int, default=200, help="pedidos alocados por medição")
+    parser.add_argument("--itens-por-pedido", type=int, default=5)
+    parser.add_argument("--bloco", type=int, default=500, help="tamanho do bloco reservado")
+    parser.add_argument("--max-linhas", type=int, default=TAMANHOS[-1])
+    args = parser.parse_args()
+
+    conn = _criar_banco()
+    print(f"{'linhas':>10} | {'MAX()+1 (µs/pedido)':>20} | {'blocos (µs/pedido)':>19}")
+    print("-" * 56)
+    for tamanho in (t for t in TAMANHOS if t <= args.max_linhas):
+        _crescer_tabela(conn, tamanho)
+        legado = _max_mais_um(conn, args.pedidos, args.itens_por_pedido)
+        blocos = _reserva_em_blocos(conn, args.pedidos, args.itens_por_pedido, args.bloco)
+        print(f"{tamanho:>10,} | {legado * 1e6:>20.1f} | {blocos * 1e6:>19.1f}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# scripts/compilar_catalogo.py
+"""
+Compila data/produtos.json no catálogo binário que o ValidadorProduto
+abre com mmap. Rode sempre que o JSON mudar: enquanto o compilado for mais
+antigo que o JSON, o validador volta a ler o JSON. Cada compilação grava
+data/produtos.<n>.bin e aponta data/produtos.bin para ele; os processos em
+execução trocam para o novo arquivo na próxima verificação
+(PRODUTOS_RECARGA_INTERVALO) e fecham o anterior.
+
+    python scripts/compilar_catalogo.py [--origem data/produtos.json] [--destino data/produtos.bin]
+"""
+import sys
+import os
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import time
+from services.catalogo_binario import CatalogoBinario, compilar_catalogo
+from services.validador_produto import ARQUIVO_PRODUTOS, ValidadorProduto
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--origem", default=ARQUIVO_PRODUTOS)
+    parser.add_argument("--destino", default=None, help="padrão: origem com extensão .bin")
+    args = parser.parse_args()
+    destino = args.destino or os.path.splitext(args.origem)[0] + ".bin"
+
+    inicio = time.perf_counter()
+    catalogo = ValidadorProduto(arquivo=args.origem, arquivo_compilado="").catalogo
+    if not catalogo:
+        raise SystemExit(f"Nenhum produto carregado de {args.origem}")
+    registros = compilar_catalogo(catalogo.produtos, destino)
+    duracao = time.perf_counter() - inicio
+
+    compilado = CatalogoBinario(destino)
+    try:
+        print(
+            f"Catálogo compilado em {duracao:.2f}s: {registros} registro(s), {len(compilado)} produto(s) "
+            f"-> {compilado.arquivo}"
+        )
+        print(f"Tamanho: {os.path.getsize(compilado.arquivo) / 1024:.1f} KiB")
+    finally:
+        compilado.fechar()
+
+
+if __name__ == "__main__":
+    main()
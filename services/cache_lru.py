@@ -0,0 +1,106 @@
+# services/cache_lru.py
+import sys
+import os
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# Devolvido por ``obter`` quando a chave não está no cache (``None`` é um valor válido)
+AUSENTE = object()
+
+
+class CacheLRU:
+    """
+    Cache limitado a ``max_itens`` entradas, com expiração por TTL.
+
+    Valores ``None`` são resultados negativos ("não encontrado") e expiram
+    após ``ttl_negativo`` segundos, normalmente menor que ``ttl``, para que
+    um cadastro novo apareça rápido. Ao passar do limite a entrada usada
+    há mais tempo é descartada. Seguro para uso entre threads.
+    """
+
+    def __init__(
+        self,
+        max_itens: int = 1000,
+        ttl: float = 300.0,
+        ttl_negativo: Optional[float] = None,
+        relogio: Callable[[], float] = time.monotonic,
+    ):
+        if max_itens < 1:
+            raise ValueError("max_itens deve ser maior que zero")
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self.ttl_negativo = ttl if ttl_negativo is None else ttl_negativo
+        self._relogio = relogio
+        self._itens: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._contadores = {
+            "hits": 0,
+            "hits_negativos": 0,
+            "misses": 0,
+            "expirados": 0,
+            "evictions": 0,
+            "invalidacoes": 0,
+        }
+
+    def obter(self, chave: Hashable) -> Any:
+        """Retorna o valor em cache ou ``AUSENTE`` (chave inexistente ou expirada)"""
+        with self._lock:
+            entrada = self._itens.get(chave)
+            if entrada is None:
+                self._contadores["misses"] += 1
+                return AUSENTE
+
+            valor, expira_em = entrada
+            if self._relogio() >= expira_em:
+                del self._itens[chave]
+                self._contadores["expirados"] += 1
+                self._contadores["misses"] += 1
+                return AUSENTE
+
+            self._itens.move_to_end(chave)
+            self._contadores["hits_negativos" if valor is None else "hits"] += 1
+            return valor
+
+    def guardar(self, chave: Hashable, valor: Any):
+        """Guarda o valor; ``None`` usa o TTL negativo"""
+        ttl = self.ttl_negativo if valor is None else self.ttl
+        with self._lock:
+            self._itens[chave] = (valor, self._relogio() + ttl)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+                self._contadores["evictions"] += 1
+
+    def invalidar(self, chave: Hashable) -> bool:
+        """Remove uma chave; retorna se ela estava no cache"""
+        with self._lock:
+            removida = self._itens.pop(chave, None) is not None
+            if removida:
+                self._contadores["invalidacoes"] += 1
+            return removida
+
+    def limpar(self):
+        """Remove todas as entradas (os contadores são mantidos)"""
+        with self._lock:
+            self._contadores["invalidacoes"] += len(self._itens)
+            self._itens.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._itens)
+
+    def metricas(self) -> Dict[str, Any]:
+        with self._lock:
+            consultas = self._contadores["hits"] + self._contadores["hits_negativos"] + self._contadores["misses"]
+            acertos = self._contadores["hits"] + self._contadores["hits_negativos"]
+            return {
+                **self._contadores,
+                "itens": len(self._itens),
+                "max_itens": self.max_itens,
+                "taxa_acerto": acertos / consultas if consultas else 0.0,
+            }
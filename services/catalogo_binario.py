@@ -0,0 +1,300 @@
+# services/catalogo_binario.py
+import sys
+import os
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import mmap
+import re
+import struct
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
+from models.produto import Produto
+from services.catalogo_produtos import codigo_base, indexar_gtins
+from utils.gtin import formas_gtin
+from services.indice_busca_produtos import IndiceBuscaProdutos
+
+# Formato do catálogo compilado (little-endian):
+#
+#   cabeçalho    MAGIA, versão e quantidades de produtos e de chaves de cada seção
+#   produtos     registros de tamanho fixo (_REGISTRO), na ordem do arquivo JSON
+#   GTIN         pares (GTIN-14 inteiro, registro) ordenados pelo inteiro, com
+#                todas as formas de EAN13 e DUN14 (``indexar_gtins``)
+#   código       pares (código completado com \0, registro) ordenados pelo código
+#   código base  idem
+#
+# Mudanças de layout exigem nova VERSAO; arquivos de outra versão são recusados.
+#
+# Cada compilação grava um arquivo novo (produtos.<n>.bin) e ``destino`` passa
+# a ser só um ponteiro (PONTEIRO + nome do arquivo), trocado com os.replace.
+# Um arquivo mapeado nunca é sobrescrito: no Windows o os.replace falha
+# enquanto algum processo mantém o destino aberto com mmap.
+
+MAGIA = b"NGCATPRD"
+VERSAO = 2
+PONTEIRO = b"NGCATREF\n"
+VERSOES_MANTIDAS = 2
+
+_CABECALHO = struct.Struct("<8sHxxIIII")
+_REGISTRO = struct.Struct("<30s120s14s14s6sddddii")
+_CHAVE_GTIN = struct.Struct("<QI")
+_CHAVE_CODIGO = struct.Struct("<30sI")
+_MAIOR_GTIN = 1 << 64
+
+
+class CatalogoIncompativelError(ValueError):
+    """Arquivo não é um catálogo compilado nesta versão do formato"""
+
+
+def _texto(valor: str, tamanho: int, campo: str, codigo: str) -> bytes:
+    dados = valor.encode("utf-8")
+    if len(dados) > tamanho:
+        raise ValueError(f"Produto {codigo}: {campo} maior que {tamanho} bytes")
+    return dados
+
+
+def _versoes(destino: str) -> Dict[int, str]:
+    """Arquivos versionados de ``destino`` existentes, por número de versão"""
+    pasta = os.path.dirname(destino) or "."
+    raiz, extensao = os.path.splitext(os.path.basename(destino))
+    padrao = re.compile(rf"{re.escape(raiz)}\.(\d+){re.escape(extensao or '.bin')}")
+    versoes = {}
+    for nome in os.listdir(pasta):
+        encontrado = padrao.fullmatch(nome)
+        if encontrado:
+            versoes[int(encontrado.group(1))] = os.path.join(pasta, nome)
+    return versoes
+
+
+def _substituir(origem: str, destino: str, tentativas: int = 5):
+    """``os.replace`` com novas tentativas: no Windows falha enquanto outro processo lê o destino"""
+    for tentativa in range(tentativas):
+        try:
+            os.replace(origem, destino)
+            return
+        except PermissionError:
+            if tentativa == tentativas - 1:
+                raise
+            time.sleep(0.1 * (tentativa + 1))
+
+
+def compilar_catalogo(produtos: Iterable[Produto], destino: str) -> int:
+    """
+    Grava o catálogo compilado em um novo arquivo versionado ao lado de
+    ``destino`` e aponta ``destino`` para ele; quem já está lendo segue no
+    arquivo anterior até recarregar. Versões antigas que nenhum processo
+    mantém abertas são removidas. Em chaves repetidas vale o último
+    produto, como em ``CatalogoProdutos``. Retorna a quantidade de registros.
+    """
+    registros: List[bytes] = []
+    por_gtin: Dict[int, int] = {}
+    gtins_exatos: Set[int] = set()
+    por_codigo: Dict[bytes, int] = {}
+    por_codigo_base: Dict[bytes, int] = {}
+
+    for posicao, produto in enumerate(produtos):
+        codigo = _texto(produto.codigo, 30, "código", produto.codigo)
+        registros.append(_REGISTRO.pack(
+            codigo,
+            _texto(produto.descricao, 120, "descrição", produto.codigo),
+            _texto(produto.ean13, 14, "EAN13", produto.codigo),
+            _texto(produto.dun14, 14, "DUN14", produto.codigo),
+            _texto(produto.unidade, 6, "unidade", produto.codigo),
+            produto.peso_bruto, produto.peso_liquido, produto.qtde_embalagem, produto.perc_acresc_max,
+            produto.flag_uso, produto.flag_verba,
+        ))
+
+        indexar_gtins(por_gtin, gtins_exatos, produto, posicao)
+        por_codigo[codigo] = posicao
+        base = codigo_base(produto.codigo)
+        if base != produto.codigo:
+            por_codigo_base[base.encode("utf-8")] = posicao
+
+    # Códigos numéricos longos demais (inválidos como GTIN) não cabem na chave de 64 bits
+    por_gtin = {chave: posicao for chave, posicao in por_gtin.items() if chave < _MAIOR_GTIN}
+
+    versoes = _versoes(destino)
+    versao = max(versoes, default=0) + 1
+    raiz, extensao = os.path.splitext(destino)
+    arquivo_versao = f"{raiz}.{versao}{extensao or '.bin'}"
+
+    temporario = f"{arquivo_versao}.tmp"
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(_CABECALHO.pack(
+            MAGIA, VERSAO, len(registros), len(por_gtin), len(por_codigo), len(por_codigo_base),
+        ))
+        arquivo.writelines(registros)
+        arquivo.writelines(_CHAVE_GTIN.pack(chave, posicao) for chave, posicao in sorted(por_gtin.items()))
+        # O pack completa com \0, o que preserva a ordem dos códigos
+        for chaves in (por_codigo, por_codigo_base):
+            arquivo.writelines(_CHAVE_CODIGO.pack(chave, posicao) for chave, posicao in sorted(chaves.items()))
+    os.replace(temporario, arquivo_versao)
+
+    temporario = f"{destino}.tmp"
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(PONTEIRO + os.path.basename(arquivo_versao).encode("utf-8"))
+    _substituir(temporario, destino)
+
+    for numero, caminho in versoes.items():
+        if numero <= versao - VERSOES_MANTIDAS:
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass  # ainda aberto por algum processo (Windows): fica para a próxima compilação
+    return len(registros)
+
+
+def resolver_catalogo(caminho: str) -> str:
+    """Arquivo de dados do catálogo: segue o ponteiro gravado por ``compilar_catalogo``"""
+    with open(caminho, "rb") as arquivo:
+        conteudo = arquivo.read(len(PONTEIRO) + 255)
+    if not conteudo.startswith(PONTEIRO):
+        return caminho  # catálogo gravado direto no destino (compilações antigas)
+    nome = conteudo[len(PONTEIRO):].decode("utf-8").strip()
+    return os.path.join(os.path.dirname(caminho), nome)
+
+
+class _Chaves:
+    """Sequência somente leitura das chaves de uma seção, para ``bisect``"""
+
+    def __init__(self, dados: mmap.mmap, inicio: int, quantidade: int, formato: struct.Struct):
+        self._dados = dados
+        self._inicio = inicio
+        self._quantidade = quantidade
+        self._formato = formato
+
+    def __len__(self) -> int:
+        return self._quantidade
+
+    def __getitem__(self, indice: int):
+        return self._formato.unpack_from(self._dados, self._inicio + indice * self._formato.size)[0]
+
+    def posicao(self, indice: int) -> int:
+        return self._formato.unpack_from(self._dados, self._inicio + indice * self._formato.size)[1]
+
+    def buscar(self, chave) -> Optional[int]:
+        """Registro da chave por busca binária; ``None`` se não existir"""
+        indice = bisect_left(self, chave)
+        if indice < self._quantidade and self[indice] == chave:
+            return self.posicao(indice)
+        return None
+
+
+class CatalogoBinario:
+    """
+    Catálogo compilado por ``compilar_catalogo``, aberto com ``mmap``.
+
+    Abrir custa só a leitura do cabeçalho; cada busca é uma busca binária
+    nas chaves ordenadas e decodifica apenas o registro encontrado. As
+    páginas do arquivo ficam no cache do sistema operacional e são
+    compartilhadas entre processos. Mesma interface de consulta de
+    ``CatalogoProdutos``, somente leitura. ``fechar`` libera o arquivo.
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self.arquivo = resolver_catalogo(caminho)
+        try:
+            with open(self.arquivo, "rb") as arquivo:
+                tamanho = os.fstat(arquivo.fileno()).st_size
+                if tamanho < _CABECALHO.size:
+                    raise CatalogoIncompativelError(f"Catálogo compilado inválido: {self.arquivo}")
+                self._dados = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            raise CatalogoIncompativelError(f"Catálogo compilado não encontrado: {self.arquivo}") from None
+        try:
+            self._abrir_secoes(tamanho)
+        except Exception:
+            self.fechar()
+            raise
+
+    def _abrir_secoes(self, tamanho: int):
+        magia, versao, produtos, gtins, codigos, codigos_base = _CABECALHO.unpack_from(self._dados, 0)
+        if magia != MAGIA or versao != VERSAO:
+            raise CatalogoIncompativelError(
+                f"Catálogo compilado incompatível (versão {versao}, esperada {VERSAO}): {self.arquivo}"
+            )
+        esperado = (
+            _CABECALHO.size + produtos * _REGISTRO.size
+            + gtins * _CHAVE_GTIN.size + (codigos + codigos_base) * _CHAVE_CODIGO.size
+        )
+        if tamanho != esperado:
+            raise CatalogoIncompativelError(f"Catálogo compilado truncado: {self.arquivo}")
+
+        inicio = _CABECALHO.size + produtos * _REGISTRO.size
+        self._gtin = _Chaves(self._dados, inicio, gtins, _CHAVE_GTIN)
+        inicio += gtins * _CHAVE_GTIN.size
+        self._codigo = _Chaves(self._dados, inicio, codigos, _CHAVE_CODIGO)
+        inicio += codigos * _CHAVE_CODIGO.size
+        self._codigo_base = _Chaves(self._dados, inicio, codigos_base, _CHAVE_CODIGO)
+        self._indice_busca: Optional[IndiceBuscaProdutos] = None
+
+    def fechar(self):
+        """Libera o mmap (e o arquivo, que no Windows não pode ser removido enquanto aberto)"""
+        self._dados.close()
+
+    def _produto(self, posicao: int) -> Produto:
+        (codigo, descricao, ean13, dun14, unidade, peso_bruto, peso_liquido, qtde_embalagem,
+         perc_acresc_max, flag_uso, flag_verba) = _REGISTRO.unpack_from(
+            self._dados, _CABECALHO.size + posicao * _REGISTRO.size
+        )
+        texto: Callable[[bytes], str] = lambda valor: valor.rstrip(b"\0").decode("utf-8")
+        return Produto(
+            codigo=texto(codigo), descricao=texto(descricao), ean13=texto(ean13), dun14=texto(dun14),
+            peso_bruto=peso_bruto, peso_liquido=peso_liquido, qtde_embalagem=qtde_embalagem,
+            unidade=texto(unidade), perc_acresc_max=perc_acresc_max, flag_uso=flag_uso, flag_verba=flag_verba,
+        )
+
+    def _buscar(self, chaves: _Chaves, chave) -> Optional[Produto]:
+        if chave is None:
+            return None
+        posicao = chaves.buscar(chave)
+        return self._produto(posicao) if posicao is not None else None
+
+    def buscar_gtin(self, codigo: str) -> Optional[Produto]:
+        for chave in formas_gtin(codigo):
+            if chave < _MAIOR_GTIN:
+                produto = self._buscar(self._gtin, chave)
+                if produto is not None:
+                    return produto
+        return None
+
+    def _chave_codigo(self, codigo: str) -> Optional[bytes]:
+        chave = codigo.encode("utf-8")
+        return chave.ljust(30, b"\0") if len(chave) <= 30 else None
+
+    def buscar_codigo(self, codigo: str) -> Optional[Produto]:
+        return self._buscar(self._codigo, self._chave_codigo(codigo))
+
+    def buscar_codigo_base(self, codigo: str) -> Optional[Produto]:
+        return self._buscar(self._codigo_base, self._chave_codigo(codigo))
+
+    @property
+    def indice_busca(self) -> IndiceBuscaProdutos:
+        """Índice de busca textual, montado na primeira busca (decodifica o catálogo inteiro)"""
+        indice = self._indice_busca
+        if indice is None:
+            indice = self._indice_busca = IndiceBuscaProdutos(self)
+        return indice
+
+    def __len__(self) -> int:
+        """Quantidade de produtos únicos (por código)"""
+        return len(self._codigo)
+
+    def __iter__(self) -> Iterator[Produto]:
+        """Produtos únicos por código, na ordem em que apareceram"""
+        posicoes = sorted(self._codigo.posicao(i) for i in range(len(self._codigo)))
+        return (self._produto(posicao) for posicao in posicoes)
+
+    def estatisticas(self) -> Dict[str, int]:
+        indices = {
+            'indices_gtin': len(self._gtin),
+            'indices_codigo': len(self._codigo),
+            'indices_codigo_base': len(self._codigo_base),
+        }
+        return {
+            'produtos_unicos': len(self._codigo),
+            'total_indices': sum(indices.values()),
+            **indices,
+        }
@@ -0,0 +1,119 @@
+# services/catalogo_produtos.py
+import sys
+import os
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+from models.produto import Produto
+from services.indice_busca_produtos import IndiceBuscaProdutos
+from utils.gtin import formas_gtin
+
+_RE_SUFIXO = re.compile(r'\.\w+$')
+
+
+def chave_gtin(codigo: str) -> Optional[int]:
+    """EAN13/DUN14 como inteiro do GTIN-14 (zeros à esquerda ignorados); ``None`` se não for numérico"""
+    formas = formas_gtin(codigo)
+    return formas[0] if formas else None
+
+
+def indexar_gtins(indice: Dict[int, Any], exatas: Set[int], produto: Produto, valor: Any):
+    """
+    Indexa ``valor`` sob todas as formas do EAN13 e do DUN14 do produto.
+    Formas exatas (o próprio GTIN) valem sobre as derivadas (item base de
+    um DUN14); entre iguais vale o último produto.
+    """
+    derivadas = []
+    for codigo in (produto.ean13, produto.dun14):
+        formas = formas_gtin(codigo)
+        if formas:
+            indice[formas[0]] = valor
+            exatas.add(formas[0])
+            derivadas += formas[1:]
+    for chave in derivadas:
+        if chave not in exatas:
+            indice[chave] = valor
+
+
+def codigo_base(codigo: str) -> str:
+    """Código sem o último sufixo (``1001.01.03X05L`` -> ``1001.01``)"""
+    return _RE_SUFIXO.sub('', codigo)
+
+
+class CatalogoProdutos:
+    """
+    Produtos carregados em memória com um índice por dimensão de busca.
+
+    Os produtos ficam em uma lista (na ordem do arquivo) e cada índice é
+    um dict próprio: GTIN por inteiro (EAN13, DUN14 e item base do DUN14,
+    ver ``utils.gtin``), código e código base por texto. Busca e estatísticas não percorrem o catálogo, e o custo por
+    SKU é fixo. Em chaves repetidas vale o último produto, como antes.
+    O índice de busca textual é montado no primeiro uso após cada inclusão.
+    """
+
+    __slots__ = ("produtos", "por_gtin", "_gtins_exatos", "por_codigo", "por_codigo_base", "_indice_busca")
+
+    def __init__(self, produtos: Iterable[Produto] = ()):
+        self.produtos: List[Produto] = []
+        self.por_gtin: Dict[int, Produto] = {}
+        self._gtins_exatos: Set[int] = set()
+        self.por_codigo: Dict[str, Produto] = {}
+        self.por_codigo_base: Dict[str, Produto] = {}
+        self._indice_busca: Optional[IndiceBuscaProdutos] = None
+        for produto in produtos:
+            self.adicionar(produto)
+
+    def adicionar(self, produto: Produto):
+        self.produtos.append(produto)
+        self._indice_busca = None
+
+        indexar_gtins(self.por_gtin, self._gtins_exatos, produto, produto)
+        self.por_codigo[produto.codigo] = produto
+
+        base = codigo_base(produto.codigo)
+        if base != produto.codigo:
+            self.por_codigo_base[base] = produto
+
+    def buscar_gtin(self, codigo: str) -> Optional[Produto]:
+        """EAN13, DUN14, UPC-12 ou EAN-8 em qualquer grafia; o próprio GTIN antes do item base"""
+        for chave in formas_gtin(codigo):
+            produto = self.por_gtin.get(chave)
+            if produto is not None:
+                return produto
+        return None
+
+    def buscar_codigo(self, codigo: str) -> Optional[Produto]:
+        return self.por_codigo.get(codigo)
+
+    def buscar_codigo_base(self, codigo: str) -> Optional[Produto]:
+        return self.por_codigo_base.get(codigo)
+
+    @property
+    def indice_busca(self) -> IndiceBuscaProdutos:
+        """Índice de busca por descrição e código parcial dos produtos únicos"""
+        indice = self._indice_busca
+        if indice is None:
+            indice = self._indice_busca = IndiceBuscaProdutos(self.por_codigo.values())
+        return indice
+
+    def __len__(self) -> int:
+        """Quantidade de produtos únicos (por código)"""
+        return len(self.por_codigo)
+
+    def __iter__(self) -> Iterator[Produto]:
+        """Produtos únicos por código, na ordem em que apareceram"""
+        return iter(self.por_codigo.values())
+
+    def estatisticas(self) -> Dict[str, int]:
+        indices = {
+            'indices_gtin': len(self.por_gtin),
+            'indices_codigo': len(self.por_codigo),
+            'indices_codigo_base': len(self.por_codigo_base),
+        }
+        return {
+            'produtos_unicos': len(self.por_codigo),
+            'total_indices': sum(indices.values()),
+            **indices,
+        }
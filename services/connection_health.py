@@ -0,0 +1,85 @@
+# services/connection_health.py
+import sys
+import os
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import threading
+from typing import Any, Dict
+from utils.logger import logger
+
+# SQLSTATEs ODBC que indicam conexão perdida/inexistente
+SQLSTATES_CONEXAO_PERDIDA = frozenset({
+    "08S01",  # Communication link failure
+    "08003",  # Connection does not exist
+    "08007",  # Connection failure during transaction
+    "08001",  # Client unable to establish connection
+    "08004",  # Server rejected the connection
+})
+
+
+class HealthCheckPolicy:
+    """
+    Política de verificação de saúde das conexões do pool.
+
+    Em vez de executar ``SELECT 1`` antes de cada uso, a conexão só é
+    validada quando ficou ociosa por mais de ``validar_apos_ociosa``
+    segundos. Conexões mortas em uso são detectadas pelo SQLSTATE do
+    erro devolvido pelo driver (ver ``conexao_perdida``).
+    """
+
+    def __init__(self, validar_apos_ociosa: float = 30.0, query_validacao: str = "SELECT 1"):
+        self.validar_apos_ociosa = validar_apos_ociosa
+        self.query_validacao = query_validacao
+        self._lock = threading.Lock()
+        self._contadores = {
+            "probes_executados": 0,
+            "probes_evitados": 0,
+            "probes_falhos": 0,
+            "conexoes_perdidas": 0,
+            "retries": 0,
+        }
+
+    def precisa_validar(self, ociosa_por: float) -> bool:
+        """Indica se a conexão ociosa há ``ociosa_por`` segundos deve ser validada"""
+        precisa = ociosa_por >= self.validar_apos_ociosa
+        if not precisa:
+            self._incrementar("probes_evitados")
+        return precisa
+
+    def validar(self, conexao: Any) -> bool:
+        """Executa o probe de validação na conexão"""
+        self._incrementar("probes_executados")
+        try:
+            cursor = conexao.cursor()
+            cursor.execute(self.query_validacao)
+            cursor.fetchone()
+            cursor.close()
+            return True
+        except Exception as e:
+            self._incrementar("probes_falhos")
+            logger.debug(f"🔌 Conexão reprovada na validação: {e}")
+            return False
+
+    def registrar_conexao_perdida(self, repetindo: bool = False):
+        """Contabiliza uma conexão detectada como morta e um eventual retry"""
+        self._incrementar("conexoes_perdidas")
+        if repetindo:
+            self._incrementar("retries")
+
+    @staticmethod
+    def conexao_perdida(erro: Exception) -> bool:
+        """Verifica, pelo SQLSTATE do erro do driver, se a conexão caiu"""
+        args = getattr(erro, "args", ())
+        if args and isinstance(args[0], str) and args[0] in SQLSTATES_CONEXAO_PERDIDA:
+            return True
+        mensagem = str(erro).lower()
+        return "communication link failure" in mensagem
+
+    def metricas(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._contadores)
+
+    def _incrementar(self, contador: str):
+        with self._lock:
+            self._contadores[contador] += 1
@@ -0,0 +1,315 @@
+# services/connection_pool.py
+import sys
+import os
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+from services.connection_health import HealthCheckPolicy
+from utils.logger import logger
+
+
+class _ConexaoPool:
+    """Conexão física controlada pelo pool com seus metadados de ciclo de vida"""
+    __slots__ = ("conexao", "criada_em", "ultimo_uso")
+
+    def __init__(self, conexao: Any):
+        agora = time.monotonic()
+        self.conexao = conexao
+        self.criada_em = agora
+        self.ultimo_uso = agora
+
+
+class ConnectionPool:
+    """
+    Pool de conexões limitado e thread-safe.
+
+    - ``min_size``: conexões mantidas abertas mesmo ociosas
+    - ``max_size``: limite de conexões físicas simultâneas
+    - ``idle_timeout``: segundos que uma conexão pode ficar ociosa antes de ser fechada
+    - ``max_lifetime``: segundos de vida máxima de uma conexão física
+    - ``checkout_timeout``: segundos de espera por uma conexão livre antes de falhar
+    - ``health``: política que decide quando validar uma conexão ociosa no checkout
+    """
+
+    # Limites (em ms) do histograma de tempo de espera no checkout
+    BUCKETS_ESPERA_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        min_size: int = 1,
+        max_size: int = 10,
+        idle_timeout: float = 300.0,
+        max_lifetime: float = 1800.0,
+        checkout_timeout: float = 30.0,
+        reset: Optional[Callable[[Any], None]] = None,
+        health: Optional[HealthCheckPolicy] = None,
+        nome: str = "pool",
+    ):
+        if max_size < 1:
+            raise ValueError("max_size deve ser maior que zero")
+        if min_size < 0 or min_size > max_size:
+            raise ValueError("min_size deve estar entre 0 e max_size")
+
+        self._factory = factory
+        self._reset = reset
+        self.health = health
+        self.nome = nome
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.checkout_timeout = checkout_timeout
+
+        self._cond = threading.Condition()
+        self._ociosas: Deque[_ConexaoPool] = deque()
+        self._em_uso: Dict[int, _ConexaoPool] = {}
+        self._total = 0  # conexões físicas abertas ou em criação
+        self._fechado = False
+
+        self._contadores = {
+            "checkouts": 0,
+            "esperas": 0,
+            "timeouts": 0,
+            "criadas": 0,
+            "destruidas": 0,
+            "falhas_criacao": 0,
+        }
+        self._tempo_espera_total = 0.0
+        self._histograma_espera = [0] * (len(self.BUCKETS_ESPERA_MS) + 1)
+
+    # ------------------------------------------------------------------
+    # Checkout / devolução
+    # ------------------------------------------------------------------
+    def acquire(self) -> Any:
+        """
+        Retira uma conexão do pool, criando uma nova se houver capacidade.
+        Aguarda até ``checkout_timeout`` segundos quando o pool está no limite.
+        Conexões ociosas são validadas conforme a política de ``health``.
+        """
+        inicio = time.monotonic()
+        esperou = False
+
+        while True:
+            descartar: List[_ConexaoPool] = []
+            entrada = None
+            criar = False
+
+            with self._cond:
+                while True:
+                    if self._fechado:
+                        raise RuntimeError(f"Pool '{self.nome}' está fechado")
+
+                    entrada = self._retirar_ociosa(descartar)
+                    if entrada is not None:
+                        break
+
+                    if self._total < self.max_size:
+                        self._total += 1
+                        criar = True
+                        break
+
+                    restante = self.checkout_timeout - (time.monotonic() - inicio)
+                    if restante <= 0:
+                        self._contadores["timeouts"] += 1
+                        self._fechar_fisicas(descartar)
+                        raise TimeoutError(
+                            f"Nenhuma conexão livre no pool '{self.nome}' após "
+                            f"{self.checkout_timeout:.1f}s (max_size={self.max_size})"
+                        )
+
+                    if not esperou:
+                        esperou = True
+                        self._contadores["esperas"] += 1
+                    self._cond.wait(restante)
+
+            self._fechar_fisicas(descartar)
+
+            if criar:
+                entrada = self._criar_entrada()
+            elif not self._conexao_saudavel(entrada):
+                self._destruir(entrada)
+                continue
+
+            with self._cond:
+                entrada.ultimo_uso = time.monotonic()
+                self._em_uso[id(entrada.conexao)] = entrada
+                self._registrar_checkout(time.monotonic() - inicio)
+
+            return entrada.conexao
+
+    def release(self, conexao: Any):
+        """Devolve a conexão ao pool, fechando-a se expirou ou não pode ser reaproveitada"""
+        if conexao is None:
+            return
+
+        with self._cond:
+            entrada = self._em_uso.pop(id(conexao), None)
+
+        if entrada is None:
+            logger.warning(f"⚠️ Conexão desconhecida devolvida ao pool '{self.nome}' - ignorada")
+            return
+
+        reaproveitar = not self._fechado and not self._expirou(entrada, time.monotonic())
+
+        if reaproveitar and self._reset:
+            try:
+                self._reset(conexao)
+            except Exception as e:
+                logger.debug(f"🔌 Conexão descartada ao resetar no pool '{self.nome}': {e}")
+                reaproveitar = False
+
+        if not reaproveitar:
+            self._destruir(entrada)
+            return
+
+        with self._cond:
+            entrada.ultimo_uso = time.monotonic()
+            # LIFO: conexões quentes são reutilizadas, as frias expiram por ociosidade
+            self._ociosas.appendleft(entrada)
+            self._cond.notify()
+
+    def discard(self, conexao: Any):
+        """Remove definitivamente uma conexão em uso (ex.: conexão detectada como morta)"""
+        if conexao is None:
+            return
+
+        with self._cond:
+            entrada = self._em_uso.pop(id(conexao), None)
+
+        if entrada is not None:
+            self._destruir(entrada)
+
+    def warm_up(self):
+        """Abre conexões até atingir ``min_size``"""
+        while True:
+            with self._cond:
+                if self._fechado or self._total >= self.min_size:
+                    return
+                self._total += 1
+            entrada = self._criar_entrada()
+            with self._cond:
+                self._ociosas.append(entrada)
+                self._cond.notify()
+
+    def close_all(self):
+        """Fecha todas as conexões ociosas e impede novos checkouts"""
+        with self._cond:
+            self._fechado = True
+            ociosas = list(self._ociosas)
+            self._ociosas.clear()
+            self._cond.notify_all()
+
+        for entrada in ociosas:
+            self._destruir(entrada)
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+    def metrics(self) -> Dict[str, Any]:
+        """Retorna um retrato das métricas do pool para dimensionamento"""
+        with self._cond:
+            histograma = {}
+            for limite, qtd in zip(self.BUCKETS_ESPERA_MS, self._histograma_espera):
+                histograma[f"<={limite}ms"] = qtd
+            histograma[f">{self.BUCKETS_ESPERA_MS[-1]}ms"] = self._histograma_espera[-1]
+
+            checkouts = self._contadores["checkouts"]
+            return {
+                "nome": self.nome,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "total": self._total,
+                "em_uso": len(self._em_uso),
+                "ociosas": len(self._ociosas),
+                **self._contadores,
+                "tempo_espera_total_ms": round(self._tempo_espera_total * 1000, 3),
+                "tempo_espera_medio_ms": round(self._tempo_espera_total * 1000 / checkouts, 3) if checkouts else 0.0,
+                "histograma_espera": histograma,
+                "saude": self.health.metricas() if self.health else {},
+            }
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    def _conexao_saudavel(self, entrada: _ConexaoPool) -> bool:
+        """Valida a conexão ociosa apenas quando a política exigir"""
+        if self.health is None:
+            return True
+        if not self.health.precisa_validar(time.monotonic() - entrada.ultimo_uso):
+            return True
+        return self.health.validar(entrada.conexao)
+
+    def _retirar_ociosa(self, descartar: List[_ConexaoPool]) -> Optional[_ConexaoPool]:
+        """Retira a conexão ociosa mais recente ainda válida (chamado com o lock)"""
+        agora = time.monotonic()
+        self._recolher_ociosas(agora, descartar)
+
+        while self._ociosas:
+            entrada = self._ociosas.popleft()
+            if self._expirou(entrada, agora):
+                self._total -= 1
+                descartar.append(entrada)
+                continue
+            return entrada
+        return None
+
+    def _recolher_ociosas(self, agora: float, descartar: List[_ConexaoPool]):
+        """Fecha conexões ociosas há mais de ``idle_timeout`` preservando ``min_size``"""
+        while self._ociosas and self._total > self.min_size:
+            mais_antiga = self._ociosas[-1]
+            if agora - mais_antiga.ultimo_uso < self.idle_timeout:
+                break
+            self._ociosas.pop()
+            self._total -= 1
+            descartar.append(mais_antiga)
+
+    def _expirou(self, entrada: _ConexaoPool, agora: float) -> bool:
+        return bool(self.max_lifetime) and agora - entrada.criada_em >= self.max_lifetime
+
+    def _criar_entrada(self) -> _ConexaoPool:
+        try:
+            conexao = self._factory()
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._contadores["falhas_criacao"] += 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._contadores["criadas"] += 1
+        logger.debug(f"🔌 Nova conexão criada no pool '{self.nome}'")
+        return _ConexaoPool(conexao)
+
+    def _destruir(self, entrada: _ConexaoPool):
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+        self._fechar_fisicas([entrada])
+
+    def _fechar_fisicas(self, entradas: List[_ConexaoPool]):
+        """Fecha conexões físicas já removidas da contabilidade do pool"""
+        for entrada in entradas:
+            try:
+                entrada.conexao.close()
+            except Exception:
+                pass
+            with self._cond:
+                self._contadores["destruidas"] += 1
+
+    def _registrar_checkout(self, espera: float):
+        """Atualiza contadores de checkout (chamado com o lock)"""
+        self._contadores["checkouts"] += 1
+        self._tempo_espera_total += espera
+
+        espera_ms = espera * 1000
+        for i, limite in enumerate(self.BUCKETS_ESPERA_MS):
+            if espera_ms <= limite:
+                self._histograma_espera[i] += 1
+                return
+        self._histograma_espera[-1] += 1
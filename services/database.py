@@ -4,14 +4,37 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 import pyodbc
+import threading
+from contextlib import contextmanager
 from config.settings import settings
+from services.connection_health import HealthCheckPolicy
+from services.connection_pool import ConnectionPool
 from utils.logger import logger
 import time
-from typing import Optional
+from typing import Dict, Optional
+
+# Prefixo da string de conexão do backend local (DB_BACKEND=sqlite)
+PREFIXO_SQLITE = "sqlite:"
+
 
 class Database:
+    # Pools compartilhados pelo processo, um por string de conexão
+    _pools: Dict[str, ConnectionPool] = {}
+    _pools_lock = threading.Lock()
+
     def __init__(self, db_name: str):
-        self.conn_str = (
+        self.db_name = db_name
+        if settings.DB_BACKEND == "sqlite":
+            # Banco local único com as tabelas do Protheus usadas pelo importador
+            self.conn_str = f"{PREFIXO_SQLITE}{settings.DB_SQLITE_PATH}"
+        else:
+            self.conn_str = self._conn_str_sqlserver(db_name)
+        self._connection: Optional[pyodbc.Connection] = None
+        self.pool = self._obter_pool(self.conn_str, db_name)
+
+    @staticmethod
+    def _conn_str_sqlserver(db_name: str) -> str:
+        return (
             f"DRIVER={{{settings.DB_DRIVER}}};"
             f"SERVER={settings.DB_HOST};"
             f"DATABASE={db_name};"
@@ -21,28 +44,72 @@ class Database:
             f"Connection Timeout=30;"
             f"Command Timeout=30;"
         )
-        self._connection: Optional[pyodbc.Connection] = None
+
+    @classmethod
+    def _obter_pool(cls, conn_str: str, db_name: str) -> ConnectionPool:
+        """Retorna o pool do processo para a string de conexão, criando-o se necessário"""
+        with cls._pools_lock:
+            pool = cls._pools.get(conn_str)
+            if pool is None:
+                pool = ConnectionPool(
+                    factory=lambda: cls._criar_conexao(conn_str),
+                    min_size=settings.DB_POOL_MIN_SIZE,
+                    max_size=settings.DB_POOL_MAX_SIZE,
+                    idle_timeout=settings.DB_POOL_IDLE_TIMEOUT,
+                    max_lifetime=settings.DB_POOL_MAX_LIFETIME,
+                    checkout_timeout=settings.DB_POOL_CHECKOUT_TIMEOUT,
+                    reset=cls._resetar_conexao,
+                    health=HealthCheckPolicy(settings.DB_HEALTH_CHECK_IDLE),
+                    nome=db_name,
+                )
+                cls._pools[conn_str] = pool
+                logger.debug(f"🔌 Pool de conexões criado para {db_name} (max={settings.DB_POOL_MAX_SIZE})")
+            return pool
+
+    @staticmethod
+    def _criar_conexao(conn_str: str) -> pyodbc.Connection:
+        """Abre uma conexão física com as configurações padrão do projeto"""
+        if conn_str.startswith(PREFIXO_SQLITE):
+            # Importado só aqui: o módulo registra adaptadores globais do sqlite3
+            from services.sqlite_backend import conectar_sqlite
+            return conectar_sqlite(conn_str[len(PREFIXO_SQLITE):])
+
+        conn = pyodbc.connect(
+            conn_str,
+            autocommit=True,
+            timeout=30
+        )
+
+        # Configurações de otimização
+        conn.setdecoding(pyodbc.SQL_CHAR, encoding='utf-8')
+        conn.setdecoding(pyodbc.SQL_WCHAR, encoding='utf-8')
+        conn.setencoding(encoding='utf-8')
+        return conn
+
+    @staticmethod
+    def _resetar_conexao(conn: pyodbc.Connection):
+        """Desfaz transação pendente antes de devolver a conexão ao pool"""
+        if not conn.autocommit:
+            conn.rollback()
+            conn.autocommit = True
 
     def connect(self, retry_count: int = 3) -> pyodbc.Connection:
         """
-        Conecta ao banco com retry automático em caso de falha
+        Obtém uma conexão do pool com retry automático em caso de falha.
+        A conexão fica reservada para esta instância até ``close()``;
+        conexões mortas são detectadas pelo erro do driver (ver
+        ``descartar_conexao``) e não por um ``SELECT 1`` a cada chamada.
         """
         for attempt in range(retry_count):
             try:
-                if self._connection is None or self._is_connection_closed():
-                    self._connection = pyodbc.connect(
-                        self.conn_str,
-                        autocommit=True,
-                        timeout=30
-                    )
-                    
-                    # Configurações de otimização
-                    self._connection.setdecoding(pyodbc.SQL_CHAR, encoding='utf-8')
-                    self._connection.setdecoding(pyodbc.SQL_WCHAR, encoding='utf-8')
-                    self._connection.setencoding(encoding='utf-8')
-                
+                if self._connection is None:
+                    self._connection = self.pool.acquire()
+
                 return self._connection
-                
+
+            except TimeoutError:
+                # Pool esgotado: repetir só aumentaria a fila
+                raise
             except Exception as e:
                 print(f"Tentativa {attempt + 1} de conexão falhou: {e}")
                 if attempt < retry_count - 1:
@@ -50,23 +117,37 @@ class Database:
                 else:
                     raise RuntimeError(f"Falha ao conectar após {retry_count} tentativas: {e}")
 
-    def _is_connection_closed(self) -> bool:
-        """Verifica se a conexão está fechada"""
-        if self._connection is None:
-            return True
-        
+    @contextmanager
+    def conexao(self):
+        """
+        Empresta uma conexão do pool durante o bloco ``with``
+        e a devolve ao final, mesmo em caso de erro.
+        """
+        conn = self.pool.acquire()
         try:
-            # Tenta executar uma query simples para verificar se a conexão está ativa
-            cursor = self._connection.cursor()
-            cursor.execute("SELECT 1")
-            cursor.close()
-            return False
-        except:
-            return True
+            yield conn
+        finally:
+            self.pool.release(conn)
+
+    def descartar_conexao(self):
+        """Descarta a conexão reservada (morta) para que a próxima seja nova"""
+        if self._connection is not None:
+            self.pool.discard(self._connection)
+            self._connection = None
+
+    def conexao_perdida(self, erro: Exception) -> bool:
+        """Indica se o erro do driver significa que a conexão caiu"""
+        return HealthCheckPolicy.conexao_perdida(erro)
+
+    def registrar_conexao_perdida(self, repetindo: bool = False):
+        """Contabiliza a conexão morta nas métricas de saúde do pool"""
+        if self.pool.health:
+            self.pool.health.registrar_conexao_perdida(repetindo)
 
     def execute_query(self, query: str, params=None, fetch_one=False, fetch_all=False):
         """
-        Executa uma query com tratamento de erro robusto
+        Executa uma query com tratamento de erro robusto.
+        Se a conexão tiver caído, a query é repetida uma vez em uma conexão nova.
         """
         conn = None
         cursor = None
@@ -76,18 +157,25 @@ class Database:
 
             logger.sql(query, params)
 
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            
+            try:
+                self._executar(cursor, query, params)
+            except pyodbc.Error as e:
+                if not (self.conexao_perdida(e) and conn.autocommit):
+                    raise
+                logger.warning(f"🔄 Conexão perdida ({e.args[0]}), repetindo query em nova conexão")
+                self.registrar_conexao_perdida(repetindo=True)
+                self.descartar_conexao()
+                conn = self.connect()
+                cursor = conn.cursor()
+                self._executar(cursor, query, params)
+
             if fetch_one:
                 return cursor.fetchone()
             elif fetch_all:
                 return cursor.fetchall()
             else:
                 return cursor
-                
+
         except Exception as e:
             logger.error(f"Erro ao executar query: {e}")
             logger.error(f"Query: {query}")
@@ -98,26 +186,46 @@ class Database:
             if cursor:
                 cursor.close()
 
+    @staticmethod
+    def _executar(cursor, query: str, params=None):
+        if params:
+            cursor.execute(query, params)
+        else:
+            cursor.execute(query)
+
     def test_connection(self) -> bool:
         """
         Testa a conectividade com o banco
         """
         try:
-            conn = self.connect()
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1 as test")
-            result = cursor.fetchone()
-            cursor.close()
+            with self.conexao() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1 as test")
+                result = cursor.fetchone()
+                cursor.close()
             return result is not None
         except Exception as e:
             print(f"Erro no teste de conexão: {e}")
             return False
 
+    def obter_metricas_pool(self) -> dict:
+        """Retorna as métricas do pool usado por este banco"""
+        return self.pool.metrics()
+
+    @classmethod
+    def fechar_pools(cls):
+        """Fecha todos os pools do processo (encerramento da aplicação)"""
+        with cls._pools_lock:
+            pools = list(cls._pools.values())
+            cls._pools.clear()
+        for pool in pools:
+            pool.close_all()
+
     def close(self):
-        """Fecha a conexão"""
-        if self._connection and not self._is_connection_closed():
+        """Devolve a conexão reservada ao pool"""
+        if self._connection is not None:
             try:
-                self._connection.close()
+                self.pool.release(self._connection)
             except:
                 pass
             finally:
@@ -127,4 +235,4 @@ class Database:
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.close()
\ No newline at end of file
+        self.close()
@@ -0,0 +1,394 @@
+# services/fonte_produtos.py
+import sys
+import os
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from models.produto import Produto
+from services.catalogo_produtos import CatalogoProdutos, codigo_base, indexar_gtins
+from utils.gtin import formas_gtin
+from utils.logger import logger
+
+# Item de pedido como buscado nas camadas: (ean13, dun14, codprod)
+ChaveItem = Tuple[str, str, str]
+
+
+def buscar_no_catalogo(catalogo, ean13: str, dun14: str, codprod: str) -> Optional[Produto]:
+    """
+    Busca em um catálogo (``CatalogoProdutos`` ou ``CatalogoBinario``) com
+    as estratégias em ordem: EAN13, DUN14 (cada um em qualquer grafia de
+    GTIN, ver ``utils.gtin``), código exato e código base. A regra do
+    código base é a mesma em todas as camadas: alcança um produto com
+    sufixo cujo ``codigo_base`` é igual ao ``codigo_base`` do código
+    informado. Códigos já sem espaços nas pontas.
+    """
+    if ean13:
+        produto = catalogo.buscar_gtin(ean13)
+        if produto:
+            logger.debug(f"✅ Produto encontrado por EAN13: {ean13} -> {produto.codigo}")
+            return produto
+
+    if dun14:
+        produto = catalogo.buscar_gtin(dun14)
+        if produto:
+            logger.debug(f"✅ Produto encontrado por DUN14: {dun14} -> {produto.codigo}")
+            return produto
+
+    if codprod:
+        produto = catalogo.buscar_codigo(codprod)
+        if produto:
+            logger.debug(f"✅ Produto encontrado por código exato: {codprod} -> {produto.codigo}")
+            return produto
+
+        base = codigo_base(codprod)
+        produto = catalogo.buscar_codigo_base(base)
+        if produto:
+            logger.debug(f"✅ Produto encontrado por código base: {base} -> {produto.codigo}")
+            return produto
+
+    return None
+
+
+class CamadaMemoria:
+    """
+    Camada em memória: o catálogo atual do ``ValidadorProduto`` (JSON ou
+    compilado, trocado na recarga) e, atrás dele, os SKUs que só foram
+    encontrados nas camadas seguintes (``resolvidos``).
+
+    Um SKU resolvido vale por ``ttl`` segundos (0 = sem expiração) e
+    ``resolvidos`` guarda no máximo ``max_itens`` SKUs (0 = sem limite):
+    ao passar do limite, os mais antigos saem em blocos de 10% para que o
+    índice não seja remontado a cada gravação.
+    """
+
+    nome = "memoria"
+
+    def __init__(self, catalogo: Callable[[], Any], ttl: float = 0, max_itens: int = 0):
+        self._catalogo = catalogo
+        self.ttl = ttl
+        self.max_itens = max_itens
+        self.resolvidos = CatalogoProdutos()
+        self._guardados: "OrderedDict[str, Tuple[Produto, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def buscar(self, ean13: str, dun14: str, codprod: str) -> Optional[Produto]:
+        produto = buscar_no_catalogo(self._catalogo(), ean13, dun14, codprod)
+        if produto is None and len(self.resolvidos):
+            produto = buscar_no_catalogo(self.resolvidos, ean13, dun14, codprod)
+            if produto is not None and self._expirado(produto.codigo):
+                with self._lock:
+                    self._remover_expirados()
+                produto = buscar_no_catalogo(self.resolvidos, ean13, dun14, codprod)
+        return produto
+
+    def guardar(self, produto: Produto):
+        with self._lock:
+            anterior = self._guardados.pop(produto.codigo, None)
+            self._guardados[produto.codigo] = (produto, time.monotonic())
+            if self.max_itens and len(self._guardados) > self.max_itens:
+                self._remover_expirados(reservar=max(self.max_itens // 10, 1))
+            elif anterior is None or anterior[0] != produto:
+                self.resolvidos.adicionar(produto)
+
+    def limpar(self):
+        """Descarta os SKUs resolvidos (catálogo trocado: podem já estar nele, ou ter mudado)"""
+        with self._lock:
+            self._guardados.clear()
+            self.resolvidos = CatalogoProdutos()
+
+    def _expirado(self, codigo: str) -> bool:
+        guardado = self._guardados.get(codigo)
+        return guardado is None or bool(self.ttl) and time.monotonic() - guardado[1] > self.ttl
+
+    def _remover_expirados(self, reservar: int = 0):
+        """Remove os SKUs expirados e, se preciso, os mais antigos até sobrar espaço para ``reservar``"""
+        limite = time.monotonic() - self.ttl
+        alvo = max(self.max_itens - reservar, 1) if reservar else None
+        while self._guardados:
+            codigo, (_, guardado_em) = next(iter(self._guardados.items()))
+            expirado = bool(self.ttl) and guardado_em < limite
+            if not expirado and (alvo is None or len(self._guardados) <= alvo):
+                break
+            del self._guardados[codigo]
+        self.resolvidos = CatalogoProdutos(produto for produto, _ in self._guardados.values())
+
+    def __len__(self) -> int:
+        return len(self._guardados)
+
+
+_ESQUEMA_SNAPSHOT = """
+CREATE TABLE IF NOT EXISTS PRODUTOS (
+    CODIGO TEXT PRIMARY KEY,
+    CODIGO_BASE TEXT,
+    VALORES TEXT NOT NULL,
+    ATUALIZADO TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS IX_PRODUTOS_BASE ON PRODUTOS (CODIGO_BASE);
+CREATE TABLE IF NOT EXISTS GTINS (
+    GTIN INTEGER NOT NULL,
+    CODIGO TEXT NOT NULL,
+    EXATA INTEGER NOT NULL,
+    PRIMARY KEY (GTIN, CODIGO)
+);
+CREATE INDEX IF NOT EXISTS IX_GTINS_CODIGO ON GTINS (CODIGO);
+"""
+
+
+class SnapshotProdutos:
+    """
+    Camada em arquivo local (SQLite) com os SKUs já resolvidos no SB1010.
+    Sobrevive ao reinício do processo: um SKU que não está no catálogo
+    JSON vai ao Protheus uma vez e, daí em diante, é atendido do disco
+    por ``ttl`` segundos a partir de ``ATUALIZADO`` (0 = sem expiração);
+    depois disso volta a ser resolvido no SB1010 e regravado. Mesma
+    prioridade de busca do catálogo em memória.
+    """
+
+    nome = "snapshot"
+
+    def __init__(self, caminho: str, ttl: float = 0):
+        self.caminho = caminho
+        self.ttl = ttl
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self._conn = sqlite3.connect(caminho, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.executescript(_ESQUEMA_SNAPSHOT)
+        self._lock = threading.Lock()
+        self.remover_expirados()
+
+    def _validos_desde(self) -> str:
+        """Menor ATUALIZADO ainda válido ("" quando não há expiração)"""
+        return (datetime.now() - timedelta(seconds=self.ttl)).isoformat() if self.ttl else ""
+
+    def remover_expirados(self) -> int:
+        """Apaga do arquivo os SKUs expirados; retorna quantos"""
+        if not self.ttl:
+            return 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                removidos = self._conn.execute(
+                    "DELETE FROM PRODUTOS WHERE ATUALIZADO < ?", (self._validos_desde(),)
+                ).rowcount
+                self._conn.execute("DELETE FROM GTINS WHERE CODIGO NOT IN (SELECT CODIGO FROM PRODUTOS)")
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if removidos:
+            logger.debug(f"🧹 {removidos} produto(s) expirado(s) removido(s) do snapshot")
+        return removidos
+
+    def _primeiro(self, coluna: str, valor) -> Optional[Produto]:
+        with self._lock:
+            linha = self._conn.execute(
+                f"SELECT VALORES FROM PRODUTOS WHERE {coluna} = ? AND ATUALIZADO >= ? ORDER BY CODIGO LIMIT 1",
+                (valor, self._validos_desde()),
+            ).fetchone()
+        return Produto(**json.loads(linha[0])) if linha else None
+
+    def _por_gtin(self, codigo: str) -> Optional[Produto]:
+        for chave in formas_gtin(codigo):
+            with self._lock:
+                linha = self._conn.execute(
+                    "SELECT P.VALORES FROM GTINS G JOIN PRODUTOS P ON P.CODIGO = G.CODIGO "
+                    "WHERE G.GTIN = ? AND P.ATUALIZADO >= ? ORDER BY G.EXATA DESC, P.ATUALIZADO DESC LIMIT 1",
+                    (chave, self._validos_desde()),
+                ).fetchone()
+            if linha:
+                return Produto(**json.loads(linha[0]))
+        return None
+
+    def buscar(self, ean13: str, dun14: str, codprod: str) -> Optional[Produto]:
+        for codigo in (ean13, dun14):
+            produto = self._por_gtin(codigo)
+            if produto:
+                return produto
+        if codprod:
+            produto = self._primeiro("CODIGO", codprod)
+            if produto:
+                return produto
+            return self._primeiro("CODIGO_BASE", codigo_base(codprod))
+        return None
+
+    def guardar(self, produto: Produto):
+        base = codigo_base(produto.codigo)
+        valores = json.dumps(
+            asdict(produto), ensure_ascii=False,
+            default=lambda v: float(v) if isinstance(v, Decimal) else str(v),
+        )
+        gtins: Dict[int, str] = {}
+        exatas: Set[int] = set()
+        indexar_gtins(gtins, exatas, produto, produto.codigo)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO PRODUTOS (CODIGO, CODIGO_BASE, VALORES, ATUALIZADO) VALUES (?, ?, ?, ?)",
+                    (produto.codigo, base if base != produto.codigo else None, valores, datetime.now().isoformat()),
+                )
+                self._conn.execute("DELETE FROM GTINS WHERE CODIGO = ?", (produto.codigo,))
+                self._conn.executemany(
+                    "INSERT INTO GTINS (GTIN, CODIGO, EXATA) VALUES (?, ?, ?)",
+                    [(chave, produto.codigo, int(chave in exatas)) for chave in gtins if chave < 1 << 63],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM PRODUTOS").fetchone()[0]
+
+    def fechar(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CamadaSB1010:
+    """Camada remota: cadastro de produtos do Protheus, via ``ProdutoRepository``"""
+
+    nome = "sb1010"
+
+    def __init__(self, repositorio):
+        self.repositorio = repositorio
+
+    def buscar(self, ean13: str, dun14: str, codprod: str) -> Optional[Produto]:
+        return self.repositorio.buscar_produto(ean13, dun14, codprod)
+
+    def resolver(self, itens: Sequence[ChaveItem]) -> Dict[ChaveItem, Optional[Produto]]:
+        """Todos os itens em uma consulta por bloco (``ProdutoRepository.resolver_produtos``)"""
+        return self.repositorio.resolver_produtos(itens)
+
+
+class FonteProdutos:
+    """
+    Consulta as camadas em ordem (memória, snapshot local, SB1010) até
+    uma encontrar o produto, que então é gravado nas camadas anteriores
+    que têm ``guardar``: a próxima busca pelo mesmo SKU para na primeira.
+
+    Uma camada com erro (banco fora do ar, arquivo inacessível) é
+    contada em ``falhas`` e pulada; nesse caso o "não encontrado" não é
+    definitivo e o validador não o guarda em cache. ``metricas()`` traz
+    consultas, acertos, taxa de acerto e latência de cada camada.
+
+    ``resolver`` faz o mesmo para os itens de um pedido de uma vez: cada
+    camada recebe só os itens que as anteriores não encontraram e, se
+    tiver ``resolver``, os atende em lote (uma ida ao SB1010 por pedido).
+    """
+
+    def __init__(self, camadas: Sequence[Any]):
+        self.camadas: List[Any] = list(camadas)
+        self._lock = threading.Lock()
+        self._contadores: Dict[str, Dict[str, float]] = {
+            camada.nome: {"consultas": 0, "acertos": 0, "falhas": 0, "gravacoes": 0, "tempo_total": 0.0, "tempo_max": 0.0}
+            for camada in self.camadas
+        }
+
+    def buscar(self, ean13: str, dun14: str, codprod: str) -> Tuple[Optional[Produto], bool]:
+        """Retorna ``(produto, definitivo)``; ``definitivo`` é falso se alguma camada falhou"""
+        definitivo = True
+        for posicao, camada in enumerate(self.camadas):
+            inicio = time.perf_counter()
+            try:
+                produto = camada.buscar(ean13, dun14, codprod)
+            except Exception as e:
+                self._registrar(camada.nome, time.perf_counter() - inicio, falha=True)
+                logger.warning(f"⚠️ Camada de produtos '{camada.nome}' falhou: {e}")
+                definitivo = False
+                continue
+            self._registrar(camada.nome, time.perf_counter() - inicio, acerto=produto is not None)
+
+            if produto is not None:
+                if posicao:
+                    logger.debug(f"📥 Produto {produto.codigo} resolvido na camada '{camada.nome}'")
+                    self._gravar_nas_anteriores(produto, posicao)
+                return produto, True
+        return None, definitivo
+
+    def resolver(self, itens: Iterable[ChaveItem]) -> Dict[ChaveItem, Tuple[Optional[Produto], bool]]:
+        """``(produto, definitivo)`` de cada item, como ``buscar``, com as camadas consultadas em lote"""
+        pendentes = list(dict.fromkeys(itens))
+        resultado: Dict[ChaveItem, Tuple[Optional[Produto], bool]] = {}
+        definitivo = True
+        for posicao, camada in enumerate(self.camadas):
+            if not pendentes:
+                break
+            inicio = time.perf_counter()
+            try:
+                resolver = getattr(camada, "resolver", None)
+                if resolver is not None:
+                    encontrados = resolver(pendentes)
+                else:
+                    encontrados = {chave: camada.buscar(*chave) for chave in pendentes}
+            except Exception as e:
+                self._registrar(camada.nome, time.perf_counter() - inicio, falha=True, consultas=len(pendentes))
+                logger.warning(f"⚠️ Camada de produtos '{camada.nome}' falhou: {e}")
+                definitivo = False
+                continue
+
+            acertos = 0
+            for chave in pendentes:
+                produto = encontrados.get(chave)
+                if produto is not None:
+                    acertos += 1
+                    resultado[chave] = (produto, True)
+                    if posicao:
+                        self._gravar_nas_anteriores(produto, posicao)
+            self._registrar(camada.nome, time.perf_counter() - inicio, acertos=acertos, consultas=len(pendentes))
+            if posicao and acertos:
+                logger.debug(f"📥 {acertos} produto(s) resolvido(s) na camada '{camada.nome}'")
+            pendentes = [chave for chave in pendentes if chave not in resultado]
+
+        for chave in pendentes:
+            resultado[chave] = (None, definitivo)
+        return resultado
+
+    def _gravar_nas_anteriores(self, produto: Produto, posicao: int):
+        for camada in self.camadas[:posicao]:
+            guardar = getattr(camada, "guardar", None)
+            if guardar is None:
+                continue
+            try:
+                guardar(produto)
+            except Exception as e:
+                logger.warning(f"⚠️ Não foi possível gravar {produto.codigo} na camada '{camada.nome}': {e}")
+                continue
+            with self._lock:
+                self._contadores[camada.nome]["gravacoes"] += 1
+
+    def _registrar(
+        self, nome: str, duracao: float, acerto: bool = False, falha: bool = False,
+        acertos: int = 0, consultas: int = 1,
+    ):
+        with self._lock:
+            contadores = self._contadores[nome]
+            contadores["consultas"] += consultas
+            contadores["acertos"] += int(acerto) + acertos
+            contadores["falhas"] += int(falha)
+            contadores["tempo_total"] += duracao
+            contadores["tempo_max"] = max(contadores["tempo_max"], duracao)
+
+    def metricas(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                nome: {
+                    "consultas": int(c["consultas"]),
+                    "acertos": int(c["acertos"]),
+                    "falhas": int(c["falhas"]),
+                    "gravacoes": int(c["gravacoes"]),
+                    "taxa_acerto": c["acertos"] / c["consultas"] if c["consultas"] else 0.0,
+                    "latencia_media_ms": 1000 * c["tempo_total"] / c["consultas"] if c["consultas"] else 0.0,
+                    "latencia_max_ms": 1000 * c["tempo_max"],
+                }
+                for nome, c in self._contadores.items()
+            }
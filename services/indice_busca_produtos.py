@@ -0,0 +1,179 @@
+# services/indice_busca_produtos.py
+import sys
+import os
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set
+from models.produto import Produto
+
+_RE_SEPARADORES = re.compile(r'[^0-9A-Z]+')
+
+
+def normalizar(texto: str) -> str:
+    """Maiúsculas, sem acentos e com pontuação trocada por espaço (``Água-5L`` -> ``AGUA 5L``)"""
+    if not texto:
+        return ""
+    sem_acento = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+    return _RE_SEPARADORES.sub(' ', sem_acento.upper()).strip()
+
+
+def _trigramas(texto: str) -> Set[str]:
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def _adicionar_postagem(postagens: Dict[str, list], chave: str, posicao: int):
+    lista = postagens.setdefault(chave, [])
+    if not lista or lista[-1] != posicao:
+        lista.append(posicao)
+
+
+class IndiceBuscaProdutos:
+    """
+    Índice de busca textual do catálogo, montado uma vez por carga.
+
+    - descrição: tokens normalizados (sem acento) com a lista de produtos
+      de cada um, tokens ordenados para busca por prefixo e trigramas
+      para trechos no meio das palavras;
+    - código: códigos ordenados para busca por prefixo e trigramas para
+      trechos (``03X05`` em ``1001.01.03X05L``).
+
+    Os resultados vêm ordenados por relevância e limitados a ``limite``.
+    """
+
+    def __init__(self, produtos: Iterable[Produto]):
+        self.produtos: List[Produto] = list(produtos)
+        self._descricoes: List[str] = []
+        self._codigos: List[str] = []
+        self._tokens: Dict[str, FrozenSet[int]] = {}
+        self._trigramas_descricao: Dict[str, FrozenSet[int]] = {}
+        self._trigramas_codigo: Dict[str, FrozenSet[int]] = {}
+
+        for posicao, produto in enumerate(self.produtos):
+            descricao = normalizar(produto.descricao)
+            codigo = produto.codigo.upper()
+            self._descricoes.append(descricao)
+            self._codigos.append(codigo)
+            for token in descricao.split():
+                _adicionar_postagem(self._tokens, token, posicao)
+            for trigrama in sorted(_trigramas(descricao)):
+                _adicionar_postagem(self._trigramas_descricao, trigrama, posicao)
+            for trigrama in sorted(_trigramas(codigo)):
+                _adicionar_postagem(self._trigramas_codigo, trigrama, posicao)
+
+        # Listas montadas em ordem; para consulta viram conjuntos (interseção sem copiar)
+        for postagens in (self._tokens, self._trigramas_descricao, self._trigramas_codigo):
+            for chave, lista in postagens.items():
+                postagens[chave] = frozenset(lista)
+
+        self._tokens_ordenados = sorted(self._tokens)
+        self._codigos_ordenados = sorted((codigo, posicao) for posicao, codigo in enumerate(self._codigos))
+
+    def __len__(self) -> int:
+        return len(self.produtos)
+
+    # ------------------------------------------------------------------
+    # Descrição
+    # ------------------------------------------------------------------
+    def buscar_descricao(self, termo: str, limite: Optional[int] = None) -> List[Produto]:
+        """
+        Produtos cuja descrição tem todas as palavras do termo (sem
+        diferenciar acentos e maiúsculas) ou contém o termo como trecho.
+        Primeiro os que têm as palavras exatas, depois os que têm palavras
+        começando por elas, depois os trechos.
+        """
+        consulta = normalizar(termo)
+        if not consulta:
+            return []
+        palavras = consulta.split()
+
+        return self._em_niveis((
+            lambda: self._com_todas_as_palavras(palavras, exatas=True),
+            lambda: self._com_todas_as_palavras(palavras, exatas=False),
+            lambda: self._contendo(consulta, self._descricoes, self._trigramas_descricao),
+        ), limite)
+
+    def _com_todas_as_palavras(self, palavras: List[str], exatas: bool) -> FrozenSet[int]:
+        """Produtos com alguma palavra igual a (ou começando por) cada uma das ``palavras``"""
+        conjuntos = []
+        for palavra in palavras:
+            if exatas:
+                posicoes = self._tokens.get(palavra, frozenset())
+            else:
+                posicoes = set().union(*(self._tokens[token] for token in self._tokens_com_prefixo(palavra)))
+            if not posicoes:
+                return frozenset()
+            conjuntos.append(posicoes)
+        conjuntos.sort(key=len)
+        return conjuntos[0].intersection(*conjuntos[1:])
+
+    def _tokens_com_prefixo(self, prefixo: str) -> Iterable[str]:
+        inicio = bisect_left(self._tokens_ordenados, prefixo)
+        for token in self._tokens_ordenados[inicio:]:
+            if not token.startswith(prefixo):
+                break
+            yield token
+
+    # ------------------------------------------------------------------
+    # Código
+    # ------------------------------------------------------------------
+    def buscar_codigo(self, codigo_parcial: str, limite: Optional[int] = None) -> List[Produto]:
+        """Produtos cujo código contém o trecho; código igual, depois prefixo, depois trecho"""
+        consulta = codigo_parcial.upper().strip() if codigo_parcial else ""
+        if not consulta:
+            return []
+
+        return self._em_niveis((
+            lambda: self._com_prefixo_de_codigo(consulta, igual=True),
+            lambda: self._com_prefixo_de_codigo(consulta, igual=False),
+            lambda: self._contendo(consulta, self._codigos, self._trigramas_codigo),
+        ), limite)
+
+    def _com_prefixo_de_codigo(self, prefixo: str, igual: bool) -> Set[int]:
+        posicoes = set()
+        inicio = bisect_left(self._codigos_ordenados, (prefixo,))
+        for codigo, posicao in self._codigos_ordenados[inicio:]:
+            if (codigo != prefixo) if igual else not codigo.startswith(prefixo):
+                break
+            posicoes.add(posicao)
+        return posicoes
+
+    # ------------------------------------------------------------------
+    # Comum
+    # ------------------------------------------------------------------
+    def _contendo(self, consulta: str, textos: List[str], trigramas: Dict[str, FrozenSet[int]]) -> Set[int]:
+        """Posições dos textos que contêm ``consulta``; candidatos pelos trigramas quando possível"""
+        if len(consulta) < 3:
+            return {posicao for posicao, texto in enumerate(textos) if consulta in texto}
+
+        conjuntos = []
+        for trigrama in _trigramas(consulta):
+            postagens = trigramas.get(trigrama)
+            if not postagens:
+                return set()
+            conjuntos.append(postagens)
+        conjuntos.sort(key=len)
+        candidatos = conjuntos[0].intersection(*conjuntos[1:])
+        return {posicao for posicao in candidatos if consulta in textos[posicao]}
+
+    def _em_niveis(self, niveis: Iterable[Callable[[], FrozenSet[int]]], limite: Optional[int]) -> List[Produto]:
+        """
+        Junta os níveis de relevância em ordem, cada um na ordem do catálogo.
+        Com ``limite``, os níveis seguintes só são calculados se faltarem resultados.
+        """
+        posicoes: List[int] = []
+        vistas: Set[int] = set()
+        for nivel in niveis:
+            novas = nivel() - vistas
+            if limite is None:
+                posicoes += sorted(novas)
+            else:
+                posicoes += heapq.nsmallest(limite - len(posicoes), novas)
+                if len(posicoes) >= limite:
+                    break
+            vistas |= novas
+        return [self.produtos[posicao] for posicao in posicoes]
@@ -3,10 +3,12 @@ import os
 # Adiciona o diretório raiz do projeto ao path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, Optional
+from models.cliente import Cliente
 from models.pedido_sobel import PedidoSobel
 from services.processador_pedido_item import ProcessadorPedidoItem
 from services.validador_cliente import ValidadorCliente
+from utils.helpers import extrair_cnpj_limpo
 from utils.error_handler import ClienteNaoEncontradoError, NeogridError, ErrorType
 
 
@@ -15,10 +17,25 @@ class ProcessadorPedido:
         self.validador_cliente = validador_cliente
         self.processador_item = processador_item
 
-    def processar(self, pedido_json: Dict[str, Any]) -> PedidoSobel:
+    def resolver_clientes(self, cnpjs: Iterable[str]) -> Dict[str, Optional[Cliente]]:
+        """
+        Valida de uma vez os clientes de um lote de pedidos (ver
+        ``ValidadorCliente.validar_clientes``). O resultado é passado a
+        ``processar`` como ``clientes``; falhas viram um dict vazio e cada
+        pedido volta a validar seu cliente individualmente.
+        """
+        try:
+            return self.validador_cliente.validar_clientes(cnpjs)
+        except Exception as e:
+            print(f"Erro ao validar clientes em lote: {e}")
+            return {}
+
+    def processar(self, pedido_json: Dict[str, Any], clientes: Optional[Dict[str, Optional[Cliente]]] = None) -> PedidoSobel:
         """
         Processa um pedido completo a partir do JSON recebido da API Neogrid.
         Valida o cliente e os itens, retornando um objeto PedidoSobel pronto para ser gravado.
+        ``clientes`` (de ``resolver_clientes``) evita a consulta do cliente
+        quando o CNPJ já foi resolvido para o lote.
         """
         num_pedido = pedido_json.get("num_pedido", "N/A")
         cnpj = pedido_json.get("cnpj", "")
@@ -33,7 +50,11 @@ class ProcessadorPedido:
         
         # Validar cliente
         try:
-            cliente = self.validador_cliente.validar_cliente(cnpj)
+            cnpj_limpo = extrair_cnpj_limpo(cnpj)
+            if clientes is not None and cnpj_limpo in clientes:
+                cliente = clientes[cnpj_limpo]
+            else:
+                cliente = self.validador_cliente.validar_cliente(cnpj)
             if not cliente:
                 raise ClienteNaoEncontradoError(cnpj, num_pedido)
         except Exception as e:
@@ -57,9 +78,16 @@ class ProcessadorPedido:
         itens_processados = []
         erros_itens = []
 
+        # Produtos de todos os itens de uma vez (uma consulta ao SB1010 para os que faltarem)
+        try:
+            produtos = self.processador_item.resolver_produtos(itens_json)
+        except Exception as e:
+            print(f"Erro ao validar produtos do pedido {num_pedido} em lote: {e}")
+            produtos = None
+
         for i, item in enumerate(itens_json):
             try:
-                item_processado = self.processador_item.processar_item(item)
+                item_processado = self.processador_item.processar_item(item, produtos)
                 itens_processados.append(item_processado)
             except Exception as e:
                 erro_msg = f"Item {i+1}: {str(e)}"
@@ -105,7 +133,7 @@ class ProcessadorPedido:
         
         return True
 
-    def processar_com_validacao(self, pedido_json: Dict[str, Any]) -> PedidoSobel:
+    def processar_com_validacao(self, pedido_json: Dict[str, Any], clientes: Optional[Dict[str, Optional[Cliente]]] = None) -> PedidoSobel:
         """
         Processa pedido com validação prévia dos dados básicos
         """
@@ -113,4 +141,4 @@ class ProcessadorPedido:
         self.validar_dados_basicos(pedido_json)
         
         # Processar normalmente
-        return self.processar(pedido_json)
\ No newline at end of file
+        return self.processar(pedido_json, clientes)
\ No newline at end of file
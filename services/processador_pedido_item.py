@@ -4,27 +4,49 @@ import os
 # Adiciona o diretório raiz do projeto ao path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Optional, Tuple
 from models.pedido_item_sobel import PedidoItemSobel
+from models.produto import Produto
 from services.validador_produto import ValidadorProduto
 
 class ProcessadorPedidoItem:
     def __init__(self, validador_produto: ValidadorProduto):
         self.validador_produto = validador_produto
 
-    def processar_item(self, item_json: Dict[str, Any]) -> PedidoItemSobel:
+    @staticmethod
+    def codigos_item(item_json: Dict[str, Any]) -> Tuple[str, str, str]:
+        """(EAN13, DUN14, código interno) do item, sem espaços nas pontas"""
+        return (
+            item_json.get("ean13", "").strip(),
+            item_json.get("dun14", "").strip(),
+            item_json.get("codprod", "").strip(),
+        )
+
+    def resolver_produtos(self, itens_json: Iterable[Dict[str, Any]]) -> Dict[Tuple[str, str, str], Optional[Produto]]:
+        """
+        Valida de uma vez os produtos dos itens de um pedido (ver
+        ``ValidadorProduto.validar_produtos``). O resultado é passado a
+        ``processar_item`` como ``produtos``.
+        """
+        return self.validador_produto.validar_produtos(self.codigos_item(item) for item in itens_json)
+
+    def processar_item(
+        self, item_json: Dict[str, Any], produtos: Optional[Dict[Tuple[str, str, str], Optional[Produto]]] = None,
+    ) -> PedidoItemSobel:
         """
         Processa um item do pedido:
         1. Extrai os códigos (EAN13, DUN14, código interno)
-        2. Valida o produto usando o ValidadorProduto
+        2. Valida o produto usando o ValidadorProduto (ou ``produtos``, de
+           ``resolver_produtos``, se o item já foi resolvido com o pedido)
         3. Retorna um PedidoItemSobel com os dados processados
         """
-        ean13 = item_json.get("ean13", "").strip()
-        dun14 = item_json.get("dun14", "").strip()
-        codprod = item_json.get("codprod", "").strip()
-        
+        ean13, dun14, codprod = chave = self.codigos_item(item_json)
+
         # Buscar produto usando os validadores
-        produto = self.validador_produto.validar_produto(ean13, dun14, codprod)
+        if produtos is not None and chave in produtos:
+            produto = produtos[chave]
+        else:
+            produto = self.validador_produto.validar_produto(ean13, dun14, codprod)
         
         if not produto:
             raise ValueError(
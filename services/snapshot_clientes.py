@@ -0,0 +1,338 @@
+# services/snapshot_clientes.py
+import sys
+import os
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from utils.logger import logger
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS CLIENTES (
+    RECNO INTEGER PRIMARY KEY,
+    CNPJ TEXT NOT NULL,
+    DELETADO INTEGER NOT NULL DEFAULT 0,
+    VALORES TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS IX_CLIENTES_CNPJ ON CLIENTES (CNPJ, RECNO);
+CREATE TABLE IF NOT EXISTS META (
+    CHAVE TEXT PRIMARY KEY,
+    VALOR TEXT
+);
+"""
+
+
+class SnapshotClientes:
+    """
+    Cópia local do SA1010 (arquivo SQLite) com as colunas usadas pelo
+    ``ValidadorCliente``, indexada em memória por CNPJ.
+
+    A primeira sincronização exporta o cadastro inteiro; as seguintes
+    trazem só as linhas com ``marcador`` maior que o último recebido. O
+    marcador é uma coluna de timestamp de gravação (``S_T_A_M_P_``): assim
+    o delta traz inclusões, alterações (como o bloqueio em ``A1_MSBLQL``)
+    e exclusões lógicas. ``R_E_C_N_O_`` é recusado, porque só enxerga
+    clientes novos; exclusões físicas chegam na exportação completa periódica.
+    Se o Protheus cair, as consultas continuam sendo atendidas pelo
+    snapshot; ``metricas()`` mostra o atraso desde a última sincronização.
+    """
+
+    def __init__(self, db, caminho: str, colunas_sql: str, marcador: str = "S_T_A_M_P_", lote: int = 5000):
+        if not re.fullmatch(r"\w+", marcador):
+            raise ValueError(f"Coluna marcadora inválida: {marcador}")
+        if marcador.upper() == "R_E_C_N_O_":
+            raise ValueError(
+                "R_E_C_N_O_ só enxerga clientes novos (bloqueios não chegariam ao snapshot); "
+                "use uma coluna de timestamp como S_T_A_M_P_"
+            )
+        self.db = db
+        self.caminho = caminho
+        self.colunas_sql = colunas_sql
+        self.marcador = marcador
+        self.lote = lote
+        self.colunas: List[str] = []
+        self._indice: Dict[str, Tuple[int, tuple]] = {}
+        self._ultimo_marcador: Any = None
+        self._ultima_sincronizacao: Optional[datetime] = None
+        self._ultima_completa: Optional[datetime] = None
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._acordar = threading.Event()
+        self._encerrar = False
+        self._thread: Optional[threading.Thread] = None
+        self._contadores = {
+            "sincronizacoes": 0,
+            "completas": 0,
+            "falhas": 0,
+            "falhas_consecutivas": 0,
+            "linhas_ultima": 0,
+            "duracao_ultima": 0.0,
+            "consultas": 0,
+            "encontrados": 0,
+        }
+
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        with closing(self._conectar_local()) as local:
+            local.executescript(_ESQUEMA)
+
+    def _conectar_local(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.caminho, timeout=30, isolation_level=None)
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+    def buscar(self, cnpj_limpo: str) -> Optional[tuple]:
+        """Valores das ``colunas`` do cliente ativo com o CNPJ, ou ``None``"""
+        with self._lock:
+            entrada = self._indice.get(cnpj_limpo)
+            self._contadores["consultas"] += 1
+            if entrada is None:
+                return None
+            self._contadores["encontrados"] += 1
+            return entrada[1]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._indice)
+
+    # ------------------------------------------------------------------
+    # Carga do arquivo local e sincronização com o SA1010
+    # ------------------------------------------------------------------
+    def carregar(self) -> int:
+        """
+        Monta o índice em memória a partir do arquivo local. Retorna a
+        quantidade de clientes; 0 se o arquivo estiver vazio ou tiver sido
+        gerado com outra coluna marcadora (exige exportação completa).
+        """
+        with closing(self._conectar_local()) as local:
+            meta = dict(local.execute("SELECT CHAVE, VALOR FROM META").fetchall())
+            if not meta.get("colunas") or meta.get("marcador_coluna") != self.marcador:
+                return 0
+
+            colunas = json.loads(meta["colunas"])
+            indice: Dict[str, Tuple[int, tuple]] = {}
+            for cnpj, recno, valores in local.execute(
+                "SELECT CNPJ, RECNO, VALORES FROM CLIENTES WHERE DELETADO = 0 ORDER BY RECNO"
+            ):
+                # Mesmo CNPJ em mais de uma loja: fica a de menor R_E_C_N_O_
+                indice.setdefault(cnpj, (recno, tuple(json.loads(valores))))
+
+        with self._lock:
+            self.colunas = colunas
+            self._indice = indice
+            self._ultimo_marcador = self._ler_marcador(meta.get("ultimo_marcador"))
+            self._ultima_sincronizacao = self._ler_data(meta.get("ultima_sincronizacao"))
+            self._ultima_completa = self._ler_data(meta.get("ultima_completa"))
+
+        logger.info(f"👥 Snapshot de clientes carregado: {len(indice)} cliente(s) de {self.caminho}")
+        return len(indice)
+
+    def sincronizar(self, completa: bool = False) -> Optional[int]:
+        """
+        Traz do SA1010 as linhas novas (ou todas, se ``completa`` ou se
+        ainda não houve exportação) e atualiza arquivo e índice.
+        Retorna a quantidade de linhas recebidas, ou ``None`` se o banco
+        não respondeu (o snapshot atual continua valendo).
+        """
+        with self._sync_lock:
+            completa = completa or self._ultimo_marcador is None
+            inicio = time.monotonic()
+            try:
+                linhas, alterados = self._exportar(completa)
+            except Exception as e:
+                with self._lock:
+                    self._contadores["falhas"] += 1
+                    self._contadores["falhas_consecutivas"] += 1
+                logger.warning(f"⚠️ Sincronização do snapshot de clientes falhou: {e}")
+                return None
+
+            if completa:
+                self.carregar()
+            else:
+                self._atualizar_indice(alterados)
+
+            duracao = time.monotonic() - inicio
+            with self._lock:
+                self._contadores["sincronizacoes"] += 1
+                self._contadores["completas"] += int(completa)
+                self._contadores["falhas_consecutivas"] = 0
+                self._contadores["linhas_ultima"] = linhas
+                self._contadores["duracao_ultima"] = duracao
+
+            tipo = "completa" if completa else "delta"
+            logger.debug(f"👥 Snapshot de clientes sincronizado ({tipo}): {linhas} linha(s) em {duracao:.2f}s")
+            return linhas
+
+    def _exportar(self, completa: bool) -> Tuple[int, set]:
+        """Copia as linhas do SA1010 para o arquivo local; retorna (linhas, CNPJs alterados)"""
+        query = (
+            f"SELECT R_E_C_N_O_ AS SNAP_RECNO, {self.marcador} AS SNAP_MARCADOR, "
+            f"D_E_L_E_T_ AS SNAP_DELETADO, {self.colunas_sql} FROM SA1010"
+        )
+        params: tuple = ()
+        if completa:
+            query += " WHERE D_E_L_E_T_ = ''"
+        else:
+            query += f" WHERE {self.marcador} > ?"
+            params = (self._ultimo_marcador,)
+        query += f" ORDER BY {self.marcador}"
+
+        total = 0
+        alterados = set()
+        marcador = None if completa else self._ultimo_marcador
+        agora = datetime.now()
+
+        with self.db.conexao() as conn:
+            cursor = conn.cursor()
+            local = self._conectar_local()
+            try:
+                logger.sql(query, params)
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                colunas = [coluna[0] for coluna in cursor.description][3:]
+                posicao_cnpj = colunas.index("CGCCPF")
+
+                local.execute("BEGIN")
+                if completa:
+                    local.execute("DELETE FROM CLIENTES")
+                while True:
+                    linhas = cursor.fetchmany(self.lote)
+                    if not linhas:
+                        break
+                    registros = []
+                    for linha in linhas:
+                        valores = list(linha[3:])
+                        cnpj = str(valores[posicao_cnpj] or "").strip()
+                        registros.append((
+                            int(linha[0]), cnpj, int(bool(str(linha[2] or "").strip())),
+                            json.dumps(valores, default=str, ensure_ascii=False),
+                        ))
+                        alterados.add(cnpj)
+                    local.executemany(
+                        "INSERT OR REPLACE INTO CLIENTES (RECNO, CNPJ, DELETADO, VALORES) VALUES (?, ?, ?, ?)",
+                        registros,
+                    )
+                    marcador = linhas[-1][1]
+                    total += len(linhas)
+
+                meta = {
+                    "colunas": json.dumps(colunas),
+                    "marcador_coluna": self.marcador,
+                    "ultimo_marcador": json.dumps(marcador, default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v)),
+                    "ultima_sincronizacao": agora.isoformat(),
+                }
+                if completa:
+                    meta["ultima_completa"] = agora.isoformat()
+                local.executemany("INSERT OR REPLACE INTO META (CHAVE, VALOR) VALUES (?, ?)", meta.items())
+                local.execute("COMMIT")
+            except Exception:
+                if local.in_transaction:
+                    local.execute("ROLLBACK")
+                raise
+            finally:
+                local.close()
+                cursor.close()
+
+        with self._lock:
+            self._ultimo_marcador = marcador
+            self._ultima_sincronizacao = agora
+            if completa:
+                self._ultima_completa = agora
+            if not self.colunas:
+                self.colunas = colunas
+        return total, alterados
+
+    def _atualizar_indice(self, cnpjs: set):
+        """Relê do arquivo local os CNPJs alterados por um delta"""
+        if not cnpjs:
+            return
+        with closing(self._conectar_local()) as local:
+            novos = {}
+            for cnpj in cnpjs:
+                linha = local.execute(
+                    "SELECT RECNO, VALORES FROM CLIENTES WHERE CNPJ = ? AND DELETADO = 0 ORDER BY RECNO LIMIT 1",
+                    (cnpj,),
+                ).fetchone()
+                novos[cnpj] = (linha[0], tuple(json.loads(linha[1]))) if linha else None
+
+        with self._lock:
+            for cnpj, entrada in novos.items():
+                if entrada is None:
+                    self._indice.pop(cnpj, None)
+                else:
+                    self._indice[cnpj] = entrada
+
+    @staticmethod
+    def _ler_marcador(texto: Optional[str]) -> Any:
+        if not texto:
+            return None
+        valor = json.loads(texto)
+        if isinstance(valor, str):
+            try:
+                return datetime.fromisoformat(valor)
+            except ValueError:
+                return valor
+        return valor
+
+    @staticmethod
+    def _ler_data(texto: Optional[str]) -> Optional[datetime]:
+        return datetime.fromisoformat(texto) if texto else None
+
+    # ------------------------------------------------------------------
+    # Sincronização periódica
+    # ------------------------------------------------------------------
+    def iniciar(self, intervalo: float, completa_a_cada: float = 0.0):
+        """
+        Sincroniza em segundo plano a cada ``intervalo`` segundos, com
+        exportação completa a cada ``completa_a_cada`` segundos (0 = nunca).
+        """
+        if self._thread is not None:
+            return
+        self._encerrar = False
+        self._thread = threading.Thread(
+            target=self._executar, args=(intervalo, completa_a_cada),
+            name="snapshot-clientes", daemon=True,
+        )
+        self._thread.start()
+
+    def parar(self):
+        self._encerrar = True
+        self._acordar.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _executar(self, intervalo: float, completa_a_cada: float):
+        while not self._encerrar:
+            self._acordar.wait(intervalo)
+            self._acordar.clear()
+            if self._encerrar:
+                break
+            ultima_completa = self._ultima_completa
+            completa = bool(completa_a_cada) and (
+                ultima_completa is None
+                or (datetime.now() - ultima_completa).total_seconds() >= completa_a_cada
+            )
+            self.sincronizar(completa)
+
+    def metricas(self) -> Dict[str, Any]:
+        with self._lock:
+            ultima = self._ultima_sincronizacao
+            return {
+                **self._contadores,
+                "clientes": len(self._indice),
+                "marcador": self.marcador,
+                "ultimo_marcador": self._ultimo_marcador,
+                "ultima_sincronizacao": ultima.isoformat() if ultima else None,
+                "ultima_completa": self._ultima_completa.isoformat() if self._ultima_completa else None,
+                "atraso_segundos": (datetime.now() - ultima).total_seconds() if ultima else None,
+            }
@@ -0,0 +1,521 @@
+# services/sqlite_backend.py
+"""
+Backend local (SQLite) que substitui o SQL Server do Protheus em testes
+de carga e benchmarks.
+
+``ConexaoSQLite`` imita a parte da API do pyodbc usada pelo projeto
+(cursor, autocommit, commit/rollback, linhas com acesso por atributo e
+erros ``pyodbc.Error``) e traduz o T-SQL das consultas existentes para o
+dialeto do SQLite. O banco é criado e populado (SA1010/SB1010) na
+primeira conexão a cada arquivo.
+"""
+import sys
+import os
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import json
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import pyodbc
+from utils.logger import logger
+
+# Datas como no SQL Server: DATETIME devolvido como ``datetime``, gravado com
+# milissegundos (mesmo formato de S_T_A_M_P_, para comparar como texto)
+sqlite3.register_adapter(datetime, lambda valor: valor.isoformat(" ", timespec="milliseconds"))
+sqlite3.register_adapter(date, lambda valor: valor.isoformat() + " 00:00:00.000")
+sqlite3.register_adapter(Decimal, float)
+
+
+def _converter_datetime(valor: bytes):
+    texto = valor.decode()
+    try:
+        return datetime.fromisoformat(texto)
+    except ValueError:
+        return texto
+
+
+sqlite3.register_converter("DATETIME", _converter_datetime)
+
+
+# ----------------------------------------------------------------------
+# Tradução T-SQL -> SQLite
+# ----------------------------------------------------------------------
+_RE_NOCOUNT = re.compile(r"^\s*SET\s+NOCOUNT\s+ON\s*;", re.IGNORECASE)
+_RE_HINTS = re.compile(
+    r"\bWITH\s*\(\s*(?:NOLOCK|TABLOCKX|TABLOCK|HOLDLOCK|UPDLOCK|ROWLOCK|READPAST)"
+    r"(?:\s*,\s*(?:NOLOCK|TABLOCKX|TABLOCK|HOLDLOCK|UPDLOCK|ROWLOCK|READPAST))*\s*\)",
+    re.IGNORECASE,
+)
+_RE_TOP_PARAM = re.compile(r"\bSELECT\s+TOP\s*\(\s*\?\s*\)", re.IGNORECASE)
+_RE_TOP = re.compile(r"\bSELECT\s+TOP\s*\(?\s*(\d+)\s*\)?", re.IGNORECASE)
+_RE_SAVE = re.compile(r"^\s*SAVE\s+TRAN(?:SACTION)?\s+(\w+)\s*;?\s*$", re.IGNORECASE)
+_RE_ROLLBACK_SAVE = re.compile(r"^\s*ROLLBACK\s+TRAN(?:SACTION)?\s+(\w+)\s*;?\s*$", re.IGNORECASE)
+_RE_CAST_DATE = re.compile(r"CAST\(\s*([^()]*(?:\([^()]*\))?[^()]*?)\s+AS\s+DATE\s*\)", re.IGNORECASE)
+_RE_COLUNAS = re.compile(
+    r"^\s*SELECT\s+COLUMN_NAME\s+FROM\s+INFORMATION_SCHEMA\.COLUMNS\s+"
+    r"WHERE\s+TABLE_NAME\s*=\s*'(\w+)'.*$",
+    re.IGNORECASE | re.DOTALL,
+)
+_RE_VALUES_ALIAS = re.compile(r"\(\s*VALUES\s+(.*?)\)\s+AS\s+(\w+)\s*\(([\w\s,]+)\)", re.IGNORECASE | re.DOTALL)
+_RE_SEQUENCE = re.compile(r"\bsp_sequence_get_range\b", re.IGNORECASE)
+_RE_EXEC = re.compile(r"^\s*EXEC(?:UTE)?\s+([\w.\[\]]+)", re.IGNORECASE)
+
+
+def traduzir_tsql(sql: str, params: Sequence[Any] = ()) -> Tuple[str, Sequence[Any]]:
+    """
+    Converte as construções T-SQL usadas pelo projeto para SQLite.
+    Devolve o comando traduzido e os parâmetros (reordenados quando
+    ``TOP (?)`` vira ``LIMIT ?`` no fim da consulta).
+    """
+    sql = _RE_NOCOUNT.sub("", sql)
+
+    coluna = _RE_COLUNAS.match(sql)
+    if coluna:
+        return f"SELECT name AS COLUMN_NAME FROM pragma_table_info('{coluna.group(1)}') ORDER BY cid", params
+
+    savepoint = _RE_SAVE.match(sql)
+    if savepoint:
+        return f"SAVEPOINT {savepoint.group(1)}", params
+    rollback = _RE_ROLLBACK_SAVE.match(sql)
+    if rollback:
+        return f"ROLLBACK TO {rollback.group(1)}", params
+
+    sql = _RE_HINTS.sub("", sql)
+    sql = _RE_CAST_DATE.sub(r"DATE(\1)", sql)
+    sql = re.sub(r"\bGETDATE\(\)", "DATETIME('now', 'localtime')", sql, flags=re.IGNORECASE)
+    sql = re.sub(r"\bISNULL\(", "IFNULL(", sql, flags=re.IGNORECASE)
+    sql = re.sub(r"\bLEN\(", "LENGTH(", sql, flags=re.IGNORECASE)
+    sql = _RE_VALUES_ALIAS.sub(_traduzir_values, sql)
+
+    if _RE_TOP_PARAM.search(sql):
+        sql = _RE_TOP_PARAM.sub("SELECT", sql, count=1)
+        sql = sql.rstrip().rstrip(";") + " LIMIT ?"
+        params = list(params[1:]) + [params[0]]
+    else:
+        top = _RE_TOP.search(sql)
+        if top:
+            sql = _RE_TOP.sub("SELECT", sql, count=1)
+            sql = sql.rstrip().rstrip(";") + f" LIMIT {top.group(1)}"
+
+    return sql, params
+
+
+def _traduzir_values(match) -> str:
+    """``(VALUES ...) AS C(a, b)`` -> ``(SELECT column1 AS a, column2 AS b FROM (VALUES ...)) AS C``"""
+    colunas = [c.strip() for c in match.group(3).split(",")]
+    selecao = ", ".join(f"column{i} AS {c}" for i, c in enumerate(colunas, start=1))
+    return f"(SELECT {selecao} FROM (VALUES {match.group(1)})) AS {match.group(2)}"
+
+
+def _erro_pyodbc(erro: sqlite3.Error) -> pyodbc.Error:
+    """Converte o erro do SQLite no erro equivalente do pyodbc"""
+    mensagem = str(erro)
+    if isinstance(erro, sqlite3.IntegrityError):
+        return pyodbc.IntegrityError("23000", f"[23000] {mensagem} (duplicate key)" if "UNIQUE" in mensagem else f"[23000] {mensagem}")
+    if "no such table" in mensagem:
+        return pyodbc.ProgrammingError("42S02", f"[42S02] Invalid object name: {mensagem}")
+    if "no such column" in mensagem or "has no column" in mensagem:
+        return pyodbc.ProgrammingError("42S22", f"[42S22] Invalid column name: {mensagem}")
+    if isinstance(erro, sqlite3.OperationalError) and "locked" in mensagem:
+        return pyodbc.OperationalError("HYT00", f"[HYT00] {mensagem}")
+    return pyodbc.Error("HY000", f"[HY000] {mensagem}")
+
+
+# ----------------------------------------------------------------------
+# Linhas, cursor e conexão compatíveis com pyodbc
+# ----------------------------------------------------------------------
+class LinhaSQLite(tuple):
+    """Linha com acesso por índice e por nome de coluna (``row.CODIGO``), como ``pyodbc.Row``"""
+
+    def __new__(cls, valores, indices: Dict[str, int]):
+        linha = super().__new__(cls, valores)
+        linha._indices = indices
+        return linha
+
+    def __getattr__(self, nome):
+        try:
+            return self[self._indices[nome]]
+        except KeyError:
+            raise AttributeError(nome)
+
+
+class CursorSQLite:
+    def __init__(self, conexao: "ConexaoSQLite"):
+        self._conexao = conexao
+        self._cursor = conexao._sqlite.cursor()
+        self._cursor.row_factory = self._linha
+        self._indices: Dict[str, int] = {}
+        self._resultado: Optional[List[tuple]] = None
+        self.fast_executemany = False
+
+    def _linha(self, cursor, valores):
+        return LinhaSQLite(valores, self._indices)
+
+    @property
+    def description(self):
+        if self._resultado is not None:
+            return (("", None, None, None, None, None, None),)
+        return self._cursor.description
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    def execute(self, sql: str, *params):
+        if len(params) == 1 and isinstance(params[0], (list, tuple)):
+            params = params[0]
+        self._resultado = None
+
+        if _RE_SEQUENCE.search(sql):
+            self._reservar_faixa(*params)
+            return self
+        procedure = _RE_EXEC.match(_RE_NOCOUNT.sub("", sql))
+        if procedure:
+            raise pyodbc.ProgrammingError(
+                "42000", f"[42000] Could not find stored procedure '{procedure.group(1)}'. (2812)"
+            )
+
+        sql, params = traduzir_tsql(sql, params)
+        try:
+            self._conexao._iniciar_transacao_se_necessario(sql)
+            self._cursor.execute(sql, tuple(params))
+        except sqlite3.Error as e:
+            raise _erro_pyodbc(e) from e
+        self._atualizar_indices()
+        return self
+
+    def executemany(self, sql: str, seq_params: Iterable[Sequence[Any]]):
+        sql, _ = traduzir_tsql(sql)
+        self._resultado = None
+        try:
+            self._conexao._iniciar_transacao_se_necessario(sql)
+            self._cursor.executemany(sql, [tuple(p) for p in seq_params])
+        except sqlite3.Error as e:
+            raise _erro_pyodbc(e) from e
+        return self
+
+    def fetchone(self):
+        if self._resultado is not None:
+            return self._resultado.pop(0) if self._resultado else None
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        if self._resultado is not None:
+            linhas, self._resultado = self._resultado, []
+            return linhas
+        return self._cursor.fetchall()
+
+    def fetchmany(self, tamanho: int = 1):
+        if self._resultado is not None:
+            linhas, self._resultado = self._resultado[:tamanho], self._resultado[tamanho:]
+            return linhas
+        return self._cursor.fetchmany(tamanho)
+
+    def close(self):
+        self._cursor.close()
+
+    def _atualizar_indices(self):
+        descricao = self._cursor.description or ()
+        self._indices = {coluna[0]: i for i, coluna in enumerate(descricao)}
+
+    def _reservar_faixa(self, nome: str, tamanho: int):
+        """Emula ``sys.sp_sequence_get_range`` com a tabela T_SEQUENCIAS"""
+        try:
+            self._conexao._iniciar_transacao_se_necessario("UPDATE")
+            self._cursor.execute(
+                "UPDATE T_SEQUENCIAS SET PROXIMO = PROXIMO + ? WHERE NOME = ?", (int(tamanho), nome)
+            )
+            if self._cursor.rowcount == 0:
+                raise pyodbc.ProgrammingError("42S02", f"[42S02] Sequence '{nome}' not found")
+            self._cursor.execute("SELECT PROXIMO - ? FROM T_SEQUENCIAS WHERE NOME = ?", (int(tamanho), nome))
+            self._resultado = [LinhaSQLite(tuple(self._cursor.fetchone()), {})]
+        except sqlite3.Error as e:
+            raise _erro_pyodbc(e) from e
+
+
+class ConexaoSQLite:
+    """Conexão SQLite com a interface de ``pyodbc.Connection`` usada pelo projeto"""
+
+    def __init__(self, caminho: str, timeout: float = 30.0):
+        self.caminho = caminho
+        self._sqlite = sqlite3.connect(
+            caminho,
+            timeout=timeout,
+            isolation_level=None,  # transações controladas por ``autocommit``
+            check_same_thread=False,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+        )
+        self._sqlite.execute("PRAGMA journal_mode=WAL")
+        self._sqlite.execute("PRAGMA synchronous=NORMAL")
+        self._autocommit = True
+        self.closed = False
+
+    @property
+    def autocommit(self) -> bool:
+        return self._autocommit
+
+    @autocommit.setter
+    def autocommit(self, valor: bool):
+        # Como no ODBC, voltar ao autocommit confirma a transação pendente
+        if valor and self._sqlite.in_transaction:
+            self._sqlite.execute("COMMIT")
+        self._autocommit = bool(valor)
+
+    def _iniciar_transacao_se_necessario(self, sql: str):
+        if not self._autocommit and not self._sqlite.in_transaction:
+            self._sqlite.execute("BEGIN IMMEDIATE")
+
+    def cursor(self) -> CursorSQLite:
+        if self.closed:
+            raise pyodbc.ProgrammingError("08003", "[08003] Attempt to use a closed connection.")
+        return CursorSQLite(self)
+
+    def commit(self):
+        if self._sqlite.in_transaction:
+            self._sqlite.execute("COMMIT")
+
+    def rollback(self):
+        if self._sqlite.in_transaction:
+            self._sqlite.execute("ROLLBACK")
+
+    def setdecoding(self, *args, **kwargs):
+        pass
+
+    def setencoding(self, *args, **kwargs):
+        pass
+
+    def close(self):
+        if not self.closed:
+            self._sqlite.close()
+            self.closed = True
+
+
+# ----------------------------------------------------------------------
+# Esquema e carga inicial
+# ----------------------------------------------------------------------
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS T_PEDIDO_SOBEL (
+    NUMPEDIDO INTEGER NOT NULL,
+    NUMPEDIDOSOBEL VARCHAR(50),
+    LOJACLIENTE VARCHAR(10),
+    NUMPEDIDOAFV VARCHAR(100) NOT NULL,
+    DATAPEDIDO DATETIME NOT NULL,
+    HORAINICIAL VARCHAR(10),
+    HORAFINAL VARCHAR(10),
+    DATAENTREGA DATETIME,
+    CODIGOCLIENTE VARCHAR(20),
+    CODIGOTIPOPEDIDO VARCHAR(10),
+    CODIGOCONDPAGTO VARCHAR(10),
+    CODIGONOMEENDERECO VARCHAR(10),
+    CODIGOUNIDFAT VARCHAR(10),
+    CODIGOTABPRECO VARCHAR(10),
+    ORDEMCOMPRA VARCHAR(50),
+    OBSERVACAOI VARCHAR(500),
+    OBSERVACAOII VARCHAR(500),
+    VALORLIQUIDO DECIMAL(15,2),
+    VALORBRUTO DECIMAL(15,2),
+    CODIGOMOTIVOTIPOPED VARCHAR(10),
+    CODIGOVENDEDORESP VARCHAR(10),
+    CESP_DATAENTREGAFIM DATETIME,
+    CESP_NUMPEDIDOASSOC VARCHAR(50),
+    DATAGRAVACAOACACIA DATETIME,
+    DATAINTEGRACAOERP DATETIME,
+    QTDEITENS INTEGER,
+    MSGIMPORTACAO VARCHAR(500),
+    VOLUME INTEGER,
+    UNIQUE (NUMPEDIDOAFV, DATAPEDIDO, HORAINICIAL, CODIGOCLIENTE)
+);
+CREATE INDEX IF NOT EXISTS IX_PEDIDO_AFV_DATA ON T_PEDIDO_SOBEL (NUMPEDIDOAFV, DATAPEDIDO);
+-- Equivalente ao IX_PEDIDO_DATAGRAVACAO (data/estatisticas_pedido.sql), sem INCLUDE no SQLite
+CREATE INDEX IF NOT EXISTS IX_PEDIDO_DATAGRAVACAO ON T_PEDIDO_SOBEL (DATAGRAVACAOACACIA, VALORBRUTO);
+
+CREATE TABLE IF NOT EXISTS T_PEDIDOITEM_SOBEL (
+    NUMPEDIDO INTEGER NOT NULL,
+    NUMITEM INTEGER NOT NULL PRIMARY KEY,
+    NUMPEDIDOAFV VARCHAR(100) NOT NULL,
+    DATAPEDIDO DATETIME,
+    HORAINICIAL VARCHAR(10),
+    CODIGOCLIENTE VARCHAR(20),
+    CODIGOPRODUTO VARCHAR(30),
+    QTDEVENDA DECIMAL(15,4),
+    QTDEBONIFICADA DECIMAL(15,4),
+    VALORVENDA DECIMAL(15,2),
+    VALORBRUTO DECIMAL(15,2),
+    DESCONTOI DECIMAL(15,2),
+    DESCONTOII DECIMAL(15,2),
+    VALORVERBA DECIMAL(15,2),
+    CODIGOVENDEDORESP VARCHAR(10),
+    MSGIMPORTACAO VARCHAR(500)
+);
+CREATE INDEX IF NOT EXISTS IX_ITEM_AFV ON T_PEDIDOITEM_SOBEL (NUMPEDIDOAFV);
+
+CREATE TABLE IF NOT EXISTS T_ESTATISTICA_PEDIDO_DIA (
+    DATA DATE NOT NULL PRIMARY KEY,
+    QTDEPEDIDOS INTEGER NOT NULL DEFAULT 0,
+    VALORBRUTO DECIMAL(18,2) NOT NULL DEFAULT 0,
+    DATAATUALIZACAO DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS T_LOG_PROCESSAMENTO (
+    ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    DATA_HORA DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    TIPO VARCHAR(20) NOT NULL,
+    MENSAGEM VARCHAR(1000) NOT NULL,
+    NUM_PEDIDO VARCHAR(50)
+);
+
+CREATE TABLE IF NOT EXISTS T_SEQUENCIAS (
+    NOME VARCHAR(256) NOT NULL PRIMARY KEY,
+    PROXIMO INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS SA1010 (
+    R_E_C_N_O_ INTEGER PRIMARY KEY,
+    A1_COD VARCHAR(6) NOT NULL,
+    A1_LOJA VARCHAR(2) NOT NULL DEFAULT '01',
+    A1_NOME VARCHAR(60),
+    A1_NREDUZ VARCHAR(40),
+    A1_CGC VARCHAR(14),
+    A1_INSCR VARCHAR(18),
+    A1_END VARCHAR(80),
+    A1_COD_MUN VARCHAR(5),
+    A1_EST VARCHAR(2),
+    A1_BAIRRO VARCHAR(40),
+    A1_TEL VARCHAR(15),
+    A1_FAX VARCHAR(15),
+    A1_CEP VARCHAR(8),
+    A1_MSBLQL VARCHAR(1) DEFAULT '2',
+    A1_DTCAD VARCHAR(8),
+    A1_REGIAO VARCHAR(3),
+    A1_TABELA VARCHAR(3),
+    A1_COND VARCHAR(3),
+    A1_OBSERV VARCHAR(200),
+    A1_EMAIL VARCHAR(100),
+    D_E_L_E_T_ VARCHAR(1) NOT NULL DEFAULT '',
+    S_T_A_M_P_ DATETIME
+);
+
+-- S_T_A_M_P_ como o DBAccess grava no SQL Server: data da última inclusão/alteração
+CREATE TRIGGER IF NOT EXISTS TR_SA1010_STAMP_INS AFTER INSERT ON SA1010
+WHEN NEW.S_T_A_M_P_ IS NULL
+BEGIN
+    UPDATE SA1010 SET S_T_A_M_P_ = strftime('%Y-%m-%d %H:%M:%f', 'now') WHERE R_E_C_N_O_ = NEW.R_E_C_N_O_;
+END;
+CREATE TRIGGER IF NOT EXISTS TR_SA1010_STAMP_UPD AFTER UPDATE ON SA1010
+WHEN NEW.S_T_A_M_P_ IS OLD.S_T_A_M_P_
+BEGIN
+    UPDATE SA1010 SET S_T_A_M_P_ = strftime('%Y-%m-%d %H:%M:%f', 'now') WHERE R_E_C_N_O_ = NEW.R_E_C_N_O_;
+END;
+CREATE INDEX IF NOT EXISTS IX_SA1010_CGC ON SA1010 (A1_CGC);
+CREATE INDEX IF NOT EXISTS IX_SA1010_NOME ON SA1010 (A1_NOME, A1_COD, A1_LOJA);
+
+CREATE TABLE IF NOT EXISTS SB1010 (
+    B1_COD VARCHAR(30) NOT NULL,
+    B1_DESC VARCHAR(100),
+    B1_CODBAR VARCHAR(15),
+    B1_ZZCODBA VARCHAR(15),
+    B1_UM VARCHAR(2),
+    B1_PESBRU DECIMAL(11,4),
+    B1_PESO DECIMAL(11,4),
+    B1_QE DECIMAL(9,2),
+    B1_MSBLQL VARCHAR(1) DEFAULT '2',
+    D_E_L_E_T_ VARCHAR(1) NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS IX_SB1010_CODBAR ON SB1010 (B1_CODBAR);
+CREATE INDEX IF NOT EXISTS IX_SB1010_ZZCODBA ON SB1010 (B1_ZZCODBA);
+CREATE INDEX IF NOT EXISTS IX_SB1010_COD ON SB1010 (B1_COD);
+"""
+
+_DIR_DATA = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data'))
+
+_preparados = set()
+_preparados_lock = threading.Lock()
+
+
+def preparar_banco_local(caminho: str, clientes_sinteticos: int = 0, sequencia_numitem: Optional[str] = None):
+    """
+    Cria as tabelas usadas pelo importador e popula SA1010/SB1010.
+    SB1010 recebe o catálogo de ``data/produtos.json``; SA1010 recebe os
+    CNPJs dos pedidos de exemplo em ``data/`` mais ``clientes_sinteticos``
+    clientes gerados. Chamadas repetidas para o mesmo arquivo não duplicam dados.
+    """
+    conn = sqlite3.connect(caminho, isolation_level=None)
+    try:
+        # Chave da listagem de clientes passou a incluir A1_LOJA: índice antigo é recriado
+        indice = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'IX_SA1010_NOME'").fetchone()
+        if indice and "A1_LOJA" not in indice[0]:
+            conn.execute("DROP INDEX IX_SA1010_NOME")
+        # Delta do snapshot de clientes usa S_T_A_M_P_: bancos antigos ganham a coluna
+        colunas = {linha[1] for linha in conn.execute("PRAGMA table_info(SA1010)")}
+        if colunas and "S_T_A_M_P_" not in colunas:
+            conn.execute("ALTER TABLE SA1010 ADD COLUMN S_T_A_M_P_ DATETIME")
+            conn.execute("UPDATE SA1010 SET S_T_A_M_P_ = strftime('%Y-%m-%d %H:%M:%f', 'now')")
+        conn.executescript(_ESQUEMA)
+        conn.execute("BEGIN")
+
+        if conn.execute("SELECT COUNT(*) FROM SB1010").fetchone()[0] == 0:
+            conn.executemany(
+                "INSERT INTO SB1010 (B1_COD, B1_DESC, B1_CODBAR, B1_ZZCODBA, B1_UM, B1_PESBRU, B1_PESO, B1_QE) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (p["codigo"], p["descricao"], p.get("ean13", ""), p.get("dun14", ""), p.get("unidade", ""),
+                     p.get("peso_bruto", 0), p.get("peso_liquido", 0), p.get("qtde_embalagem", 1))
+                    for p in _produtos_exemplo()
+                ],
+            )
+
+        if conn.execute("SELECT COUNT(*) FROM SA1010").fetchone()[0] == 0:
+            cnpjs = _cnpjs_exemplo() + [f"{90000000000000 + i:014d}" for i in range(clientes_sinteticos)]
+            conn.executemany(
+                "INSERT INTO SA1010 (A1_COD, A1_NOME, A1_NREDUZ, A1_CGC, A1_EST, A1_DTCAD, A1_REGIAO, A1_TABELA, A1_COND) "
+                "VALUES (?, ?, ?, ?, 'SP', '20240101', '001', '038', '055')",
+                [(f"{i + 1:06d}", f"CLIENTE LOCAL {i + 1}", f"CLIENTE {i + 1}", cnpj) for i, cnpj in enumerate(cnpjs)],
+            )
+
+        if sequencia_numitem:
+            proximo = conn.execute("SELECT IFNULL(MAX(NUMITEM), 0) + 1 FROM T_PEDIDOITEM_SOBEL").fetchone()[0]
+            conn.execute("INSERT OR IGNORE INTO T_SEQUENCIAS (NOME, PROXIMO) VALUES (?, ?)", (sequencia_numitem, proximo))
+
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+
+def conectar_sqlite(caminho: str) -> ConexaoSQLite:
+    """Abre uma conexão com o banco local, criando-o na primeira vez no processo"""
+    from config.settings import settings
+
+    with _preparados_lock:
+        if caminho not in _preparados:
+            os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+            preparar_banco_local(caminho, settings.DB_SQLITE_CLIENTES, settings.DB_NUMITEM_SEQUENCE or None)
+            _preparados.add(caminho)
+            logger.info(f"🗃️ Banco local SQLite pronto em {caminho}")
+    return ConexaoSQLite(caminho)
+
+
+def _produtos_exemplo() -> List[dict]:
+    with open(os.path.join(_DIR_DATA, "produtos.json"), encoding="utf-8") as arquivo:
+        return json.load(arquivo).get("produtos", [])
+
+
+def _cnpjs_exemplo() -> List[str]:
+    """CNPJs de comprador dos documentos Neogrid de exemplo em ``data/``"""
+    cnpjs = []
+    for nome in ("base.json", "dois_pedidos.json"):
+        try:
+            with open(os.path.join(_DIR_DATA, nome), encoding="utf-8") as arquivo:
+                documentos = json.load(arquivo).get("documents", [])
+        except (OSError, ValueError):
+            continue
+        for doc in documentos:
+            for conteudo in doc.get("content", []):
+                cnpj = re.sub(r"\D", "", conteudo.get("order", {}).get("cabecalho", {}).get("cnpjComprador", ""))
+                if cnpj and cnpj not in cnpjs:
+                    cnpjs.append(cnpj)
+    return cnpjs
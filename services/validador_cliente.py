@@ -5,43 +5,165 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 import re
-from typing import Optional
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
 import pyodbc
-from models.cliente import Cliente
+from models.cliente import Cliente, ClienteResumo
+from services.cache_lru import AUSENTE, CacheLRU
 from services.database import Database
+from services.snapshot_clientes import SnapshotClientes
 from config.settings import settings
+from utils.error_handler import BancoDadosError
+from utils.helpers import extrair_cnpj_limpo
 from utils.logger import logger
+from utils.mapeador_linhas import MapeadorLinhas, inteiro, texto
+
+# Cache de clientes compartilhado pelo processo (o app cria um validador por importação)
+_cache_clientes: Optional[CacheLRU] = None
+_cache_clientes_lock = threading.Lock()
+
+
+def obter_cache_clientes() -> Optional[CacheLRU]:
+    """Retorna o cache de clientes do processo; ``None`` se CLIENTES_CACHE_MAX=0"""
+    global _cache_clientes
+    if settings.CLIENTES_CACHE_MAX <= 0:
+        return None
+    with _cache_clientes_lock:
+        if _cache_clientes is None:
+            _cache_clientes = CacheLRU(
+                max_itens=settings.CLIENTES_CACHE_MAX,
+                ttl=settings.CLIENTES_CACHE_TTL,
+                ttl_negativo=settings.CLIENTES_CACHE_TTL_NEGATIVO,
+            )
+        return _cache_clientes
+
+
+# Snapshot local do SA1010 compartilhado pelo processo (CLIENTES_SNAPSHOT_PATH)
+_snapshot_clientes: Optional[SnapshotClientes] = None
+_snapshot_clientes_lock = threading.Lock()
+
+
+def obter_snapshot_clientes(db) -> Optional[SnapshotClientes]:
+    """
+    Retorna o snapshot de clientes do processo; ``None`` se desativado.
+    Na primeira chamada carrega o arquivo local (exportando o SA1010 se
+    ainda não existir) e inicia a sincronização periódica.
+    """
+    global _snapshot_clientes
+    if not settings.CLIENTES_SNAPSHOT_PATH:
+        return None
+    with _snapshot_clientes_lock:
+        if _snapshot_clientes is None:
+            snapshot = SnapshotClientes(
+                db,
+                settings.CLIENTES_SNAPSHOT_PATH,
+                ValidadorCliente.COLUNAS_CLIENTE,
+                settings.CLIENTES_SNAPSHOT_MARCADOR,
+            )
+            if snapshot.carregar() == 0:
+                snapshot.sincronizar(completa=True)
+            snapshot.iniciar(
+                settings.CLIENTES_SNAPSHOT_INTERVALO,
+                settings.CLIENTES_SNAPSHOT_COMPLETA_HORAS * 3600,
+            )
+            _snapshot_clientes = snapshot
+        return _snapshot_clientes
+
 
 class ValidadorCliente:
-    def __init__(self):
+    # CNPJs por consulta em validar_clientes (o SQL Server aceita até 2100 parâmetros)
+    LOTE_CNPJS = 1000
+
+    # Colunas do SA1010 no formato esperado por Cliente.from_dict
+    COLUNAS_CLIENTE = """
+                    A1_COD as CODIGO,
+                    A1_NOME as RAZAOSOCIAL,
+                    A1_CGC as CGCCPF,
+                    A1_INSCR as INSCR_ESTADUAL,
+                    A1_END as ENDERECO,
+                    A1_COD_MUN as CODIGONOMECIDADE,
+                    A1_EST as ESTADO,
+                    A1_BAIRRO as BAIRRO,
+                    A1_TEL as TELEFONE,
+                    A1_FAX as FAX,
+                    A1_CEP as CEP,
+                    A1_MSBLQL as CODIGOSTATUSCLI,
+                    A1_NREDUZ as NOMEFANTASIA,
+                    A1_DTCAD as DATACADASTRO,
+                    A1_COD as CODIGOENDENTREGA,
+                    A1_REGIAO as CODIGOREGIAO,
+                    A1_TABELA as CODIGOTABPRECO,
+                    A1_COND as CODIGOCONDPAGTO,
+                    '' as CODIGOCLIENTEPAI,
+                    A1_OBSERV as OBSFETCHATURAMENTO,
+                    A1_EMAIL as EMAILCOPIAPEDIDO,
+                    'N' as FLAGENVIACOPIAPEDIDO,
+                    0 as CESP_FLAGENTREGAAGENDADA,
+                    '0' as Cesp_QtdeDiasMinEntrega"""
+    SELECT_CLIENTE = f"""
+                SELECT {COLUNAS_CLIENTE}
+                FROM SA1010"""
+
+    # Coluna -> atributo de Cliente, com as mesmas conversões de Cliente.from_dict
+    CAMPOS_CLIENTE = (
+        ("CODIGO", "codigo", texto),
+        ("RAZAOSOCIAL", "razao_social", texto),
+        ("CGCCPF", "cnpj", texto),
+        ("INSCR_ESTADUAL", "inscricao_estadual", texto),
+        ("ENDERECO", "endereco", texto),
+        ("CODIGONOMECIDADE", "codigo_nome_cidade", texto),
+        ("ESTADO", "estado", texto),
+        ("BAIRRO", "bairro", texto),
+        ("TELEFONE", "telefone", texto),
+        ("FAX", "fax", texto),
+        ("CEP", "cep", texto),
+        ("CODIGOSTATUSCLI", "codigo_status", texto),
+        ("CODIGOVENDEDORESP", "codigo_vendedor_resp", texto),
+        ("NOMEFANTASIA", "nome_fantasia", texto),
+        ("DATACADASTRO", "data_cadastro", texto),
+        ("CODIGOENDENTREGA", "codigo_entrega", texto),
+        ("CODIGOREGIAO", "codigo_regiao", inteiro),
+        ("CODIGOTABPRECO", "codigo_tab_preco", texto),
+        ("CODIGOCONDPAGTO", "codigo_cond_pagto", texto),
+        ("CODIGOCLIENTEPAI", "codigo_cliente_pai", texto),
+        ("OBSFETCHATURAMENTO", "obs_fechamento", texto),
+        ("EMAILCOPIAPEDIDO", "email_copia_pedido", texto),
+        ("FLAGENVIACOPIAPEDIDO", "flag_envia_copia", texto),
+        ("CESP_FLAGENTREGAAGENDADA", "flag_entrega_agendada", inteiro),
+        ("Cesp_QtdeDiasMinEntrega", "qtde_dias_min_entrega", texto),
+    )
+    MAPEADOR = MapeadorLinhas(Cliente, CAMPOS_CLIENTE, vars(Cliente.from_dict({})))
+
+    # Listagem resumida: campos ausentes com os padrões de um cliente ativo
+    MAPEADOR_LISTAGEM = MapeadorLinhas(
+        Cliente,
+        CAMPOS_CLIENTE + (("CODIGO", "codigo_entrega", texto),),
+        vars(Cliente.from_dict({"CODIGOSTATUSCLI": "0", "FLAGENVIACOPIAPEDIDO": "N"})),
+    )
+
+    # Colunas da listagem de clientes ativos (ordem dos campos de ClienteResumo)
+    COLUNAS_LISTAGEM = """
+                    A1_COD as CODIGO,
+                    A1_NOME as RAZAOSOCIAL,
+                    A1_CGC as CGCCPF,
+                    A1_NREDUZ as NOMEFANTASIA,
+                    A1_EST as ESTADO,
+                    A1_LOJA as LOJA"""
+
+    # Clientes por fetchmany em iterar_clientes_ativos
+    LOTE_LISTAGEM = 500
+
+    def __init__(self, cache: Optional[CacheLRU] = None):
         """
-        Inicializa o validador de clientes com a conexão
-        para o banco de dados Protheus_producao.
+        Inicializa o validador de clientes com o pool de conexões
+        compartilhado do banco de dados Protheus_producao.
+        Sem ``cache`` usa o cache de clientes do processo (por CNPJ limpo).
+        Com CLIENTES_SNAPSHOT_PATH consulta primeiro o snapshot local do SA1010.
         """
         
         self.db = Database(settings.DB_NAME_PROTHEUS)
-    
-    def _safe_int(self, value, default=0):
-        """Converte valor para int de forma segura, tratando strings vazias e None"""
-        if value is None:
-            return default
-        
-        # Se for string, limpar espaços
-        if isinstance(value, str):
-            value = value.strip()
-            if not value or value == '':
-                return default
-        
-        try:
-            return int(value)
-        except (ValueError, TypeError):
-            return default
-    
-    def _safe_str(self, value, default=""):
-        """Converte valor para string de forma segura, tratando None"""
-        if value is None:
-            return default
-        return str(value).strip()
+        self.cache = cache if cache is not None else obter_cache_clientes()
+        self.snapshot = obter_snapshot_clientes(self.db)
     
     def validar_cliente(self, cnpj: str) -> Optional[Cliente]:
         """
@@ -56,40 +178,23 @@ class ValidadorCliente:
         
         if len(cnpj_limpo) not in [11, 14]:  # CPF ou CNPJ
             return None
+
+        if self.cache is not None:
+            cliente = self.cache.obter(cnpj_limpo)
+            if cliente is not AUSENTE:
+                return cliente
+
+        cliente = self._cliente_do_snapshot(cnpj_limpo)
+        if cliente is not None:
+            return cliente
             
         conn = None
         try:
-            conn = self.db.connect()
+            conn = self.db.pool.acquire()
             cursor = conn.cursor()
             
             # Query na tabela SA1010 (cadastro de clientes do Protheus)
-            query = """
-                SELECT 
-                    A1_COD as CODIGO,
-                    A1_NOME as RAZAOSOCIAL,
-                    A1_CGC as CGCCPF,
-                    A1_INSCR as INSCR_ESTADUAL,
-                    A1_END as ENDERECO,
-                    A1_COD_MUN as CODIGONOMECIDADE,
-                    A1_EST as ESTADO,
-                    A1_BAIRRO as BAIRRO,
-                    A1_TEL as TELEFONE,
-                    A1_FAX as FAX,
-                    A1_CEP as CEP,
-                    A1_MSBLQL as CODIGOSTATUSCLI,
-                    A1_NREDUZ as NOMEFANTASIA,
-                    A1_DTCAD as DATACADASTRO,
-                    A1_COD as CODIGOENDENTREGA,
-                    A1_REGIAO as CODIGOREGIAO,
-                    A1_TABELA as CODIGOTABPRECO,
-                    A1_COND as CODIGOCONDPAGTO,
-                    '' as CODIGOCLIENTEPAI,
-                    A1_OBSERV as OBSFETCHATURAMENTO,
-                    A1_EMAIL as EMAILCOPIAPEDIDO,
-                    'N' as FLAGENVIACOPIAPEDIDO,
-                    0 as CESP_FLAGENTREGAAGENDADA,
-                    '0' as Cesp_QtdeDiasMinEntrega
-                FROM SA1010
+            query = self.SELECT_CLIENTE + """
                 WHERE A1_CGC = ? 
                 AND D_E_L_E_T_ = ''
             """
@@ -98,30 +203,134 @@ class ValidadorCliente:
             cursor.execute(query, cnpj_limpo)
             row = cursor.fetchone()
             
-            if row:
-                # Converter row em dicionário com tratamento seguro
-                columns = [column[0] for column in cursor.description]
-                cliente_dict = {}
-                
-                for i, column in enumerate(columns):
-                    value = row[i]
-                    
-                    # Tratamento especial para campos numéricos
-                    if column in ['CODIGOREGIAO', 'CESP_FLAGENTREGAAGENDADA']:
-                        cliente_dict[column] = self._safe_int(value)
-                    else:
-                        cliente_dict[column] = self._safe_str(value)
-                
-                return Cliente.from_dict(cliente_dict)
-            
-            return None
+            cliente = self.MAPEADOR.compilar(cursor.description)(row) if row else None
+
+            if self.cache is not None:
+                self.cache.guardar(cnpj_limpo, cliente)
+            return cliente
             
         except Exception as e:
+            if conn and self.db.conexao_perdida(e):
+                self.db.registrar_conexao_perdida()
+                self.db.pool.discard(conn)
+                conn = None
             print(f"Erro ao validar cliente {cnpj}: {e}")
             return None
         finally:
             if conn:
-                conn.close()
+                self.db.pool.release(conn)
+    
+    def validar_clientes(self, cnpjs: Iterable[str]) -> Dict[str, Optional[Cliente]]:
+        """
+        Resolve todos os CNPJs distintos de um lote de pedidos com uma
+        consulta ``A1_CGC IN (...)`` por bloco de ``LOTE_CNPJS``.
+
+        Retorna um dict pelo CNPJ limpo (só dígitos): o ``Cliente`` ou
+        ``None`` se ele não existe no SA1010. CNPJs inválidos e os de
+        blocos cuja consulta falhou ficam fora do dict, para que o
+        chamador recorra a ``validar_cliente``.
+        """
+        distintos = list(dict.fromkeys(
+            cnpj_limpo for cnpj_limpo in map(extrair_cnpj_limpo, cnpjs)
+            if len(cnpj_limpo) in [11, 14]  # CPF ou CNPJ
+        ))
+
+        clientes: Dict[str, Optional[Cliente]] = {}
+        pendentes = []
+        for cnpj_limpo in distintos:
+            cliente = self.cache.obter(cnpj_limpo) if self.cache is not None else AUSENTE
+            if cliente is AUSENTE:
+                cliente = self._cliente_do_snapshot(cnpj_limpo) or AUSENTE
+            if cliente is AUSENTE:
+                pendentes.append(cnpj_limpo)
+            else:
+                clientes[cnpj_limpo] = cliente
+
+        for inicio in range(0, len(pendentes), self.LOTE_CNPJS):
+            bloco = pendentes[inicio:inicio + self.LOTE_CNPJS]
+            encontrados = self._buscar_clientes_por_cnpj(bloco)
+            if encontrados is None:
+                continue
+            for cnpj_limpo in bloco:
+                clientes[cnpj_limpo] = encontrados.get(cnpj_limpo)
+                if self.cache is not None:
+                    self.cache.guardar(cnpj_limpo, clientes[cnpj_limpo])
+
+        logger.debug(
+            f"👥 {len(distintos)} CNPJ(s) resolvidos em lote: "
+            f"{len(distintos) - len(pendentes)} do cache/snapshot, "
+            f"{sum(1 for c in clientes.values() if c)} encontrado(s)"
+        )
+        return clientes
+
+    def invalidar_cliente(self, cnpj: str) -> bool:
+        """Descarta o cliente do cache (ex.: após alterar o cadastro no Protheus)"""
+        if self.cache is None:
+            return False
+        return self.cache.invalidar(extrair_cnpj_limpo(cnpj))
+
+    def limpar_cache(self):
+        """Descarta todos os clientes em cache"""
+        if self.cache is not None:
+            self.cache.limpar()
+
+    def obter_metricas_cache(self) -> Dict[str, Any]:
+        """Hits, misses, evictions e ocupação do cache de clientes"""
+        return self.cache.metricas() if self.cache is not None else {}
+
+    def obter_metricas_snapshot(self) -> Dict[str, Any]:
+        """Clientes, última sincronização e atraso do snapshot local"""
+        return self.snapshot.metricas() if self.snapshot is not None else {}
+
+    def _cliente_do_snapshot(self, cnpj_limpo: str) -> Optional[Cliente]:
+        """Cliente do snapshot local (guardado no cache); ``None`` se não estiver lá"""
+        if self.snapshot is None:
+            return None
+        valores = self.snapshot.buscar(cnpj_limpo)
+        if valores is None:
+            return None
+        cliente = self._cliente_da_linha(self.snapshot.colunas, valores)
+        if self.cache is not None:
+            self.cache.guardar(cnpj_limpo, cliente)
+        return cliente
+
+    def _buscar_clientes_por_cnpj(self, cnpjs: list) -> Optional[Dict[str, Cliente]]:
+        """Consulta um bloco de CNPJs limpos; ``None`` se a consulta falhar"""
+        conn = None
+        try:
+            conn = self.db.pool.acquire()
+            cursor = conn.cursor()
+
+            query = self.SELECT_CLIENTE + f"""
+                WHERE A1_CGC IN ({', '.join('?' * len(cnpjs))})
+                AND D_E_L_E_T_ = ''
+            """
+
+            logger.sql(query, cnpjs)
+            cursor.execute(query, cnpjs)
+            mapear = self.MAPEADOR.compilar(cursor.description)
+
+            encontrados: Dict[str, Cliente] = {}
+            for row in cursor.fetchall():
+                cliente = mapear(row)
+                # Mesmo critério de validar_cliente: a primeira linha do CNPJ
+                encontrados.setdefault(cliente.cnpj, cliente)
+            return encontrados
+
+        except Exception as e:
+            if conn and self.db.conexao_perdida(e):
+                self.db.registrar_conexao_perdida()
+                self.db.pool.discard(conn)
+                conn = None
+            logger.warning(f"⚠️ Erro ao validar {len(cnpjs)} cliente(s) em lote: {e}")
+            return None
+        finally:
+            if conn:
+                self.db.pool.release(conn)
+
+    def _cliente_da_linha(self, columns: list, row) -> Cliente:
+        """Converte a linha do SA1010 em Cliente com tratamento seguro"""
+        return self.MAPEADOR.compilar(columns)(row)
     
     def buscar_cliente_por_codigo(self, codigo: str) -> Optional[Cliente]:
         """Busca cliente pelo código A1_COD"""
@@ -130,36 +339,10 @@ class ValidadorCliente:
             
         conn = None
         try:
-            conn = self.db.connect()
+            conn = self.db.pool.acquire()
             cursor = conn.cursor()
             
-            query = """
-                SELECT 
-                    A1_COD as CODIGO,
-                    A1_NOME as RAZAOSOCIAL,
-                    A1_CGC as CGCCPF,
-                    A1_INSCR as INSCR_ESTADUAL,
-                    A1_END as ENDERECO,
-                    A1_COD_MUN as CODIGONOMECIDADE,
-                    A1_EST as ESTADO,
-                    A1_BAIRRO as BAIRRO,
-                    A1_TEL as TELEFONE,
-                    A1_FAX as FAX,
-                    A1_CEP as CEP,
-                    A1_MSBLQL as CODIGOSTATUSCLI,
-                    A1_NREDUZ as NOMEFANTASIA,
-                    A1_DTCAD as DATACADASTRO,
-                    A1_COD as CODIGOENDENTREGA,
-                    A1_REGIAO as CODIGOREGIAO,
-                    A1_TABELA as CODIGOTABPRECO,
-                    A1_COND as CODIGOCONDPAGTO,
-                    '' as CODIGOCLIENTEPAI,
-                    A1_OBSERV as OBSFETCHATURAMENTO,
-                    A1_EMAIL as EMAILCOPIAPEDIDO,
-                    'N' as FLAGENVIACOPIAPEDIDO,
-                    0 as CESP_FLAGENTREGAAGENDADA,
-                    '0' as Cesp_QtdeDiasMinEntrega
-                FROM SA1010
+            query = self.SELECT_CLIENTE + """
                 WHERE A1_COD = ? 
                 AND D_E_L_E_T_ = ''
             """
@@ -169,87 +352,136 @@ class ValidadorCliente:
             row = cursor.fetchone()
             
             if row:
-                columns = [column[0] for column in cursor.description]
-                cliente_dict = {}
-                
-                for i, column in enumerate(columns):
-                    value = row[i]
-                    
-                    # Tratamento especial para campos numéricos
-                    if column in ['CODIGOREGIAO', 'CESP_FLAGENTREGAAGENDADA']:
-                        cliente_dict[column] = self._safe_int(value)
-                    else:
-                        cliente_dict[column] = self._safe_str(value)
-                
-                return Cliente.from_dict(cliente_dict)
+                return self.MAPEADOR.compilar(cursor.description)(row)
             
             return None
             
         except Exception as e:
+            if conn and self.db.conexao_perdida(e):
+                self.db.registrar_conexao_perdida()
+                self.db.pool.discard(conn)
+                conn = None
             print(f"Erro ao buscar cliente por código {codigo}: {e}")
             return None
         finally:
             if conn:
-                conn.close()
+                self.db.pool.release(conn)
     
-    def listar_clientes_ativos(self, limite: int = 100) -> list:
-        """Lista clientes ativos (não bloqueados)"""
-        conn = None
-        try:
-            conn = self.db.connect()
-            cursor = conn.cursor()
-            
-            query = f"""
-                SELECT TOP {limite}
-                    A1_COD as CODIGO,
-                    A1_NOME as RAZAOSOCIAL,
-                    A1_CGC as CGCCPF,
-                    A1_NREDUZ as NOMEFANTASIA,
-                    A1_EST as ESTADO
+    def _consulta_ativos(self, apos: Optional[Tuple], paginada: bool) -> Tuple[str, list]:
+        """
+        SELECT dos clientes ativos em ordem de (A1_NOME, A1_COD, A1_LOJA), a
+        partir de ``apos``. A1_LOJA entra na chave: as lojas de uma rede têm
+        o mesmo A1_COD (e em geral o mesmo A1_NOME)
+        """
+        filtro_keyset = ""
+        params: list = []
+        if apos is not None:
+            nome, codigo, loja = apos
+            filtro_keyset = """
+                AND (A1_NOME > ?
+                     OR (A1_NOME = ? AND A1_COD > ?)
+                     OR (A1_NOME = ? AND A1_COD = ? AND A1_LOJA > ?))"""
+            params = [nome, nome, codigo, nome, codigo, loja]
+
+        query = f"""
+                SELECT {'TOP (?) ' if paginada else ''}{self.COLUNAS_LISTAGEM}
                 FROM SA1010
                 WHERE A1_MSBLQL <> '1'
-                AND D_E_L_E_T_ = ''
-                ORDER BY A1_NOME
+                AND D_E_L_E_T_ = ''{filtro_keyset}
+                ORDER BY A1_NOME, A1_COD, A1_LOJA
             """
-            
-            logger.sql(query)
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            clientes = []
-            for row in rows:
-                columns = [column[0] for column in cursor.description]
-                cliente_dict = dict(zip(columns, row))
-                
-                # Preencher campos obrigatórios com valores padrão
-                cliente_dict.update({
-                    'INSCR_ESTADUAL': '',
-                    'ENDERECO': '',
-                    'CODIGONOMECIDADE': '',
-                    'BAIRRO': '',
-                    'TELEFONE': '',
-                    'FAX': '',
-                    'CEP': '',
-                    'CODIGOSTATUSCLI': '0',  # Ativo por padrão
-                    'DATACADASTRO': '',
-                    'CODIGOENDENTREGA': cliente_dict['CODIGO'],
-                    'CODIGOREGIAO': 0,
-                    'CODIGOTABPRECO': '',
-                    'CODIGOCONDPAGTO': '',
-                    'CODIGOCLIENTEPAI': '',
-                    'OBSFETCHATURAMENTO': '',
-                    'EMAILCOPIAPEDIDO': '',
-                    'FLAGENVIACOPIAPEDIDO': 'N',
-                    'CESP_FLAGENTREGAAGENDADA': 0,
-                    'Cesp_QtdeDiasMinEntrega': '0'
-                })
-                clientes.append(Cliente.from_dict(cliente_dict))
-            
-            return clientes
-            
+        return query, params
+
+    def _mapeador_listagem(self, description, como_tupla: bool) -> Callable:
+        if como_tupla:
+            return lambda row: ClienteResumo(*map(texto, row))
+        return self.MAPEADOR_LISTAGEM.compilar(description)
+
+    def iterar_clientes_ativos(
+        self,
+        tamanho_lote: int = LOTE_LISTAGEM,
+        como_tupla: bool = False,
+        apos: Optional[Tuple] = None,
+    ) -> Iterator:
+        """
+        Gera os clientes ativos em ordem de nome, em blocos de ``fetchmany``,
+        sem carregar o cadastro inteiro em memória. ``como_tupla`` gera
+        ``ClienteResumo`` em vez de ``Cliente``; ``apos`` retoma a partir
+        do cursor de uma página (ver ``pagina_clientes_ativos``). A conexão
+        do pool fica emprestada até o gerador ser consumido ou fechado.
+        """
+        query, params = self._consulta_ativos(apos, paginada=False)
+        conn = None
+        try:
+            conn = self.db.pool.acquire()
+            cursor = conn.cursor()
+            try:
+                logger.sql(query, params)
+                cursor.execute(query, params)
+                mapear = self._mapeador_listagem(cursor.description, como_tupla)
+                while True:
+                    linhas = cursor.fetchmany(tamanho_lote)
+                    if not linhas:
+                        break
+                    yield from map(mapear, linhas)
+            finally:
+                cursor.close()
+
         except Exception as e:
-            print(f"Erro ao listar clientes: {e}")
-            return []
+            if conn and self.db.conexao_perdida(e):
+                self.db.registrar_conexao_perdida()
+                self.db.pool.discard(conn)
+                conn = None
+            raise BancoDadosError(f"Erro ao listar clientes ativos: {e}", e, "listar_clientes")
+        finally:
+            if conn:
+                self.db.pool.release(conn)
+
+    def pagina_clientes_ativos(
+        self,
+        tamanho_pagina: int = 100,
+        apos: Optional[Tuple] = None,
+        como_tupla: bool = False,
+    ) -> Tuple[list, Optional[Tuple]]:
+        """
+        Página de clientes ativos por keyset em (A1_NOME, A1_COD, A1_LOJA).
+
+        ``apos`` é o cursor devolvido pela página anterior (``None`` na
+        primeira). Retorna ``(clientes, proximo_cursor)``; ``proximo_cursor``
+        é ``None`` na última página. O custo por página independe da posição.
+        """
+        query, params = self._consulta_ativos(apos, paginada=True)
+        params = [tamanho_pagina] + params
+        conn = None
+        try:
+            conn = self.db.pool.acquire()
+            cursor = conn.cursor()
+
+            logger.sql(query, params)
+            cursor.execute(query, params)
+            linhas = cursor.fetchall()
+            mapear = self._mapeador_listagem(cursor.description, como_tupla)
+
+            proximo = None
+            if len(linhas) == tamanho_pagina:
+                ultima = linhas[-1]
+                proximo = (ultima[1], ultima[0], ultima[5])
+            return [mapear(linha) for linha in linhas], proximo
+
+        except Exception as e:
+            if conn and self.db.conexao_perdida(e):
+                self.db.registrar_conexao_perdida()
+                self.db.pool.discard(conn)
+                conn = None
+            raise BancoDadosError(f"Erro ao paginar clientes ativos: {e}", e, "paginar_clientes")
         finally:
             if conn:
-                conn.close()    
\ No newline at end of file
+                self.db.pool.release(conn)
+
+    def listar_clientes_ativos(self, limite: int = 100) -> list:
+        """Lista clientes ativos (não bloqueados)"""
+        try:
+            return self.pagina_clientes_ativos(limite)[0]
+        except BancoDadosError as e:
+            print(f"Erro ao listar clientes: {e}")
+            return []
@@ -5,83 +5,194 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 import json
-import re
-from typing import Optional, Dict, List
+import threading
+import time
+from typing import Any, Optional, Dict, Iterable, List, Sequence, Union
 from models.produto import Produto
+from repositories.produto_repository import ProdutoRepository
+from services.cache_lru import AUSENTE, CacheLRU
+from services.catalogo_binario import CatalogoBinario, CatalogoIncompativelError
+from services.catalogo_produtos import CatalogoProdutos
+from services.fonte_produtos import CamadaMemoria, CamadaSB1010, ChaveItem, FonteProdutos, SnapshotProdutos
+from config.settings import settings
 from utils.logger import logger
 
+ARQUIVO_PRODUTOS = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'produtos.json'))
+
+# Catálogo em memória (JSON) ou compilado (scripts/compilar_catalogo.py), com a mesma interface de consulta
+Catalogo = Union[CatalogoProdutos, CatalogoBinario]
+
+# Validador compartilhado pelo processo, com o catálogo recarregado quando o arquivo muda
+_validador_produto: Optional["ValidadorProduto"] = None
+_validador_produto_lock = threading.Lock()
+
+
+def camadas_configuradas() -> List[Any]:
+    """
+    Camadas depois do catálogo em memória: snapshot local (se
+    PRODUTOS_SNAPSHOT_PATH) e SB1010 (se PRODUTOS_CONSULTAR_SB1010)
+    """
+    camadas: List[Any] = []
+    if settings.PRODUTOS_SNAPSHOT_PATH:
+        camadas.append(SnapshotProdutos(settings.PRODUTOS_SNAPSHOT_PATH, settings.PRODUTOS_RESOLVIDOS_TTL))
+    if settings.PRODUTOS_CONSULTAR_SB1010:
+        camadas.append(CamadaSB1010(ProdutoRepository()))
+    return camadas
+
+
+def obter_validador_produto() -> "ValidadorProduto":
+    """
+    Retorna o validador de produtos do processo. Na primeira chamada
+    carrega o catálogo e, se PRODUTOS_RECARGA_INTERVALO > 0, passa a
+    verificar ``data/produtos.json`` nesse intervalo.
+    """
+    global _validador_produto
+    with _validador_produto_lock:
+        if _validador_produto is None:
+            validador = ValidadorProduto(camadas=camadas_configuradas())
+            if settings.PRODUTOS_RECARGA_INTERVALO > 0:
+                validador.iniciar_monitoramento(settings.PRODUTOS_RECARGA_INTERVALO)
+            _validador_produto = validador
+        return _validador_produto
+
+
 class ValidadorProduto:
-    def __init__(self):
-        self.produtos = self._caregar_produtos()
-        self._cache_busca = {}  # Cache para otimizar buscas repetidas
+    def __init__(
+        self,
+        cache: Optional[CacheLRU] = None,
+        arquivo: str = ARQUIVO_PRODUTOS,
+        arquivo_compilado: Optional[str] = None,
+        camadas: Sequence[Any] = (),
+    ):
+        """
+        Carrega o catálogo de ``arquivo`` (``data/produtos.json``), ou do
+        ``arquivo_compilado`` (padrão: mesmo nome com ``.bin``) quando ele
+        existir e não for mais antigo que o JSON; ``""`` desativa o compilado.
+        Sem ``cache`` cria um cache de buscas limitado a PRODUTOS_CACHE_MAX
+        entradas (0 = sem cache). ``camadas`` são consultadas, em ordem,
+        quando o catálogo em memória não tem o produto (ver ``FonteProdutos``).
+        """
+        if cache is None and settings.PRODUTOS_CACHE_MAX > 0:
+            cache = CacheLRU(
+                settings.PRODUTOS_CACHE_MAX,
+                settings.PRODUTOS_CACHE_TTL,
+                settings.PRODUTOS_CACHE_TTL_NEGATIVO,
+            )
+        self._cache_busca = cache
+        self.arquivo = arquivo
+        self.arquivo_compilado = (
+            os.path.splitext(arquivo)[0] + ".bin" if arquivo_compilado is None else arquivo_compilado
+        )
+        self.ultima_recarga: Optional[Dict[str, Any]] = None
+        self._assinatura_arquivo: Optional[tuple] = None
+        self._recarga_lock = threading.Lock()
+        self._acordar = threading.Event()
+        self._encerrar = False
+        self._monitor: Optional[threading.Thread] = None
+        self._versao_catalogo = 0
+        self._catalogo = self._carregar_produtos()
+        self.memoria = CamadaMemoria(
+            lambda: self._catalogo, settings.PRODUTOS_RESOLVIDOS_TTL, settings.PRODUTOS_RESOLVIDOS_MAX,
+        )
+        self.fonte = FonteProdutos([self.memoria, *camadas])
+
+    @property
+    def catalogo(self) -> Catalogo:
+        return self._catalogo
+
+    @catalogo.setter
+    def catalogo(self, catalogo: Catalogo):
+        """
+        Troca o catálogo e invalida o cache de buscas e os SKUs resolvidos
+        nas outras camadas. A versão entra na chave do cache: uma busca
+        ainda em andamento no catálogo anterior não deixa resultado válido
+        para o novo.
+        """
+        self._catalogo = catalogo
+        self._versao_catalogo += 1
+        self.memoria.limpar()
+        self.limpar_cache()
     
-    def _caregar_produtos(self) -> Dict[str, Produto]:
-        """Carrega os produtos do arquivo JSON e cria índices para busca rápida"""
+    def _carregar_produtos(self) -> Catalogo:
+        """Carrega os produtos do arquivo; catálogo vazio se o arquivo não puder ser lido"""
         try:
-            # Caminho para o arquivo de produtos
-            current_dir = os.path.dirname(__file__)
-            project_root = os.path.abspath(os.path.join(current_dir, '..'))
-            produtos_file = os.path.join(project_root, 'data', 'produtos.json')
-            
-            logger.debug(f"🔍 Carregando produtos do arquivo: {produtos_file}")
-            
-            with open(produtos_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            if "produtos" not in data:
-                logger.error("❌ Estrutura inválida no arquivo produtos.json - chave 'produtos' não encontrada")
-                return {}
-                
-            # Criar índices para busca rápida
-            produtos_dict = {}
-            produtos_raw = data['produtos']
-            
-            logger.debug(f"📦 Processando {len(produtos_raw)} produtos para indexação")
-            
-            for produto_data in produtos_raw:
-                try:
-                    # Criar objeto Produto
-                    produto = self._criar_produto(produto_data)
-                    
-                    # Índice por EAN13
-                    if produto.ean13 and produto.ean13.strip():
-                        chave_ean13 = f"ean13_{produto.ean13}"
-                        produtos_dict[chave_ean13] = produto
-                        logger.debug(f"  📋 Índice EAN13: {produto.ean13} -> {produto.codigo}")
-                    
-                    # Índice por DUN14
-                    if produto.dun14 and produto.dun14.strip():
-                        chave_dun14 = f"dun14_{produto.dun14}"
-                        produtos_dict[chave_dun14] = produto
-                        logger.debug(f"  📋 Índice DUN14: {produto.dun14} -> {produto.codigo}")
-                    
-                    # Índice por código exato
-                    chave_codigo = f"codigo_{produto.codigo}"
-                    produtos_dict[chave_codigo] = produto
-                    
-                    # Índice por código base (sem sufixo)
-                    codigo_base = re.sub(r'\.\w+$', '', produto.codigo)
-                    if codigo_base != produto.codigo:
-                        chave_codigo_base = f"codigo_base_{codigo_base}"
-                        produtos_dict[chave_codigo_base] = produto
-                        logger.debug(f"  📋 Índice Código Base: {codigo_base} -> {produto.codigo}")
-                
-                except Exception as e:
-                    logger.warning(f"⚠️ Erro ao processar produto {produto_data.get('codigo', 'DESCONHECIDO')}: {e}")
-                    continue
-            
-            logger.info(f"✅ {len(produtos_raw)} produtos carregados, {len(produtos_dict)} índices criados")
-            return produtos_dict
-            
+            return self._ler_catalogo()
         except FileNotFoundError:
-            logger.error(f"❌ Arquivo produtos.json não encontrado: {produtos_file}")
-            return {}
+            logger.error(f"❌ Arquivo produtos.json não encontrado: {self.arquivo}")
+            return CatalogoProdutos()
         except json.JSONDecodeError as e:
             logger.error(f"❌ Erro ao fazer parse do JSON de produtos: {e}")
-            return {}
+            return CatalogoProdutos()
         except Exception as e:
             logger.error(f"❌ Erro inesperado ao carregar produtos: {e}")
-            return {}
+            return CatalogoProdutos()
+
+    def _assinatura(self) -> tuple:
+        """(mtime, tamanho) do JSON e do catálogo compilado; ``None`` para o que não existir"""
+        assinatura = []
+        for caminho in (self.arquivo, self.arquivo_compilado):
+            try:
+                estado = os.stat(caminho) if caminho else None
+            except OSError:
+                estado = None
+            assinatura.append((estado.st_mtime_ns, estado.st_size) if estado else None)
+        return tuple(assinatura)
+
+    def _ler_catalogo(self) -> Catalogo:
+        """
+        Abre o catálogo compilado, se estiver em dia com o JSON; senão lê o
+        JSON e cria os índices para busca rápida. Erros são propagados.
+        """
+        # Assinatura lida antes dos arquivos: uma gravação durante a leitura gera nova recarga
+        self._assinatura_arquivo = self._assinatura()
+        estado_json, estado_compilado = self._assinatura_arquivo
+
+        if estado_compilado is not None:
+            if estado_json is None or estado_compilado[0] >= estado_json[0]:
+                try:
+                    catalogo = CatalogoBinario(self.arquivo_compilado)
+                    logger.info(f"✅ Catálogo compilado aberto: {len(catalogo)} produtos ({self.arquivo_compilado})")
+                    return catalogo
+                except CatalogoIncompativelError as e:
+                    logger.warning(f"⚠️ {e} - usando {self.arquivo}")
+            else:
+                logger.warning(
+                    f"⚠️ Catálogo compilado mais antigo que {self.arquivo}; "
+                    "rode scripts/compilar_catalogo.py para atualizá-lo"
+                )
+        return self.ler_json()
+
+    def ler_json(self) -> CatalogoProdutos:
+        """Lê o arquivo JSON e cria os índices para busca rápida; erros são propagados"""
+        logger.debug(f"🔍 Carregando produtos do arquivo: {self.arquivo}")
+
+        with open(self.arquivo, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        if "produtos" not in data:
+            raise ValueError("Estrutura inválida no arquivo produtos.json - chave 'produtos' não encontrada")
+            
+        # Criar índices para busca rápida
+        catalogo = CatalogoProdutos()
+        produtos_raw = data['produtos']
+        
+        logger.debug(f"📦 Processando {len(produtos_raw)} produtos para indexação")
+        
+        for produto_data in produtos_raw:
+            try:
+                catalogo.adicionar(self._criar_produto(produto_data))
+            except Exception as e:
+                logger.warning(f"⚠️ Erro ao processar produto {produto_data.get('codigo', 'DESCONHECIDO')}: {e}")
+                continue
+        
+        # Índice de busca montado junto com a carga (fora das buscas, na recarga a quente)
+        catalogo.indice_busca
+        
+        logger.info(
+            f"✅ {len(produtos_raw)} produtos carregados, "
+            f"{catalogo.estatisticas()['total_indices']} índices criados"
+        )
+        return catalogo
     
     def validar_produto(self, ean13: str, dun14: str, codprod: str) -> Optional[Produto]:
         """
@@ -90,6 +201,9 @@ class ValidadorProduto:
         2. Por DUN14  
         3. Por código exato
         4. Por código base (sem sufixo)
+
+        Cada camada (catálogo em memória, snapshot local, SB1010) é
+        consultada só se as anteriores não encontraram o produto.
         """
         
         # Limpar os códigos de entrada
@@ -98,59 +212,62 @@ class ValidadorProduto:
         codprod = codprod.strip() if codprod else ""
         
         # Criar chave de cache
-        cache_key = f"{ean13}|{dun14}|{codprod}"
+        cache_key = (self._versao_catalogo, ean13, dun14, codprod)
         
         # Verificar cache primeiro
-        if cache_key in self._cache_busca:
-            logger.debug(f"🎯 Cache hit para busca: {cache_key}")
-            return self._cache_busca[cache_key]
+        if self._cache_busca is not None:
+            produto = self._cache_busca.obter(cache_key)
+            if produto is not AUSENTE:
+                logger.debug(f"🎯 Cache hit para busca: {ean13}|{dun14}|{codprod}")
+                return produto
         
         logger.debug(f"🔍 Buscando produto - EAN13: '{ean13}', DUN14: '{dun14}', CodProd: '{codprod}'")
-        
-        produto_encontrado = None
-        
-        # 1ª tentativa: Buscar por EAN13
-        if ean13:
-            chave_ean13 = f"ean13_{ean13}"
-            produto_encontrado = self.produtos.get(chave_ean13)
-            if produto_encontrado:
-                logger.debug(f"✅ Produto encontrado por EAN13: {ean13} -> {produto_encontrado.codigo}")
-                self._cache_busca[cache_key] = produto_encontrado
-                return produto_encontrado
-        
-        # 2ª tentativa: Buscar por DUN14
-        if dun14:
-            chave_dun14 = f"dun14_{dun14}"
-            produto_encontrado = self.produtos.get(chave_dun14)
-            if produto_encontrado:
-                logger.debug(f"✅ Produto encontrado por DUN14: {dun14} -> {produto_encontrado.codigo}")
-                self._cache_busca[cache_key] = produto_encontrado
-                return produto_encontrado
-        
-        # 3ª tentativa: Buscar por código exato
-        if codprod:
-            chave_codigo = f"codigo_{codprod}"
-            produto_encontrado = self.produtos.get(chave_codigo)
-            if produto_encontrado:
-                logger.debug(f"✅ Produto encontrado por código exato: {codprod} -> {produto_encontrado.codigo}")
-                self._cache_busca[cache_key] = produto_encontrado
-                return produto_encontrado
-        
-        # 4ª tentativa: Buscar por código base (remove sufixo como .01, .02, etc)
-        if codprod:
-            codigo_base = re.sub(r'\.\w+$', '', codprod)
-            if codigo_base != codprod:  # Só tenta se realmente removeu algo
-                chave_codigo_base = f"codigo_base_{codigo_base}"
-                produto_encontrado = self.produtos.get(chave_codigo_base)
-                if produto_encontrado:
-                    logger.debug(f"✅ Produto encontrado por código base: {codigo_base} -> {produto_encontrado.codigo}")
-                    self._cache_busca[cache_key] = produto_encontrado
-                    return produto_encontrado
-        
-        # Se não encontrou nada, registra no cache também (para evitar buscas repetidas)
+
+        produto_encontrado, definitivo = self.fonte.buscar(ean13, dun14, codprod)
+        if produto_encontrado:
+            self._guardar_no_cache(cache_key, produto_encontrado)
+            return produto_encontrado
+
+        # Se não encontrou nada, registra no cache também (para evitar buscas repetidas),
+        # a menos que uma camada tenha falhado e a resposta possa mudar na próxima tentativa
         logger.debug(f"❌ Produto não encontrado - EAN13: '{ean13}', DUN14: '{dun14}', CodProd: '{codprod}'")
-        self._cache_busca[cache_key] = None
+        if definitivo:
+            self._guardar_no_cache(cache_key, None)
         return None
+
+    def validar_produtos(self, itens: Iterable[ChaveItem]) -> Dict[ChaveItem, Optional[Produto]]:
+        """
+        Valida de uma vez os itens ``(ean13, dun14, codprod)`` de um pedido:
+        o que não está no cache de buscas é resolvido em lote pelas camadas
+        (ver ``FonteProdutos.resolver``), com uma consulta ao SB1010 para
+        todos os itens que faltarem. Retorna um dict pelos códigos sem
+        espaços nas pontas, com o ``Produto`` ou ``None``.
+        """
+        versao = self._versao_catalogo
+        resultado: Dict[ChaveItem, Optional[Produto]] = {}
+        pendentes: Dict[ChaveItem, None] = {}
+        for item in itens:
+            chave = tuple(codigo.strip() if codigo else "" for codigo in item)
+            if chave in resultado or chave in pendentes:
+                continue
+            produto = self._cache_busca.obter((versao, *chave)) if self._cache_busca is not None else AUSENTE
+            if produto is AUSENTE:
+                pendentes[chave] = None
+            else:
+                resultado[chave] = produto
+
+        if pendentes:
+            logger.debug(f"🔍 Resolvendo {len(pendentes)} produto(s) em lote")
+            for chave, (produto, definitivo) in self.fonte.resolver(pendentes).items():
+                resultado[chave] = produto
+                if produto is not None or definitivo:
+                    self._guardar_no_cache((versao, *chave), produto)
+        return resultado
+
+    def _guardar_no_cache(self, cache_key: tuple, produto: Optional[Produto]):
+        """Guarda a busca; "não encontrado" expira após PRODUTOS_CACHE_TTL_NEGATIVO"""
+        if self._cache_busca is not None:
+            self._cache_busca.guardar(cache_key, produto)
     
     def _criar_produto(self, produto_data: dict) -> Produto:
         """Converte os dados do JSON em um objeto Produto com validação"""
@@ -173,94 +290,145 @@ class ValidadorProduto:
     
     def listar_todos_produtos(self) -> List[Produto]:
         """Retorna lista de todos os produtos disponíveis"""
-        produtos = []
-        codigos_processados = set()
-        
-        for chave, produto in self.produtos.items():
-            if chave.startswith('codigo_') and not chave.startswith('codigo_base_'):
-                if produto.codigo not in codigos_processados:
-                    produtos.append(produto)
-                    codigos_processados.add(produto.codigo)
-        
+        produtos = list(self.catalogo)
         logger.debug(f"📋 Listagem de produtos: {len(produtos)} produtos únicos")
         return produtos
     
-    def buscar_por_descricao(self, termo: str) -> List[Produto]:
-        """Busca produtos por termo na descrição"""
+    def buscar_por_descricao(self, termo: str, limite: Optional[int] = None) -> List[Produto]:
+        """Busca produtos por termo na descrição (sem acentos), os mais relevantes primeiro"""
         if not termo or termo.strip() == "":
             return []
         
-        termo = termo.upper().strip()
-        produtos_encontrados = []
-        codigos_processados = set()
-        
-        for chave, produto in self.produtos.items():
-            if chave.startswith('codigo_') and not chave.startswith('codigo_base_'):
-                if produto.codigo not in codigos_processados and termo in produto.descricao.upper():
-                    produtos_encontrados.append(produto)
-                    codigos_processados.add(produto.codigo)
+        produtos_encontrados = self.catalogo.indice_busca.buscar_descricao(termo, limite)
         
         logger.debug(f"🔍 Busca por descrição '{termo}': {len(produtos_encontrados)} produtos encontrados")
         return produtos_encontrados
     
-    def buscar_por_codigo_parcial(self, codigo_parcial: str) -> List[Produto]:
-        """Busca produtos por código parcial"""
+    def buscar_por_codigo_parcial(self, codigo_parcial: str, limite: Optional[int] = None) -> List[Produto]:
+        """Busca produtos por código parcial (código igual, depois prefixo, depois trecho)"""
         if not codigo_parcial or codigo_parcial.strip() == "":
             return []
         
-        codigo_parcial = codigo_parcial.upper().strip()
-        produtos_encontrados = []
-        codigos_processados = set()
-        
-        for chave, produto in self.produtos.items():
-            if chave.startswith('codigo_') and not chave.startswith('codigo_base_'):
-                if produto.codigo not in codigos_processados and codigo_parcial in produto.codigo.upper():
-                    produtos_encontrados.append(produto)
-                    codigos_processados.add(produto.codigo)
+        produtos_encontrados = self.catalogo.indice_busca.buscar_codigo(codigo_parcial, limite)
         
         logger.debug(f"🔍 Busca por código parcial '{codigo_parcial}': {len(produtos_encontrados)} produtos encontrados")
         return produtos_encontrados
     
-    def obter_estatisticas(self) -> Dict[str, int]:
-        """Retorna estatísticas dos produtos carregados"""
-        produtos_unicos = set()
-        total_indices = len(self.produtos)
-        
-        # Contar produtos únicos
-        for chave, produto in self.produtos.items():
-            if chave.startswith('codigo_') and not chave.startswith('codigo_base_'):
-                produtos_unicos.add(produto.codigo)
-        
-        # Contar por tipo de índice
-        indices_ean13 = len([k for k in self.produtos.keys() if k.startswith('ean13_')])
-        indices_dun14 = len([k for k in self.produtos.keys() if k.startswith('dun14_')])
-        indices_codigo = len([k for k in self.produtos.keys() if k.startswith('codigo_') and not k.startswith('codigo_base_')])
-        indices_codigo_base = len([k for k in self.produtos.keys() if k.startswith('codigo_base_')])
-        
+    def obter_estatisticas(self) -> Dict[str, Any]:
+        """Retorna estatísticas dos produtos carregados e do cache de buscas"""
+        metricas = self._cache_busca.metricas() if self._cache_busca is not None else {}
         return {
-            'produtos_unicos': len(produtos_unicos),
-            'total_indices': total_indices,
-            'indices_ean13': indices_ean13,
-            'indices_dun14': indices_dun14,
-            'indices_codigo': indices_codigo,
-            'indices_codigo_base': indices_codigo_base,
-            'cache_size': len(self._cache_busca)
+            **self.catalogo.estatisticas(),
+            'cache_size': metricas.get('itens', 0),
+            'cache_max': metricas.get('max_itens', 0),
+            'cache_hits': metricas.get('hits', 0),
+            'cache_hits_negativos': metricas.get('hits_negativos', 0),
+            'cache_misses': metricas.get('misses', 0),
+            'cache_expirados': metricas.get('expirados', 0),
+            'cache_evictions': metricas.get('evictions', 0),
+            'cache_invalidacoes': metricas.get('invalidacoes', 0),
+            'cache_taxa_acerto': metricas.get('taxa_acerto', 0.0),
+            'produtos_resolvidos': len(self.memoria),
+            'camadas': self.fonte.metricas(),
         }
     
     def limpar_cache(self):
         """Limpa o cache de buscas"""
+        if self._cache_busca is None:
+            return
         cache_size_anterior = len(self._cache_busca)
-        self._cache_busca.clear()
+        self._cache_busca.limpar()
         logger.debug(f"🧹 Cache de produtos limpo: {cache_size_anterior} entradas removidas")
     
-    def recarregar_produtos(self):
-        """Recarrega os produtos do arquivo e limpa o cache"""
-        logger.info("🔄 Recarregando produtos do arquivo...")
-        self.limpar_cache()
-        self.produtos = self._carregar_produtos()
-        
-        stats = self.obter_estatisticas()
-        logger.info(f"✅ Produtos recarregados: {stats['produtos_unicos']} produtos, {stats['total_indices']} índices")
+    def recarregar_produtos(self) -> Optional[Dict[str, Any]]:
+        """
+        Recarrega os produtos do arquivo. O novo catálogo é montado à parte
+        e trocado de uma vez (a troca limpa o cache): buscas em andamento
+        seguem no catálogo anterior; um catálogo compilado anterior é
+        fechado depois da comparação. Retorna o relatório da recarga
+        (duração e SKUs adicionados, removidos e alterados), ou ``None``
+        se o arquivo não pôde ser lido e o catálogo atual foi mantido.
+        """
+        with self._recarga_lock:
+            logger.info("🔄 Recarregando produtos do arquivo...")
+            inicio = time.monotonic()
+            anterior = self.catalogo
+            try:
+                catalogo = self._ler_catalogo()
+            except Exception as e:
+                logger.error(f"❌ Recarga de produtos falhou, catálogo atual mantido: {e}")
+                return None
+
+            self.catalogo = catalogo
+            relatorio = {
+                'duracao': time.monotonic() - inicio,
+                'produtos': len(catalogo),
+                **self._comparar_catalogos(anterior, catalogo),
+            }
+            if anterior is not catalogo and isinstance(anterior, CatalogoBinario):
+                anterior.fechar()
+            self.ultima_recarga = relatorio
+
+        logger.info(
+            f"✅ Produtos recarregados em {relatorio['duracao']:.3f}s: {relatorio['produtos']} produtos, "
+            f"{len(relatorio['adicionados'])} adicionado(s), {len(relatorio['removidos'])} removido(s), "
+            f"{len(relatorio['alterados'])} alterado(s)"
+        )
+        return relatorio
+
+    @staticmethod
+    def _comparar_catalogos(anterior: Catalogo, novo: Catalogo) -> Dict[str, List[str]]:
+        """SKUs (códigos) adicionados, removidos e alterados entre dois catálogos"""
+        anterior = {produto.codigo: produto for produto in anterior}
+        novo = {produto.codigo: produto for produto in novo}
+        codigos_anteriores = anterior.keys()
+        codigos_novos = novo.keys()
+        return {
+            'adicionados': sorted(codigos_novos - codigos_anteriores),
+            'removidos': sorted(codigos_anteriores - codigos_novos),
+            'alterados': sorted(
+                codigo for codigo in codigos_novos & codigos_anteriores
+                if novo[codigo] != anterior[codigo]
+            ),
+        }
+
+    def verificar_alteracao(self) -> Optional[Dict[str, Any]]:
+        """
+        Recarrega o catálogo se o JSON ou o compilado mudou (mtime ou
+        tamanho); retorna o relatório
+        """
+        assinatura = self._assinatura()
+        if assinatura == self._assinatura_arquivo or assinatura == (None, None):
+            return None
+        return self.recarregar_produtos()
+
+    def iniciar_monitoramento(self, intervalo: float):
+        """Verifica o arquivo de produtos em segundo plano a cada ``intervalo`` segundos"""
+        if self._monitor is not None:
+            return
+        self._encerrar = False
+        self._monitor = threading.Thread(
+            target=self._monitorar, args=(intervalo,), name="recarga-produtos", daemon=True,
+        )
+        self._monitor.start()
+
+    def parar_monitoramento(self):
+        self._encerrar = True
+        self._acordar.set()
+        if self._monitor is not None:
+            self._monitor.join(timeout=5)
+            self._monitor = None
+
+    def _monitorar(self, intervalo: float):
+        while not self._encerrar:
+            self._acordar.wait(intervalo)
+            self._acordar.clear()
+            if self._encerrar:
+                break
+            try:
+                self.verificar_alteracao()
+            except Exception as e:
+                logger.warning(f"⚠️ Erro ao verificar o arquivo de produtos: {e}")
     
     def validar_disponibilidade_produto(self, produto: Produto) -> bool:
         """Valida se o produto está disponível para venda"""
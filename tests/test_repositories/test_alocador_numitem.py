@@ -0,0 +1,40 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from repositories.alocador_numitem import AlocadorNumItem
+
+
+class FakeSequencia:
+    def __init__(self, inicio=1):
+        self.proximo = inicio
+        self.reservas = []
+
+    def reservar(self, tamanho):
+        primeiro = self.proximo
+        self.proximo += tamanho
+        self.reservas.append(tamanho)
+        return primeiro
+
+
+def test_aloca_faixas_contiguas_a_partir_do_cache():
+    sequencia = FakeSequencia(inicio=100)
+    alocador = AlocadorNumItem(tamanho_bloco=10)
+
+    assert alocador.alocar(3, sequencia.reservar) == 100
+    assert alocador.alocar(4, sequencia.reservar) == 103
+    # Só uma ida ao banco para os dois pedidos
+    assert sequencia.reservas == [10]
+    assert alocador.metricas()["disponiveis_em_cache"] == 3
+
+
+def test_reserva_nova_faixa_quando_pedido_nao_cabe_no_bloco():
+    sequencia = FakeSequencia(inicio=1)
+    alocador = AlocadorNumItem(tamanho_bloco=10)
+
+    alocador.alocar(8, sequencia.reservar)
+    inicio = alocador.alocar(25, sequencia.reservar)
+
+    assert inicio == 11
+    assert sequencia.reservas == [10, 25]
+    assert alocador.metricas()["reservas"] == 2
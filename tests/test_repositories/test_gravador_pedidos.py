@@ -0,0 +1,69 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from unittest.mock import MagicMock
+from models.pedido_sobel import PedidoSobel
+from repositories.gravador_pedidos import GravadorPedidosEmGrupo
+from utils.error_handler import BancoDadosError, PedidoDuplicadoError
+
+
+def _pedido(num):
+    return PedidoSobel(
+        num_pedido=num,
+        data_pedido="2025-05-15",
+        hora_inicio="10:00",
+        codigo_cliente="C1",
+        nome_cliente="Cliente",
+        valor_total=10.0,
+        qtde_itens=0,
+        itens=[],
+    )
+
+
+def test_grava_grupo_ao_atingir_tamanho_e_reporta_resultados():
+    repo = MagicMock()
+    repo.inserir_pedidos_em_grupo.return_value = [
+        None,
+        PedidoDuplicadoError("2"),
+        BancoDadosError("falha", ValueError("x"), "inserir"),
+    ]
+    concluidos = []
+    gravador = GravadorPedidosEmGrupo(repo, tamanho_grupo=3, intervalo_ms=60000, ao_concluir=concluidos.append)
+
+    assert gravador.adicionar(_pedido("1"), "D1") == []
+    assert gravador.adicionar(_pedido("2"), "D2") == []
+    resultados = gravador.adicionar(_pedido("3"), "D3")
+
+    assert repo.inserir_pedidos_em_grupo.call_count == 1
+    assert [r["status"] for r in resultados] == ["sucesso", "duplicado", "erro"]
+    assert resultados[0]["pedido"] == "1" and resultados[0]["doc_id"] == "D1"
+    assert resultados[2]["error_type"] == "processamento"
+    assert concluidos == resultados
+    assert gravador.pendentes == 0
+
+
+def test_grava_grupo_incompleto_quando_intervalo_esgota():
+    repo = MagicMock()
+    repo.inserir_pedidos_em_grupo.return_value = [None]
+    gravador = GravadorPedidosEmGrupo(repo, tamanho_grupo=10, intervalo_ms=0)
+
+    resultados = gravador.adicionar(_pedido("1"))
+
+    assert [r["status"] for r in resultados] == ["sucesso"]
+    assert gravador.descarregar() == []
+
+
+def test_falha_inesperada_do_grupo_vira_erro_de_cada_pedido():
+    repo = MagicMock()
+    repo.inserir_pedidos_em_grupo.side_effect = RuntimeError("inesperado")
+    concluidos = []
+    gravador = GravadorPedidosEmGrupo(repo, tamanho_grupo=10, intervalo_ms=60000, ao_concluir=concluidos.append)
+    gravador.adicionar(_pedido("1"), "D1")
+    gravador.adicionar(_pedido("2"), "D2")
+
+    resultados = gravador.descarregar()
+
+    assert [(r["status"], r["doc_id"]) for r in resultados] == [("erro", "D1"), ("erro", "D2")]
+    assert concluidos == resultados
+    assert gravador.pendentes == 0
@@ -0,0 +1,84 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+from repositories.log_processamento import EsquemaLogProcessamento, GravadorLogProcessamento
+
+
+class FakeDb:
+    def __init__(self, colunas):
+        self.db_name = "TESTE_LOG"
+        self.cursor = MagicMock()
+        self.cursor.fetchall.return_value = [(c,) for c in colunas]
+        self.conn = MagicMock(autocommit=True)
+        self.conn.cursor.return_value = self.cursor
+
+    @contextmanager
+    def conexao(self):
+        yield self.conn
+
+
+def setup_function():
+    EsquemaLogProcessamento.invalidar()
+
+
+def test_grava_buffer_em_lote_e_descobre_colunas_uma_vez():
+    db = FakeDb(["ID", "DATA_HORA", "TIPO", "MENSAGEM", "NUM_PEDIDO"])
+    gravador = GravadorLogProcessamento(db, tamanho_lote=100, intervalo=60)
+
+    gravador.registrar("INFO", "pedido 1", "1")
+    gravador.registrar("ERROR", "pedido 2")
+    gravador.descarregar()
+    gravador.registrar("INFO", "pedido 3", "3")
+    gravador.fechar()
+
+    assert db.cursor.execute.call_count == 1  # INFORMATION_SCHEMA só na primeira vez
+    assert db.cursor.executemany.call_count == 2
+    sql, linhas = db.cursor.executemany.call_args_list[0][0]
+    assert sql == "INSERT INTO T_LOG_PROCESSAMENTO (TIPO, MENSAGEM, NUM_PEDIDO, DATA_HORA) VALUES (?, ?, ?, ?)"
+    assert [linha[:3] for linha in linhas] == [("INFO", "pedido 1", "1"), ("ERROR", "pedido 2", None)]
+
+
+def test_erro_de_esquema_invalida_cache_e_repete():
+    db = FakeDb(["TIPO", "MENSAGEM", "NUM_PEDIDO"])
+    db.cursor.executemany.side_effect = [Exception("42S22", "Invalid column name 'NUM_PEDIDO'"), None]
+    gravador = GravadorLogProcessamento(db, tamanho_lote=1)
+
+    gravador.registrar("INFO", "pedido 1", "1")
+
+    assert db.cursor.execute.call_count == 2
+    assert db.cursor.executemany.call_count == 2
+
+
+def test_banco_indisponivel_guarda_ndjson_e_reenvia_na_inicializacao(tmp_path):
+    arquivo = str(tmp_path / "pendentes.ndjson")
+    db = FakeDb(["TIPO", "MENSAGEM", "NUM_PEDIDO", "DATA_HORA"])
+    db.cursor.executemany.side_effect = Exception("08S01", "Communication link failure")
+    gravador = GravadorLogProcessamento(db, tamanho_lote=100, intervalo=60, arquivo_pendentes=arquivo)
+
+    gravador.registrar("ERROR", "pedido 1 sem cliente", "1")
+    gravador.fechar()
+    assert os.path.exists(arquivo)
+
+    db.cursor.executemany.side_effect = None
+    novo = GravadorLogProcessamento(db, tamanho_lote=100, intervalo=60, arquivo_pendentes=arquivo)
+    novo.fechar()
+
+    _, linhas = db.cursor.executemany.call_args[0]
+    assert [linha[:3] for linha in linhas] == [("ERROR", "pedido 1 sem cliente", "1")]
+    assert not os.listdir(str(tmp_path))
+
+
+def test_fila_cheia_vai_para_arquivo_sem_bloquear(tmp_path):
+    arquivo = str(tmp_path / "pendentes.ndjson")
+    db = FakeDb(["TIPO", "MENSAGEM"])
+    gravador = GravadorLogProcessamento(db, tamanho_lote=100, intervalo=60, capacidade=1, arquivo_pendentes=arquivo)
+
+    gravador.registrar("INFO", "primeiro")
+    gravador.registrar("INFO", "segundo")
+
+    with open(arquivo, encoding="utf-8") as f:
+        assert '"segundo"' in f.read()
+    gravador.fechar()
@@ -44,3 +44,247 @@ def test_inserir_itens_pedido_executes_queries():
     assert inserted == 1
     # Deve executar uma consulta para obter o próximo NUMITEM e outra para inserir
     assert repo._execute_with_logging.call_count == 2
+
+
+def _repo_com_mocks():
+    repo = PedidoRepository.__new__(PedidoRepository)
+    repo.cursor = MagicMock()
+    repo.conn = MagicMock(autocommit=False)
+    repo.db = MagicMock()
+    repo.db.conexao_perdida.return_value = False
+    repo._execute_with_logging = MagicMock()
+    repo.cursor.fetchone.return_value = (0,)
+    return repo
+
+
+def _pedido_com_itens(qtd):
+    itens = [
+        PedidoItemSobel(
+            cod_produto=f"10{i}",
+            descricao_produto="Produto",
+            quantidade=1,
+            valor_unitario=10.0,
+            valor_total=10.0,
+            unidade="CX"
+        )
+        for i in range(qtd)
+    ]
+    pedido = PedidoSobel(
+        num_pedido="123",
+        data_pedido="2025-05-15",
+        hora_inicio="10:00",
+        codigo_cliente="C1",
+        nome_cliente="Cliente",
+        valor_total=10.0 * qtd,
+        qtde_itens=qtd,
+        itens=itens,
+    )
+    pedido.num_pedido_afv = "123"
+    return pedido
+
+
+def test_inserir_itens_pedido_em_lote_usa_executemany():
+    repo = _repo_com_mocks()
+
+    inserted = repo._inserir_itens_pedido(_pedido_com_itens(3))
+
+    assert inserted == 3
+    assert repo.cursor.fast_executemany is True
+    query, parametros = repo.cursor.executemany.call_args[0]
+    assert [p[1] for p in parametros] == [1, 2, 3]
+    # Apenas a consulta do próximo NUMITEM passa pelo execute individual
+    assert repo._execute_with_logging.call_count == 1
+
+
+def test_inserir_itens_pedido_lote_com_erro_identifica_item():
+    import pyodbc
+    import pytest
+    from utils.error_handler import BancoDadosError
+
+    repo = _repo_com_mocks()
+    repo.cursor.executemany.side_effect = pyodbc.Error("22001", "String data, right truncation")
+
+    def falha_no_segundo(query, params, operation, num_pedido=None):
+        if operation == "INSERIR_ITENS" and params[6] == "101":
+            raise pyodbc.Error("22001", "String data, right truncation")
+
+    repo._execute_with_logging.side_effect = falha_no_segundo
+
+    with pytest.raises(BancoDadosError) as exc:
+        repo._inserir_itens_pedido(_pedido_com_itens(3))
+
+    assert "item 2" in exc.value.message
+    assert "101" in exc.value.message
+    repo.cursor.execute.assert_any_call("ROLLBACK TRANSACTION itens_lote")
+
+
+def test_inserir_itens_pedido_usa_alocador_numitem():
+    from repositories.alocador_numitem import AlocadorNumItem
+
+    repo = _repo_com_mocks()
+    repo.alocador_numitem = AlocadorNumItem(tamanho_bloco=50)
+    repo.cursor.fetchone.return_value = (1000,)
+
+    repo._inserir_itens_pedido(_pedido_com_itens(2))
+    repo._inserir_itens_pedido(_pedido_com_itens(2))
+
+    operacoes = [c[0][2] for c in repo._execute_with_logging.call_args_list]
+    assert operacoes == ["RESERVAR_NUMITEM"]
+    _, parametros = repo.cursor.executemany.call_args[0]
+    assert [p[1] for p in parametros] == [1002, 1003]
+
+
+
+def test_inserir_itens_pedido_sem_itens_nao_reserva_numitem():
+    from repositories.alocador_numitem import AlocadorNumItem
+
+    repo = _repo_com_mocks()
+    repo.alocador_numitem = AlocadorNumItem(tamanho_bloco=50)
+
+    assert repo._inserir_itens_pedido(_pedido_com_itens(0)) == 0
+    repo._execute_with_logging.assert_not_called()
+    repo.cursor.executemany.assert_not_called()
+
+def test_pedidos_existentes_resolve_pagina_em_uma_consulta():
+    from datetime import date, datetime
+
+    repo = _repo_com_mocks()
+    repo.cursor.fetchall.return_value = [("DOC-2", datetime(2025, 5, 15))]
+
+    existentes = repo.pedidos_existentes([
+        {"num_pedido_afv": "DOC-1", "data_pedido": "2025-05-15"},
+        {"num_pedido_afv": "DOC-2", "data_pedido": "2025-05-15"},
+        {"num_pedido_afv": "DOC-2", "data_pedido": "2025-05-15"},
+        {"num_pedido_afv": "DOC-3", "data_pedido": ""},
+    ])
+
+    assert existentes == {("DOC-2", date(2025, 5, 15))}
+    assert repo._execute_with_logging.call_count == 1
+    query, params, _ = repo._execute_with_logging.call_args[0]
+    assert "VALUES (?, ?), (?, ?)" in query
+    assert params[0::2] == ("DOC-1", "DOC-2")
+
+
+def test_inserir_pedidos_em_grupo_desfaz_apenas_pedido_com_erro():
+    from utils.error_handler import BancoDadosError
+
+    repo = _repo_com_mocks()
+    repo.pedido_existe = MagicMock(return_value=False)
+    repo._inserir_cabecalho_pedido = MagicMock()
+    repo._inserir_itens_pedido = MagicMock(side_effect=[1, BancoDadosError("falha", ValueError("x"), "itens"), 1])
+    pedidos = [_pedido_com_itens(1) for _ in range(3)]
+    for i, pedido in enumerate(pedidos):
+        pedido.num_pedido = str(i)
+
+    falhas = repo.inserir_pedidos_em_grupo(pedidos)
+
+    assert falhas[0] is None and falhas[2] is None
+    assert isinstance(falhas[1], BancoDadosError)
+    executados = [c[0][0] for c in repo.cursor.execute.call_args_list]
+    assert "ROLLBACK TRANSACTION pedido_grupo_1" in executados
+    assert repo.conn.commit.call_count == 1
+
+
+def test_inserir_pedidos_em_grupo_sem_conexao_reporta_erro_por_pedido():
+    from utils.error_handler import BancoDadosError
+
+    repo = _repo_com_mocks()
+    repo._conexao_perdida = True
+    repo.pedido_existe = MagicMock(side_effect=ConnectionError("link caiu"))
+    repo._reconnect_if_needed = MagicMock(side_effect=[None, BancoDadosError("offline", ConnectionError("x"), "conectar")])
+    repo.inserir_pedido = MagicMock()
+    pedidos = [_pedido_com_itens(1) for _ in range(2)]
+
+    falhas = repo.inserir_pedidos_em_grupo(pedidos)
+
+    assert all(isinstance(falha, BancoDadosError) for falha in falhas)
+    repo.inserir_pedido.assert_not_called()
+
+
+def test_inserir_pedido_modo_procedure_envia_pedido_em_uma_chamada():
+    import json
+
+    repo = _repo_com_mocks()
+    repo.modo_gravacao = "procedure"
+    repo.pedido_existe = MagicMock()
+    repo.cursor.fetchone.return_value = ("GRAVADO", 3)
+    pedido = _pedido_com_itens(3)
+    pedido.num_pedido_afv = "DOC-1"
+
+    assert repo.inserir_pedido(pedido) is True
+
+    assert repo._execute_with_logging.call_count == 1
+    query, params, operacao = repo._execute_with_logging.call_args[0][:3]
+    assert operacao == "GRAVAR_PEDIDO_PROCEDURE"
+    payload = json.loads(params[0])
+    assert payload["cabecalho"]["NUMPEDIDOAFV"] == "DOC-1"
+    assert [i["CODIGOPRODUTO"] for i in payload["itens"]] == ["100", "101", "102"]
+    assert "NUMITEM" not in payload["itens"][0]
+    repo.pedido_existe.assert_not_called()
+
+
+def test_iterar_pedidos_por_periodo_le_em_blocos():
+    from contextlib import contextmanager
+
+    repo = _repo_com_mocks()
+    conn = MagicMock()
+    cursor = conn.cursor.return_value
+    cursor.fetchmany.side_effect = [[1, 2], [3], []]
+
+    @contextmanager
+    def conexao():
+        yield conn
+
+    repo.db.conexao = conexao
+
+    linhas = list(repo.iterar_pedidos_por_periodo("2025-05-01", "2025-05-31", tamanho_lote=2))
+
+    assert linhas == [1, 2, 3]
+    cursor.fetchmany.assert_called_with(2)
+    cursor.fetchall.assert_not_called()
+    cursor.close.assert_called_once()
+
+
+def test_pagina_pedidos_por_periodo_usa_keyset():
+    from types import SimpleNamespace
+
+    repo = _repo_com_mocks()
+    ultima = SimpleNamespace(DATAPEDIDO="2025-05-15", DATAGRAVACAOACACIA="2025-05-15 10:00", NUMPEDIDO=7)
+    repo.cursor.fetchall.return_value = [SimpleNamespace(), ultima]
+
+    linhas, proximo = repo.pagina_pedidos_por_periodo("2025-05-01", "2025-05-31", tamanho_pagina=2)
+    assert len(linhas) == 2
+    assert proximo == ("2025-05-15", "2025-05-15 10:00", 7)
+    query, params, _ = repo._execute_with_logging.call_args[0]
+    assert "OFFSET" not in query and "NUMPEDIDO <" not in query
+    assert params == (2, "2025-05-01", "2025-05-31")
+
+    repo.cursor.fetchall.return_value = [ultima]
+    linhas, proximo = repo.pagina_pedidos_por_periodo("2025-05-01", "2025-05-31", tamanho_pagina=2, apos=proximo)
+    assert proximo is None
+    query, params, _ = repo._execute_with_logging.call_args[0]
+    assert "NUMPEDIDO < ?" in query
+    assert params[3:] == ("2025-05-15", "2025-05-15", "2025-05-15 10:00", "2025-05-15", "2025-05-15 10:00", 7)
+
+
+def test_get_estatisticas_sem_resumo_agrega_e_usa_cache():
+    import pyodbc
+
+    repo = _repo_com_mocks()
+    PedidoRepository.invalidar_estatisticas()
+    PedidoRepository._estatisticas_consolidadas_em = None
+    repo._execute_with_logging.side_effect = [pyodbc.ProgrammingError("42S02", "Invalid object name"), None, None]
+    repo.cursor.fetchone.side_effect = [(10,), (2, 30)]
+
+    try:
+        assert repo.get_estatisticas() == {"total_pedidos": 10, "pedidos_hoje": 2, "valor_hoje": 30.0}
+        assert PedidoRepository.usar_resumo_estatisticas is False
+        query = repo._execute_with_logging.call_args[0][0]
+        assert "CAST(" not in query and "DATAGRAVACAOACACIA >= ?" in query
+
+        # Segunda leitura dentro do TTL não vai ao banco
+        assert repo.get_estatisticas()["total_pedidos"] == 10
+        assert repo._execute_with_logging.call_count == 3
+    finally:
+        PedidoRepository.usar_resumo_estatisticas = True
+        PedidoRepository.invalidar_estatisticas()
@@ -29,7 +29,7 @@ def test_busca_por_ean13(mock_conn):
     row_mock.FLAGUSO = 1
     row_mock.CESP_FLAGVERBA = 0
 
-    mock_conn.cursor.return_value.execute.return_value.fetchone.return_value = row_mock
+    mock_conn.cursor.return_value.fetchall.return_value = [row_mock]
 
     repo = ProdutoRepository(mock_conn)
     produto = repo.buscar_produto("7896524726150", "", "")
@@ -37,3 +37,39 @@ def test_busca_por_ean13(mock_conn):
     assert produto is not None
     assert produto.ean13 == "7896524726150"
     assert produto.descricao == "AGUA SANITARIA"
+
+
+def test_resolver_produtos_em_uma_consulta(mock_conn):
+    def linha(codigo, ean13, dun14):
+        row = MagicMock()
+        row.CODIGO, row.DESCRICAO, row.EAN13, row.DUN14 = codigo, codigo, ean13, dun14
+        row.PESOBRUTO = row.PESOLIQUIDO = row.QTDEEMBALAGEM = row.PERCACRESCMAX = 0
+        row.UNIDPRODUTO, row.FLAGUSO, row.CESP_FLAGVERBA = "CX", 1, 0
+        return row
+
+    cursor = mock_conn.cursor.return_value
+    cursor.fetchall.return_value = [
+        linha("1001.01.03X05L", "7896524726150", "27896524726154"),
+        linha("2002.01.01", "7890000000002", ""),
+    ]
+
+    itens = [
+        ("7896524726150", "", ""),
+        ("", "27896524726154", ""),
+        ("", "", "2002.01.99"),
+        ("0000000000000", "", "9999.01"),
+    ]
+    produtos = ProdutoRepository(mock_conn).resolver_produtos(itens)
+
+    assert cursor.execute.call_count == 1
+    query, params = cursor.execute.call_args[0]
+    assert "SELECT *" not in query and "B1_CODBAR IN" in query and "B1_ZZCODBA IN" in query
+    assert params[-6:] == ["2002.01.99", "9999.01", "2002.01.%", "2002.01.%.%", "9999.%", "9999.%.%"]
+    # EAN13 e DUN14 em todas as grafias (com e sem zeros à esquerda), nas duas colunas
+    assert {"7896524726150", "07896524726150", "27896524726154"} <= set(params)
+    gtins = params[:-6]
+    assert len(gtins) % 2 == 0 and gtins[:len(gtins) // 2] == gtins[len(gtins) // 2:]
+    assert produtos[itens[0]].codigo == "1001.01.03X05L"
+    assert produtos[itens[1]].codigo == "1001.01.03X05L"
+    assert produtos[itens[2]].codigo == "2002.01.01"
+    assert produtos[itens[3]] is None
@@ -0,0 +1,58 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from services.cache_lru import AUSENTE, CacheLRU
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+def test_descarta_menos_usado_ao_passar_do_limite():
+    cache = CacheLRU(max_itens=2)
+    cache.guardar("a", 1)
+    cache.guardar("b", 2)
+    assert cache.obter("a") == 1
+    cache.guardar("c", 3)
+
+    assert cache.obter("b") is AUSENTE
+    assert cache.obter("a") == 1 and cache.obter("c") == 3
+    metricas = cache.metricas()
+    assert metricas["evictions"] == 1
+    assert metricas["hits"] == 3 and metricas["misses"] == 1
+
+
+def test_resultado_negativo_expira_antes():
+    relogio = Relogio()
+    cache = CacheLRU(max_itens=10, ttl=300, ttl_negativo=60, relogio=relogio)
+    cache.guardar("existe", "cliente")
+    cache.guardar("nao_existe", None)
+
+    relogio.agora = 59
+    assert cache.obter("nao_existe") is None
+    relogio.agora = 60
+    assert cache.obter("nao_existe") is AUSENTE
+    assert cache.obter("existe") == "cliente"
+    relogio.agora = 300
+    assert cache.obter("existe") is AUSENTE
+
+    metricas = cache.metricas()
+    assert metricas["hits_negativos"] == 1 and metricas["expirados"] == 2
+    assert metricas["itens"] == 0
+
+
+def test_invalidar_e_limpar():
+    cache = CacheLRU(max_itens=10)
+    cache.guardar("a", 1)
+    cache.guardar("b", None)
+
+    assert cache.invalidar("a") is True
+    assert cache.invalidar("a") is False
+    cache.limpar()
+    assert len(cache) == 0
+    assert cache.metricas()["invalidacoes"] == 2
@@ -0,0 +1,108 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import time
+import pytest
+from services.connection_health import HealthCheckPolicy
+from services.connection_pool import ConnectionPool
+
+
+class FakeConexao:
+    def __init__(self):
+        self.fechada = False
+
+    def close(self):
+        self.fechada = True
+
+
+def test_reutiliza_conexao_devolvida():
+    pool = ConnectionPool(FakeConexao, min_size=0, max_size=2)
+
+    conn = pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() is conn
+
+    metricas = pool.metrics()
+    assert metricas["criadas"] == 1
+    assert metricas["checkouts"] == 2
+    assert metricas["em_uso"] == 1
+
+
+def test_checkout_timeout_quando_pool_esgotado():
+    pool = ConnectionPool(FakeConexao, min_size=0, max_size=1, checkout_timeout=0.05)
+    pool.acquire()
+
+    with pytest.raises(TimeoutError):
+        pool.acquire()
+
+    metricas = pool.metrics()
+    assert metricas["esperas"] == 1
+    assert metricas["timeouts"] == 1
+
+
+def test_conexao_expirada_e_destruida_na_devolucao():
+    pool = ConnectionPool(FakeConexao, min_size=0, max_size=1, max_lifetime=0.0001)
+    conn = pool.acquire()
+    time.sleep(0.001)
+    pool.release(conn)
+
+    assert conn.fechada
+    assert pool.metrics()["destruidas"] == 1
+    assert pool.acquire() is not conn
+
+
+class FakeCursor:
+    def __init__(self, conexao):
+        self.conexao = conexao
+
+    def execute(self, query):
+        if self.conexao.morta:
+            raise Exception("08S01", "[08S01] Communication link failure")
+
+    def fetchone(self):
+        return (1,)
+
+    def close(self):
+        pass
+
+
+class FakeConexaoSql(FakeConexao):
+    def __init__(self):
+        super().__init__()
+        self.morta = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+def test_health_evita_probe_em_conexao_recente():
+    health = HealthCheckPolicy(validar_apos_ociosa=60)
+    pool = ConnectionPool(FakeConexaoSql, min_size=0, max_size=1, health=health)
+
+    for _ in range(3):
+        pool.release(pool.acquire())
+
+    metricas = pool.metrics()["saude"]
+    assert metricas["probes_evitados"] == 2
+    assert metricas["probes_executados"] == 0
+
+
+def test_health_substitui_conexao_ociosa_morta():
+    health = HealthCheckPolicy(validar_apos_ociosa=0)
+    pool = ConnectionPool(FakeConexaoSql, min_size=0, max_size=1, health=health)
+
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.morta = True
+
+    nova = pool.acquire()
+    assert nova is not conn
+    assert conn.fechada
+    assert pool.metrics()["saude"]["probes_falhos"] == 1
+
+
+def test_conexao_perdida_pelo_sqlstate():
+    assert HealthCheckPolicy.conexao_perdida(Exception("08S01", "link failure"))
+    assert HealthCheckPolicy.conexao_perdida(Exception("08003", "closed"))
+    assert not HealthCheckPolicy.conexao_perdida(Exception("23000", "duplicate key"))
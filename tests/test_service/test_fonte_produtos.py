@@ -0,0 +1,144 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from unittest.mock import MagicMock
+from models.produto import Produto
+from services.cache_lru import CacheLRU
+from services.catalogo_produtos import CatalogoProdutos
+from services.fonte_produtos import CamadaSB1010, SnapshotProdutos
+from services.validador_produto import ValidadorProduto
+
+
+def _produto(codigo, ean13="", dun14=""):
+    return Produto(codigo=codigo, descricao=f"PRODUTO {codigo}", ean13=ean13, dun14=dun14,
+                   peso_bruto=1.0, peso_liquido=1.0, qtde_embalagem=1, unidade="CX",
+                   perc_acresc_max=0.0, flag_uso=1, flag_verba=0)
+
+
+def test_snapshot_busca_na_mesma_ordem_do_catalogo(tmp_path):
+    snapshot = SnapshotProdutos(str(tmp_path / "produtos.db"))
+    snapshot.guardar(_produto("3003.01.02", "7890000000003", "17890000000003"))
+    snapshot.guardar(_produto("4004"))
+
+    assert snapshot.buscar(" ", "17890000000003", "").codigo == "3003.01.02"
+    assert snapshot.buscar("", "", "3003.01.99").codigo == "3003.01.02"
+    assert snapshot.buscar("", "", "4004") == _produto("4004")
+    assert snapshot.buscar("7899999999999", "", "5005") is None
+    assert len(snapshot) == 2
+    snapshot.fechar()
+
+    # Arquivo reaberto (reinício do processo) mantém os SKUs
+    assert SnapshotProdutos(str(tmp_path / "produtos.db")).buscar("7890000000003", "", "").codigo == "3003.01.02"
+
+
+def test_camadas_com_leitura_e_gravacao_nas_anteriores(tmp_path):
+    repositorio = MagicMock()
+    repositorio.buscar_produto.side_effect = lambda ean13, dun14, codprod: (
+        _produto("3003.01.02", "7890000000003") if ean13 == "7890000000003" else None
+    )
+    snapshot = SnapshotProdutos(str(tmp_path / "produtos.db"))
+    validador = ValidadorProduto(CacheLRU(max_itens=10), camadas=[snapshot, CamadaSB1010(repositorio)])
+    validador.catalogo = CatalogoProdutos([_produto("2002", "7890000000001")])
+
+    assert validador.validar_produto("7890000000001", "", "").codigo == "2002"
+    assert validador.validar_produto("7890000000003", "", "").codigo == "3003.01.02"
+    assert validador.validar_produto("7890000000009", "", "") is None
+    assert repositorio.buscar_produto.call_count == 2
+
+    # Resolvido no SB1010 e gravado em memória e no snapshot: cache limpo, sem voltar ao banco
+    validador.limpar_cache()
+    assert validador.validar_produto("", "", "3003.01.55").codigo == "3003.01.02"
+    assert snapshot.buscar("7890000000003", "", "").codigo == "3003.01.02"
+    assert repositorio.buscar_produto.call_count == 2
+
+    camadas = validador.obter_estatisticas()["camadas"]
+    assert camadas["memoria"]["consultas"] == 4 and camadas["memoria"]["acertos"] == 2
+    assert camadas["memoria"]["gravacoes"] == 1 and camadas["snapshot"]["gravacoes"] == 1
+    assert camadas["snapshot"]["consultas"] == 2 and camadas["snapshot"]["acertos"] == 0
+    assert camadas["sb1010"]["taxa_acerto"] == 0.5
+    assert camadas["sb1010"]["latencia_media_ms"] >= 0
+    assert validador.obter_estatisticas()["produtos_resolvidos"] == 1
+
+
+def test_falha_de_camada_nao_guarda_nao_encontrado_em_cache():
+    repositorio = MagicMock()
+    repositorio.buscar_produto.side_effect = [ConnectionError("Protheus fora"), _produto("3003", "7890000000003")]
+    validador = ValidadorProduto(CacheLRU(max_itens=10), camadas=[CamadaSB1010(repositorio)])
+    validador.catalogo = CatalogoProdutos()
+
+    assert validador.validar_produto("7890000000003", "", "") is None
+    assert validador.validar_produto("7890000000003", "", "").codigo == "3003"
+    assert validador.obter_estatisticas()["camadas"]["sb1010"]["falhas"] == 1
+
+
+def test_resolvidos_expiram_tem_limite_e_saem_na_troca_de_catalogo(monkeypatch):
+    import services.fonte_produtos as fonte_produtos
+    from services.fonte_produtos import CamadaMemoria
+
+    agora = [1000.0]
+    monkeypatch.setattr(fonte_produtos.time, "monotonic", lambda: agora[0])
+    memoria = CamadaMemoria(lambda: CatalogoProdutos(), ttl=60, max_itens=10)
+    for numero in range(10):
+        memoria.guardar(_produto(f"{numero:04d}", f"789000000{numero:03d}0"))
+    assert len(memoria) == 10 and memoria.buscar("", "", "0000").codigo == "0000"
+
+    # Passou do limite: os mais antigos saem em bloco
+    memoria.guardar(_produto("0010"))
+    assert len(memoria) == 9
+    assert memoria.buscar("", "", "0001") is None and memoria.buscar("", "", "0010").codigo == "0010"
+
+    agora[0] += 61
+    memoria.guardar(_produto("0011"))
+    assert memoria.buscar("", "", "0010") is None
+    assert len(memoria) == 1 and memoria.buscar("", "", "0011").codigo == "0011"
+
+    validador = ValidadorProduto(CacheLRU(max_itens=10), arquivo="", arquivo_compilado="")
+    validador.memoria.guardar(_produto("3003"))
+    validador.catalogo = CatalogoProdutos()
+    assert len(validador.memoria) == 0 and validador.validar_produto("", "", "3003") is None
+
+
+def test_snapshot_expira_pelo_atualizado(tmp_path):
+    caminho = str(tmp_path / "produtos.db")
+    snapshot = SnapshotProdutos(caminho, ttl=3600)
+    snapshot.guardar(_produto("3003", "7890000000003"))
+    snapshot.guardar(_produto("4004"))
+    assert snapshot.buscar("7890000000003", "", "").codigo == "3003"
+
+    snapshot._conn.execute("UPDATE PRODUTOS SET ATUALIZADO = '2000-01-01T00:00:00' WHERE CODIGO = '3003'")
+    assert snapshot.buscar("7890000000003", "", "") is None
+    assert snapshot.buscar("", "", "3003") is None
+    snapshot.fechar()
+
+    # Reaberto, o arquivo já não traz o expirado
+    snapshot = SnapshotProdutos(caminho, ttl=3600)
+    assert len(snapshot) == 1 and snapshot.buscar("", "", "4004").codigo == "4004"
+    assert snapshot._conn.execute("SELECT COUNT(*) FROM GTINS WHERE CODIGO = '3003'").fetchone()[0] == 0
+
+
+def test_resolver_itens_com_uma_consulta_por_camada(tmp_path):
+    repositorio = MagicMock()
+    repositorio.resolver_produtos.side_effect = lambda itens: {
+        chave: _produto("3003.01.02", "7890000000003") if chave[0] == "7890000000003" else None for chave in itens
+    }
+    snapshot = SnapshotProdutos(str(tmp_path / "produtos.db"))
+    snapshot.guardar(_produto("4004"))
+    validador = ValidadorProduto(CacheLRU(max_itens=10), arquivo="", arquivo_compilado="",
+                                 camadas=[snapshot, CamadaSB1010(repositorio)])
+    validador.catalogo = CatalogoProdutos([_produto("2002", "7890000000001")])
+
+    itens = [("7890000000001", "", ""), (" 7890000000003", "", ""), ("", "", "4004"), ("7890000000009", "", "")]
+    produtos = validador.validar_produtos(itens)
+    chaves = [tuple(codigo.strip() for codigo in item) for item in itens]
+    assert [produtos[chave] and produtos[chave].codigo for chave in chaves] == ["2002", "3003.01.02", "4004", None]
+    repositorio.resolver_produtos.assert_called_once_with([("7890000000003", "", ""), ("7890000000009", "", "")])
+    assert repositorio.buscar_produto.call_count == 0
+
+    # Resolvido em lote e gravado nas camadas anteriores
+    assert snapshot.buscar("7890000000003", "", "").codigo == "3003.01.02"
+    validador.limpar_cache()
+    assert validador.validar_produto("7890000000003", "", "").codigo == "3003.01.02"
+    camadas = validador.obter_estatisticas()["camadas"]
+    assert camadas["sb1010"]["consultas"] == 2 and camadas["sb1010"]["acertos"] == 1
+    assert camadas["snapshot"]["gravacoes"] == 1
@@ -19,7 +19,10 @@ def test_processamento_pedido_completo():
 
     # Fake processador de item
     class FakeProcessadorPedidoItem:
-        def processar_item(self, item_json):
+        def resolver_produtos(self, itens_json):
+            return {}
+
+        def processar_item(self, item_json, produtos=None):
             return PedidoItemSobel(
                 cod_produto="1001",
                 descricao_produto="Água Sanitária Suprema",
@@ -65,3 +68,44 @@ def test_processamento_pedido_completo():
     assert pedido.qtde_itens == 2
     assert pedido.valor_total == 10 * 25 + 5 * 30  # 400.0
     assert pedido.itens[0].descricao_produto == "Água Sanitária Suprema"
+
+
+def test_processar_usa_clientes_resolvidos_em_lote():
+    import pytest
+    from utils.error_handler import ClienteNaoEncontradoError
+
+    class FakeValidadorCliente:
+        def __init__(self):
+            self.consultas = []
+
+        def validar_cliente(self, cnpj):
+            self.consultas.append(cnpj)
+            return Cliente(codigo="999", nome="AVULSO", cnpj=cnpj)
+
+        def validar_clientes(self, cnpjs):
+            return {"12345678000199": Cliente(codigo="276134", nome="LOTE"), "11111111000111": None}
+
+    class FakeProcessadorPedidoItem:
+        def resolver_produtos(self, itens_json):
+            return {}
+
+        def processar_item(self, item_json, produtos=None):
+            return PedidoItemSobel(cod_produto="1001", descricao_produto="Produto", quantidade=1,
+                                   valor_unitario=1.0, valor_total=1.0, unidade="CX")
+
+    validador = FakeValidadorCliente()
+    processador = ProcessadorPedido(validador, FakeProcessadorPedidoItem())
+    clientes = processador.resolver_clientes(["12.345.678/0001-99", "11111111000111"])
+
+    def pedido(cnpj):
+        return {"num_pedido": "1", "data_pedido": "2025-07-24", "hora_inicio": "18:01",
+                "cnpj": cnpj, "itens": [{"qtd": 1, "valor": 1.0}]}
+
+    assert processador.processar(pedido("12.345.678/0001-99"), clientes).codigo_cliente == "276134"
+    with pytest.raises(ClienteNaoEncontradoError):
+        processador.processar(pedido("11111111000111"), clientes)
+    assert validador.consultas == []
+
+    # CNPJ fora do lote volta para a validação individual
+    assert processador.processar(pedido("22222222000122"), clientes).codigo_cliente == "999"
+    assert validador.consultas == ["22222222000122"]
@@ -0,0 +1,113 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+import pytest
+from services.snapshot_clientes import SnapshotClientes
+from services.sqlite_backend import ConexaoSQLite, preparar_banco_local
+from services.validador_cliente import ValidadorCliente
+
+
+@pytest.fixture
+def db(tmp_path):
+    caminho = str(tmp_path / "protheus.db")
+    preparar_banco_local(caminho, clientes_sinteticos=3)
+    conexao = ConexaoSQLite(caminho)
+    banco = MagicMock()
+    banco.disponivel = True
+
+    @contextmanager
+    def conexao_do_pool():
+        if not banco.disponivel:
+            raise RuntimeError("08S01 Communication link failure")
+        yield conexao
+
+    banco.conexao = conexao_do_pool
+    banco.sqlite = conexao
+    yield banco
+    conexao.close()
+
+
+def _snapshot(db, tmp_path):
+    return SnapshotClientes(db, str(tmp_path / "snap" / "sa1010.db"), ValidadorCliente.COLUNAS_CLIENTE, lote=2)
+
+
+def test_exportacao_completa_e_delta(db, tmp_path):
+    snapshot = _snapshot(db, tmp_path)
+    assert snapshot.sincronizar() >= 3
+
+    valores = snapshot.buscar("90000000000001")
+    assert dict(zip(snapshot.colunas, valores))["CGCCPF"] == "90000000000001"
+    assert snapshot.buscar("11111111000111") is None
+
+    db.sqlite.cursor().execute(
+        "INSERT INTO SA1010 (A1_COD, A1_NOME, A1_CGC) VALUES ('777777', 'NOVO', '11111111000111')"
+    )
+    assert snapshot.sincronizar() == 1
+    assert snapshot.buscar("11111111000111") is not None
+
+    # Exclusão lógica aparece na exportação completa
+    db.sqlite.cursor().execute("UPDATE SA1010 SET D_E_L_E_T_ = '*' WHERE A1_CGC = '90000000000001'")
+    snapshot.sincronizar(completa=True)
+    assert snapshot.buscar("90000000000001") is None
+
+    metricas = snapshot.metricas()
+    assert metricas["sincronizacoes"] == 3 and metricas["completas"] == 2
+    assert metricas["atraso_segundos"] is not None
+
+
+def test_protheus_fora_continua_atendendo_e_recarrega_do_arquivo(db, tmp_path):
+    snapshot = _snapshot(db, tmp_path)
+    snapshot.sincronizar()
+
+    db.disponivel = False
+    assert snapshot.sincronizar() is None
+    assert snapshot.buscar("90000000000001") is not None
+    assert snapshot.metricas()["falhas_consecutivas"] == 1
+
+    # Reinício sem banco: o arquivo local basta
+    reiniciado = _snapshot(db, tmp_path)
+    assert reiniciado.carregar() == len(snapshot)
+    assert reiniciado.buscar("90000000000001") == snapshot.buscar("90000000000001")
+
+
+def test_validador_usa_snapshot_sem_consultar_banco(db, tmp_path):
+    snapshot = _snapshot(db, tmp_path)
+    snapshot.sincronizar()
+
+    validador = ValidadorCliente.__new__(ValidadorCliente)
+    validador.db = MagicMock()
+    validador.cache = None
+    validador.snapshot = snapshot
+
+    assert validador.validar_cliente("90.000.000/0000-01").cnpj == "90000000000001"
+    assert validador.validar_clientes(["90000000000002"])["90000000000002"].codigo
+    validador.db.pool.acquire.assert_not_called()
+
+
+def test_delta_traz_bloqueio_e_exclusao(db, tmp_path):
+    snapshot = _snapshot(db, tmp_path)
+    snapshot.sincronizar()
+    validador = ValidadorCliente.__new__(ValidadorCliente)
+    validador.db = MagicMock()
+    validador.cache = None
+    validador.snapshot = snapshot
+    assert validador.validar_cliente("90000000000001").ativo
+
+    # Bloqueio no Protheus chega no delta seguinte, sem esperar a exportação completa
+    db.sqlite.cursor().execute("UPDATE SA1010 SET A1_MSBLQL = '1' WHERE A1_CGC = '90000000000001'")
+    assert snapshot.sincronizar() == 1
+    assert not validador.validar_cliente("90000000000001").ativo
+
+    db.sqlite.cursor().execute("UPDATE SA1010 SET D_E_L_E_T_ = '*' WHERE A1_CGC = '90000000000002'")
+    assert snapshot.sincronizar() == 1
+    assert snapshot.buscar("90000000000002") is None
+    assert snapshot.metricas()["completas"] == 1
+    validador.db.pool.acquire.assert_not_called()
+
+
+def test_marcador_recno_recusado(db, tmp_path):
+    with pytest.raises(ValueError, match="S_T_A_M_P_"):
+        SnapshotClientes(db, str(tmp_path / "sa1010.db"), ValidadorCliente.COLUNAS_CLIENTE, "R_E_C_N_O_")
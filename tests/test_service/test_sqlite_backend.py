@@ -0,0 +1,359 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from datetime import datetime
+import pytest
+import pyodbc
+from services.sqlite_backend import ConexaoSQLite, preparar_banco_local, traduzir_tsql
+
+
+@pytest.fixture
+def conn(tmp_path):
+    caminho = str(tmp_path / "local.db")
+    preparar_banco_local(caminho, clientes_sinteticos=3, sequencia_numitem="dbo.SEQ_TESTE")
+    conexao = ConexaoSQLite(caminho)
+    yield conexao
+    conexao.close()
+
+
+def test_traduz_construcoes_tsql():
+    sql, params = traduzir_tsql("SELECT TOP (?) A1_COD FROM SA1010 WHERE A1_COD > ?", (10, "000001"))
+    assert sql.endswith("LIMIT ?")
+    assert "TOP" not in sql
+    assert params == ["000001", 10]
+
+    sql, _ = traduzir_tsql(
+        "SELECT ISNULL(MAX(NUMITEM), 0) + 1 FROM T_PEDIDOITEM_SOBEL WITH (TABLOCKX, HOLDLOCK)"
+    )
+    assert sql == "SELECT IFNULL(MAX(NUMITEM), 0) + 1 FROM T_PEDIDOITEM_SOBEL "
+
+    sql, _ = traduzir_tsql("SELECT 1 WHERE CAST(DATAGRAVACAOACACIA AS DATE) = CAST(GETDATE() AS DATE)")
+    assert "DATE(DATAGRAVACAOACACIA) = DATE(DATETIME('now', 'localtime'))" in sql
+
+    assert traduzir_tsql("SAVE TRANSACTION pedido_grupo_1")[0] == "SAVEPOINT pedido_grupo_1"
+    assert traduzir_tsql("ROLLBACK TRANSACTION pedido_grupo_1")[0] == "ROLLBACK TO pedido_grupo_1"
+
+
+def test_database_so_importa_o_backend_local_quando_usado():
+    import subprocess
+    raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    codigo = "import sys, services.database; print('services.sqlite_backend' in sys.modules)"
+    saida = subprocess.run([sys.executable, "-c", codigo], cwd=raiz, capture_output=True, text=True, check=True)
+    assert saida.stdout.strip() == "False"
+
+
+def test_banco_local_semeado_e_linhas_com_atributos(conn):
+    cursor = conn.cursor()
+    linha = cursor.execute("SELECT B1_COD AS CODIGO FROM SB1010 WHERE B1_COD = ?", "1001.01.03X05L").fetchone()
+    assert linha.CODIGO == "1001.01.03X05L"
+    assert linha[0] == "1001.01.03X05L"
+
+    cursor.execute("SELECT A1_COD FROM SA1010 WHERE A1_CGC = ? AND D_E_L_E_T_ = ''", ("04737552000480",))
+    assert cursor.fetchone() is not None
+
+    colunas = [r[0] for r in cursor.execute(
+        "SELECT COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS "
+        "WHERE TABLE_NAME = 'T_LOG_PROCESSAMENTO' ORDER BY ORDINAL_POSITION"
+    ).fetchall()]
+    assert "MENSAGEM" in colunas and "NUM_PEDIDO" in colunas
+
+
+def test_transacao_savepoint_e_erros_como_pyodbc(conn):
+    cursor = conn.cursor()
+    conn.autocommit = False
+    data = datetime(2025, 5, 15)
+    cursor.execute(
+        "INSERT INTO T_PEDIDO_SOBEL (NUMPEDIDO, NUMPEDIDOAFV, DATAPEDIDO, HORAINICIAL, CODIGOCLIENTE) "
+        "VALUES (?, ?, ?, ?, ?)", (1, "AFV1", data, "10:00", "000001")
+    )
+    cursor.execute("SAVE TRANSACTION p2")
+    with pytest.raises(pyodbc.IntegrityError):
+        cursor.execute(
+            "INSERT INTO T_PEDIDO_SOBEL (NUMPEDIDO, NUMPEDIDOAFV, DATAPEDIDO, HORAINICIAL, CODIGOCLIENTE) "
+            "VALUES (?, ?, ?, ?, ?)", (2, "AFV1", data, "10:00", "000001")
+        )
+    cursor.execute("ROLLBACK TRANSACTION p2")
+    conn.commit()
+    conn.autocommit = True
+
+    linha = cursor.execute("SELECT DATAPEDIDO FROM T_PEDIDO_SOBEL").fetchall()
+    assert len(linha) == 1 and linha[0][0] == data
+
+    with pytest.raises(pyodbc.ProgrammingError):
+        cursor.execute("EXEC dbo.SP_GRAVAR_PEDIDO_SOBEL @Pedido = ?", "{}")
+
+
+def test_sequencia_reserva_faixas(conn):
+    lote = """
+        SET NOCOUNT ON;
+        DECLARE @primeiro SQL_VARIANT;
+        EXEC sys.sp_sequence_get_range @sequence_name = ?, @range_size = ?, @range_first_value = @primeiro OUTPUT;
+        SELECT CAST(@primeiro AS BIGINT);
+    """
+    cursor = conn.cursor()
+    assert cursor.execute(lote, "dbo.SEQ_TESTE", 10).fetchone()[0] == 1
+    assert cursor.execute(lote, "dbo.SEQ_TESTE", 10).fetchone()[0] == 11
+
+
+def test_resumo_estatisticas_consolida_dias_encerrados_e_conta_hoje(conn):
+    from datetime import timedelta
+    from unittest.mock import MagicMock
+    from repositories.pedido_repository import PedidoRepository
+
+    cursor = conn.cursor()
+    agora = datetime.now()
+    ontem = agora - timedelta(days=1)
+    insert = (
+        "INSERT INTO T_PEDIDO_SOBEL (NUMPEDIDO, NUMPEDIDOAFV, DATAPEDIDO, HORAINICIAL, CODIGOCLIENTE, "
+        "VALORBRUTO, DATAGRAVACAOACACIA) VALUES (?, ?, ?, '10:00', '000001', ?, ?)"
+    )
+    cursor.execute(insert, (1, "AFV1", agora, 10.5, agora))
+    cursor.execute(insert, (2, "AFV2", ontem, 4.5, ontem))
+    cursor.execute(insert, (3, "AFV3", agora, 7.0, None))
+
+    repo = PedidoRepository.__new__(PedidoRepository)
+    repo.conn, repo.cursor, repo.db = conn, cursor, MagicMock()
+    repo._conexao_perdida = False
+    PedidoRepository._estatisticas_consolidadas_em = None
+    assert repo.get_estatisticas(usar_cache=False) == {"total_pedidos": 3, "pedidos_hoje": 1, "valor_hoje": 10.5}
+
+    # Só dias encerrados e pedidos sem data vão para o resumo; hoje é lido ao vivo
+    dias = cursor.execute("SELECT DATA, QTDEPEDIDOS FROM T_ESTATISTICA_PEDIDO_DIA ORDER BY DATA").fetchall()
+    assert [(str(d)[:10], q) for d, q in dias] == [("1900-01-01", 1), (ontem.strftime("%Y-%m-%d"), 1)]
+
+    # Gravar pedidos não toca o resumo
+    cursor.execute(insert, (4, "AFV4", agora, 2.0, agora))
+    assert cursor.execute("SELECT SUM(QTDEPEDIDOS) FROM T_ESTATISTICA_PEDIDO_DIA").fetchone()[0] == 2
+    assert repo.get_estatisticas(usar_cache=False) == {"total_pedidos": 4, "pedidos_hoje": 2, "valor_hoje": 12.5}
+
+    # Hoje e pedidos sem data são lidos pelo índice, sem varrer T_PEDIDO_SOBEL
+    for filtro in ("DATAGRAVACAOACACIA >= ?", "DATAGRAVACAOACACIA IS NULL"):
+        plano = cursor.execute(
+            f"EXPLAIN QUERY PLAN SELECT COUNT(*), SUM(VALORBRUTO) FROM T_PEDIDO_SOBEL WHERE {filtro}",
+            (agora,) if "?" in filtro else (),
+        ).fetchall()
+        assert any("COVERING INDEX IX_PEDIDO_DATAGRAVACAO" in str(linha[-1]) for linha in plano), plano
+
+    # Consolidar de novo no mesmo dia não duplica dias
+    assert repo.consolidar_estatisticas() == 0
+    cursor.execute("UPDATE T_ESTATISTICA_PEDIDO_DIA SET QTDEPEDIDOS = 99")
+    assert repo.reconstruir_estatisticas() == 2
+    assert repo.get_estatisticas() == {"total_pedidos": 4, "pedidos_hoje": 2, "valor_hoje": 12.5}
+
+
+def test_paginacao_por_periodo_ignora_pedidos_sem_data_de_gravacao(conn):
+    from datetime import timedelta
+    from unittest.mock import MagicMock
+    from repositories.pedido_repository import PedidoRepository
+
+    cursor = conn.cursor()
+    insert = (
+        "INSERT INTO T_PEDIDO_SOBEL (NUMPEDIDO, NUMPEDIDOAFV, DATAPEDIDO, HORAINICIAL, CODIGOCLIENTE, "
+        "VALORBRUTO, DATAGRAVACAOACACIA) VALUES (?, ?, ?, '10:00', '000001', 1, ?)"
+    )
+    # Em cada dia o pedido sem DATAGRAVACAOACACIA ordena depois dos gravados
+    for numero, dia in enumerate([datetime(2025, 5, 16)] * 3 + [datetime(2025, 5, 15)] * 4, start=1):
+        gravacao = None if numero in (3, 7) else dia + timedelta(minutes=numero)
+        cursor.execute(insert, (numero, f"AFV{numero}", dia, gravacao))
+
+    repo = PedidoRepository.__new__(PedidoRepository)
+    repo.conn, repo.cursor, repo.db = conn, cursor, MagicMock()
+    repo._conexao_perdida = False
+
+    paginas, apos = [], None
+    while True:
+        linhas, apos = repo.pagina_pedidos_por_periodo("2025-05-01", "2025-05-31", tamanho_pagina=3, apos=apos)
+        paginas.append([linha.NUMPEDIDO for linha in linhas])
+        if apos is None:
+            break
+        assert apos[1] is not None
+
+    assert paginas == [[2, 1, 6], [5, 4]]
+
+
+def test_validar_clientes_resolve_lote_em_blocos(conn):
+    from unittest.mock import MagicMock
+    from services.cache_lru import CacheLRU
+    from services.validador_cliente import ValidadorCliente
+
+    validador = ValidadorCliente.__new__(ValidadorCliente)
+    validador.db = MagicMock()
+    validador.db.pool.acquire.return_value = conn
+    validador.cache = CacheLRU(max_itens=10)
+    validador.snapshot = None
+    validador.LOTE_CNPJS = 2
+
+    clientes = validador.validar_clientes(
+        ["04.737.552/0004-80", "04737552000480", "90000000000001", "00000000000000", "123"]
+    )
+
+    assert set(clientes) == {"04737552000480", "90000000000001", "00000000000000"}
+    assert clientes["04737552000480"].cnpj == "04737552000480"
+    assert clientes["90000000000001"].codigo
+    assert clientes["00000000000000"] is None
+    assert validador.db.pool.acquire.call_count == 2
+
+    # CNPJs repetidos (inclusive o não encontrado) vêm do cache, sem ir ao banco
+    assert validador.validar_cliente("04737552000480").cnpj == "04737552000480"
+    assert validador.validar_clientes(["00000000000000"]) == {"00000000000000": None}
+    assert validador.db.pool.acquire.call_count == 2
+
+    assert validador.invalidar_cliente("04.737.552/0004-80") is True
+    assert validador.validar_cliente("04737552000480") is not None
+    assert validador.db.pool.acquire.call_count == 3
+
+
+def test_clientes_ativos_paginados_e_em_fluxo(conn):
+    from unittest.mock import MagicMock
+    from models.cliente import ClienteResumo
+    from services.validador_cliente import ValidadorCliente
+    from utils.error_handler import BancoDadosError
+
+    cursor = conn.cursor()
+    cursor.execute("UPDATE SA1010 SET A1_MSBLQL = '1' WHERE A1_COD = '000002'")
+    # Lojas de uma rede: mesmo A1_COD e A1_NOME, uma delas na virada de página
+    cursor.execute("UPDATE SA1010 SET A1_NOME = 'CLIENTE LOCAL 1' WHERE A1_COD = '000003'")
+    for loja in ("03", "02"):
+        cursor.execute(
+            "INSERT INTO SA1010 (A1_COD, A1_LOJA, A1_NOME, A1_CGC, A1_EST) VALUES ('000001', ?, 'CLIENTE LOCAL 1', ?, 'SP')",
+            (loja, f"1111111100{loja}99"),
+        )
+    validador = ValidadorCliente.__new__(ValidadorCliente)
+    validador.db = MagicMock()
+    validador.db.pool.acquire.return_value = conn
+
+    paginas, apos = [], None
+    while True:
+        clientes, apos = validador.pagina_clientes_ativos(2, apos, como_tupla=True)
+        paginas += clientes
+        if apos is None:
+            break
+
+    todos = list(validador.iterar_clientes_ativos(tamanho_lote=2, como_tupla=True))
+    assert paginas == todos
+    assert all(isinstance(c, ClienteResumo) for c in todos)
+    assert [c.razao_social for c in todos] == sorted(c.razao_social for c in todos)
+    assert "000002" not in {c.codigo for c in todos}
+    assert [(c.codigo, c.loja) for c in todos[:4]] == [("000001", "01"), ("000001", "02"), ("000001", "03"), ("000003", "01")]
+    assert len(todos) == cursor.execute("SELECT COUNT(*) FROM SA1010 WHERE A1_MSBLQL <> '1'").fetchone()[0]
+
+    completos = validador.listar_clientes_ativos(limite=3)
+    assert [c.codigo for c in completos] == [c.codigo for c in todos[:3]]
+    assert completos[0].codigo_entrega == completos[0].codigo
+
+    validador.db.pool.acquire.side_effect = RuntimeError("pool esgotado")
+    with pytest.raises(BancoDadosError):
+        list(validador.iterar_clientes_ativos())
+    assert validador.listar_clientes_ativos() == []
+
+
+def test_resolver_produtos_do_pedido_em_uma_consulta(conn):
+    from repositories.produto_repository import ProdutoRepository
+
+    cursor = conn.cursor()
+    produtos = cursor.execute("SELECT B1_COD, B1_CODBAR, B1_ZZCODBA FROM SB1010 ORDER BY B1_COD").fetchall()
+    itens = [(ean, "", "") for _, ean, _ in produtos[:40]]
+    itens += [("", dun, "") for _, _, dun in produtos[40:80] if dun]
+    itens += [("", "", codigo) for codigo, _, _ in produtos[80:100]]
+    itens.append(("0000000000000", "", "SEM_BASE"))
+
+    repo = ProdutoRepository(conn)
+    consultas = []
+    abrir_cursor = conn.cursor
+    conn.cursor = lambda: _CursorContado(abrir_cursor(), consultas)
+    resolvidos = repo.resolver_produtos(itens)
+
+    assert len(consultas) == 1
+    assert resolvidos[("0000000000000", "", "SEM_BASE")] is None
+    for item in itens[:-1]:
+        assert resolvidos[item] == repo.buscar_produto(*item)
+        assert resolvidos[item] is not None
+
+
+
+
+def test_codigo_exato_vale_sobre_o_codigo_base(conn):
+    from repositories.produto_repository import ProdutoRepository
+
+    repo = ProdutoRepository(conn)
+    assert repo.buscar_produto("", "", "1001.01.06X02L").codigo == "1001.01.06X02L"
+    assert repo.buscar_produto("", "", " 1001.01.03X05L ").codigo == "1001.01.03X05L"
+    produtos = repo.resolver_produtos([("", "", "1001.01.06X02L"), ("", "", "1001.01.99")])
+    assert produtos[("", "", "1001.01.06X02L")].codigo == "1001.01.06X02L"
+    assert produtos[("", "", "1001.01.99")].codigo == "1001.01.03X05L"
+
+
+def test_camadas_usam_a_mesma_regra_de_codigo_base(conn, tmp_path):
+    from repositories.produto_repository import ProdutoRepository
+    from services.catalogo_produtos import CatalogoProdutos, codigo_base
+    from services.fonte_produtos import SnapshotProdutos, buscar_no_catalogo
+
+    repo = ProdutoRepository(conn)
+    resolvido = repo.buscar_produto("", "", "1001.01.06X02L")
+    memoria = CatalogoProdutos([resolvido])
+    snapshot = SnapshotProdutos(str(tmp_path / "produtos.db"))
+    snapshot.guardar(resolvido)
+
+    for codprod in ("1001.01", "1001", "1001.01.99", "1001.01.06X02L"):
+        no_banco = repo.buscar_produto("", "", codprod)
+        em_memoria = buscar_no_catalogo(memoria, "", "", codprod)
+        no_snapshot = snapshot.buscar("", "", codprod)
+        # O SKU gravado de volta é alcançado nas camadas locais sempre que o SB1010 alcançaria um irmão dele
+        assert (em_memoria is None) == (no_snapshot is None) == (no_banco is None), codprod
+        for produto in (no_banco, em_memoria, no_snapshot):
+            if produto is not None and produto.codigo != codprod:
+                assert codigo_base(produto.codigo) == codigo_base(codprod)
+    assert buscar_no_catalogo(memoria, "", "", "1001.01") is None
+
+def test_itens_do_pedido_resolvidos_com_uma_consulta_por_pedido(conn, tmp_path):
+    from unittest.mock import MagicMock
+    from models.cliente import Cliente
+    from repositories.produto_repository import ProdutoRepository
+    from services.catalogo_produtos import CatalogoProdutos
+    from services.fonte_produtos import CamadaSB1010
+    from services.processador_pedido import ProcessadorPedido
+    from services.processador_pedido_item import ProcessadorPedidoItem
+    from services.validador_produto import ValidadorProduto
+
+    cursor = conn.cursor()
+    produtos = cursor.execute("SELECT B1_COD, B1_CODBAR FROM SB1010 ORDER BY B1_COD").fetchall()
+    itens = [{"ean13": ean, "qtd": 1, "valor": 1.0} for _, ean in produtos[:12]]
+    itens += [{"codprod": codigo, "qtd": 1, "valor": 1.0} for codigo, _ in produtos[12:]]
+    itens.append({"ean13": "0000000000000", "qtd": 1, "valor": 1.0})
+
+    consultas = []
+    abrir_cursor = conn.cursor
+    conn.cursor = lambda: _CursorContado(abrir_cursor(), consultas)
+    validador = ValidadorProduto(
+        arquivo=str(tmp_path / "produtos.json"), arquivo_compilado="",
+        camadas=[CamadaSB1010(ProdutoRepository(conn))],
+    )
+    validador.catalogo = CatalogoProdutos()
+    processador = ProcessadorPedido(MagicMock(), ProcessadorPedidoItem(validador))
+    clientes = {"12345678000199": Cliente(codigo="000001", nome="CLIENTE")}
+
+    def pedido(numero):
+        return {"num_pedido": numero, "data_pedido": "2025-07-24", "hora_inicio": "18:01",
+                "cnpj": "12345678000199", "itens": itens}
+
+    assert processador.processar(pedido("1"), clientes).qtde_itens == len(produtos)
+    assert len(consultas) == 1
+
+    # Mesmos SKUs em outro pedido: memória e cache de buscas, sem voltar ao SB1010
+    assert processador.processar(pedido("2"), clientes).qtde_itens == len(produtos)
+    assert len(consultas) == 1
+    assert validador.obter_estatisticas()["camadas"]["sb1010"]["consultas"] == len(itens)
+
+
+class _CursorContado:
+    def __init__(self, cursor, consultas):
+        self._cursor = cursor
+        self._consultas = consultas
+
+    def execute(self, sql, *params):
+        self._consultas.append(sql)
+        return self._cursor.execute(sql, *params)
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
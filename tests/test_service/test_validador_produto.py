@@ -0,0 +1,253 @@
+import sys
+import os
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from models.produto import Produto
+from services.cache_lru import CacheLRU
+from services.catalogo_produtos import CatalogoProdutos, chave_gtin
+from services.validador_produto import ValidadorProduto
+
+
+def _produto(codigo, ean13="", dun14=""):
+    return Produto(codigo=codigo, descricao=f"PRODUTO {codigo}", ean13=ean13, dun14=dun14,
+                   peso_bruto=1.0, peso_liquido=1.0, qtde_embalagem=1, unidade="CX",
+                   perc_acresc_max=0.0, flag_uso=1, flag_verba=0)
+
+
+def test_catalogo_indexa_por_dimensao():
+    catalogo = CatalogoProdutos([
+        _produto("1001.01.03X05L", "7896524726150", "27896524726154"),
+        _produto("2002", "7890000000001", ""),
+    ])
+
+    # EAN13, DUN14 e o item base do DUN14 (igual ao EAN13 do mesmo produto)
+    assert catalogo.por_gtin == {
+        7896524726150: catalogo.produtos[0], 27896524726154: catalogo.produtos[0],
+        7890000000001: catalogo.produtos[1],
+    }
+    assert catalogo.buscar_gtin(" 27896524726154 ").codigo == "1001.01.03X05L"
+    assert catalogo.buscar_codigo_base("1001.01").codigo == "1001.01.03X05L"
+    assert catalogo.buscar_gtin("ABC") is None and chave_gtin("") is None
+    assert [p.codigo for p in catalogo] == ["1001.01.03X05L", "2002"]
+    assert catalogo.estatisticas() == {
+        "produtos_unicos": 2, "total_indices": 6, "indices_gtin": 3,
+        "indices_codigo": 2, "indices_codigo_base": 1,
+    }
+
+
+def test_validador_busca_no_catalogo_do_arquivo():
+    validador = ValidadorProduto()
+
+    assert validador.validar_produto("7896524726150", "", "").codigo == "1001.01.03X05L"
+    assert validador.validar_produto("", "27896524726154", "").codigo == "1001.01.03X05L"
+    assert validador.validar_produto("", "", "1001.01.XYZ").codigo.startswith("1001.01.")
+    assert validador.validar_produto("0000000000000", "", "NAO.EXISTE") is None
+
+    estatisticas = validador.obter_estatisticas()
+    assert estatisticas["produtos_unicos"] == len(validador.listar_todos_produtos())
+    assert validador.buscar_por_descricao("sanitaria")
+
+
+def test_cache_de_buscas_limitado_com_ttl_negativo():
+    agora = [0.0]
+    validador = ValidadorProduto(CacheLRU(max_itens=2, ttl=3600, ttl_negativo=10, relogio=lambda: agora[0]))
+    validador.catalogo = CatalogoProdutos([_produto("2002", "7890000000001")])
+
+    assert validador.validar_produto("", "", "3003") is None
+    assert validador.validar_produto("", "", "3003") is None
+
+    # Cadastro novo aparece depois do TTL negativo
+    validador.catalogo.adicionar(_produto("3003"))
+    agora[0] = 11
+    assert validador.validar_produto("", "", "3003").codigo == "3003"
+
+    validador.validar_produto("7890000000001", "", "")
+    validador.validar_produto("", "", "2002")
+
+    estatisticas = validador.obter_estatisticas()
+    assert estatisticas["cache_hits_negativos"] == 1
+    assert estatisticas["cache_expirados"] == 1
+    assert estatisticas["cache_evictions"] == 1
+    assert estatisticas["cache_size"] == 2 and estatisticas["cache_max"] == 2
+
+
+def test_troca_de_catalogo_invalida_cache():
+    validador = ValidadorProduto(CacheLRU(max_itens=10))
+    validador.catalogo = CatalogoProdutos([_produto("2002")])
+    assert validador.validar_produto("", "", "2002").descricao == "PRODUTO 2002"
+
+    novo = _produto("2002")
+    novo.descricao = "PRODUTO NOVO"
+    validador.catalogo = CatalogoProdutos([novo])
+    assert validador.obter_estatisticas()["cache_size"] == 0
+    assert validador.validar_produto("", "", "2002").descricao == "PRODUTO NOVO"
+
+
+def test_recarga_a_quente_troca_catalogo_e_relata_diferencas(tmp_path):
+    import json
+    import time
+
+    arquivo = tmp_path / "produtos.json"
+
+    def gravar(produtos):
+        arquivo.write_text(json.dumps({"produtos": produtos}), encoding="utf-8")
+
+    gravar([
+        {"codigo": "1001", "descricao": "A", "ean13": "7890000000001"},
+        {"codigo": "1002", "descricao": "B"},
+    ])
+    validador = ValidadorProduto(CacheLRU(max_itens=10), arquivo=str(arquivo))
+    assert validador.verificar_alteracao() is None
+    assert validador.validar_produto("7890000000001", "", "").descricao == "A"
+
+    gravar([
+        {"codigo": "1001", "descricao": "A NOVA", "ean13": "7890000000001"},
+        {"codigo": "1003", "descricao": "C"},
+    ])
+    relatorio = validador.verificar_alteracao()
+    assert relatorio["adicionados"] == ["1003"]
+    assert relatorio["removidos"] == ["1002"]
+    assert relatorio["alterados"] == ["1001"]
+    assert relatorio["produtos"] == 2 and relatorio["duracao"] >= 0
+    assert validador.validar_produto("7890000000001", "", "").descricao == "A NOVA"
+
+    # Arquivo inválido (ex.: gravação pela metade) mantém o catálogo atual
+    arquivo.write_text('{"produtos": [', encoding="utf-8")
+    assert validador.verificar_alteracao() is None
+    assert validador.validar_produto("", "", "1003").descricao == "C"
+
+    gravar([{"codigo": "1004", "descricao": "D"}])
+    validador.iniciar_monitoramento(0.01)
+    try:
+        limite = time.monotonic() + 5
+        while validador.validar_produto("", "", "1004") is None and time.monotonic() < limite:
+            time.sleep(0.01)
+    finally:
+        validador.parar_monitoramento()
+    assert validador.ultima_recarga["adicionados"] == ["1004"]
+
+
+def test_indice_de_busca_ordena_por_relevancia_e_limita():
+    from services.indice_busca_produtos import IndiceBuscaProdutos, normalizar
+
+    assert normalizar("Água Sanitária-5L") == "AGUA SANITARIA 5L"
+
+    produtos = [_produto(codigo) for codigo in ("1001.01.03X05L", "2001.01", "1001", "3001.1001")]
+    produtos[0].descricao = "AGUA SANITARIA SUPREMA 03X05L"
+    produtos[1].descricao = "DESINFETANTE SANITARIO"
+    produtos[2].descricao = "Água sanitária"
+    produtos[3].descricao = "ALVEJANTE SEM CLORO"
+    indice = IndiceBuscaProdutos(produtos)
+
+    # Palavras exatas antes de prefixos e trechos; acentos ignorados
+    assert [p.codigo for p in indice.buscar_descricao("sanitária")] == ["1001.01.03X05L", "1001"]
+    assert [p.codigo for p in indice.buscar_descricao("sanit")] == ["1001.01.03X05L", "2001.01", "1001"]
+    assert [p.codigo for p in indice.buscar_descricao("agua supr")] == ["1001.01.03X05L"]
+    assert [p.codigo for p in indice.buscar_descricao("NITAR", limite=1)] == ["1001.01.03X05L"]
+    assert indice.buscar_descricao("inexistente") == []
+
+    # Código igual, depois prefixo, depois trecho
+    assert [p.codigo for p in indice.buscar_codigo("1001")] == ["1001", "1001.01.03X05L", "3001.1001"]
+    assert [p.codigo for p in indice.buscar_codigo("03x05")] == ["1001.01.03X05L"]
+    assert [p.codigo for p in indice.buscar_codigo("01", limite=2)] == ["1001.01.03X05L", "2001.01"]
+
+
+def test_busca_do_validador_equivale_a_varredura():
+    validador = ValidadorProduto(CacheLRU(max_itens=10))
+    for termo in ("SANITARIA", "05L", "X1", "SUPREMA 03"):
+        esperado = {p.codigo for p in validador.listar_todos_produtos() if termo in p.descricao.upper()}
+        assert esperado <= {p.codigo for p in validador.buscar_por_descricao(termo)}
+    for trecho in ("1001", ".01.", "X05"):
+        esperado = {p.codigo for p in validador.listar_todos_produtos() if trecho in p.codigo.upper()}
+        assert esperado == {p.codigo for p in validador.buscar_por_codigo_parcial(trecho)}
+
+
+def test_catalogo_compilado_equivale_ao_json(tmp_path):
+    from services.catalogo_binario import CatalogoBinario, compilar_catalogo
+
+    origem = ValidadorProduto(CacheLRU(max_itens=10), arquivo_compilado="").catalogo
+    destino = str(tmp_path / "produtos.bin")
+    assert compilar_catalogo(origem.produtos, destino) == len(origem.produtos)
+
+    compilado = CatalogoBinario(destino)
+    assert compilado.estatisticas() == origem.estatisticas()
+    assert list(compilado) == list(origem)
+    for produto in origem:
+        assert compilado.buscar_codigo(produto.codigo) == origem.buscar_codigo(produto.codigo)
+        assert compilado.buscar_gtin(produto.ean13) == origem.buscar_gtin(produto.ean13)
+        assert compilado.buscar_gtin(produto.dun14) == origem.buscar_gtin(produto.dun14)
+        base = produto.codigo.rsplit(".", 1)[0]
+        assert compilado.buscar_codigo_base(base) == origem.buscar_codigo_base(base)
+    assert compilado.buscar_gtin("7890000000000") is None
+    assert compilado.buscar_codigo("X" * 40) is None
+    assert [p.codigo for p in compilado.indice_busca.buscar_descricao("sanitaria", limite=2)] == \
+        [p.codigo for p in origem.indice_busca.buscar_descricao("sanitaria", limite=2)]
+
+
+def test_validador_prefere_compilado_em_dia(tmp_path):
+    import json
+    from services.catalogo_binario import CatalogoBinario, compilar_catalogo
+
+    arquivo = tmp_path / "produtos.json"
+    arquivo.write_text(json.dumps({"produtos": [{"codigo": "1001", "descricao": "JSON"}]}), encoding="utf-8")
+    compilar_catalogo([_produto("1001")], str(tmp_path / "produtos.bin"))
+
+    validador = ValidadorProduto(CacheLRU(max_itens=10), arquivo=str(arquivo))
+    assert isinstance(validador.catalogo, CatalogoBinario)
+    assert validador.validar_produto("", "", "1001").descricao == "PRODUTO 1001"
+
+    # JSON mais novo que o compilado: volta para o JSON
+    os.utime(arquivo, ns=(os.stat(arquivo).st_atime_ns, os.stat(tmp_path / "produtos.bin").st_mtime_ns + 10**9))
+    relatorio = validador.verificar_alteracao()
+    assert relatorio["alterados"] == ["1001"]
+    assert validador.validar_produto("", "", "1001").descricao == "JSON"
+
+    # Compilado de outra versão do formato é ignorado
+    (tmp_path / "produtos.bin").write_bytes(b"NGCATPRD" + b"\0" * 40)
+    assert not isinstance(ValidadorProduto(arquivo=str(arquivo)).catalogo, CatalogoBinario)
+
+
+def test_recompilar_com_catalogo_aberto_troca_de_arquivo(tmp_path):
+    import json
+    from services.catalogo_binario import CatalogoBinario, compilar_catalogo
+
+    arquivo = tmp_path / "produtos.json"
+    arquivo.write_text(json.dumps({"produtos": []}), encoding="utf-8")
+    destino = str(tmp_path / "produtos.bin")
+    compilar_catalogo([_produto("1001")], destino)
+    validador = ValidadorProduto(CacheLRU(max_itens=10), arquivo=str(arquivo))
+    anterior = validador.catalogo
+    assert anterior.arquivo == str(tmp_path / "produtos.1.bin")
+
+    # O arquivo mapeado não é sobrescrito: a nova compilação vai para outra versão
+    compilar_catalogo([_produto("1001"), _produto("2002")], destino)
+    assert CatalogoBinario(destino).arquivo == str(tmp_path / "produtos.2.bin")
+    assert anterior.buscar_codigo("2002") is None
+
+    relatorio = validador.recarregar_produtos()
+    assert relatorio["adicionados"] == ["2002"]
+    assert validador.validar_produto("", "", "2002").codigo == "2002"
+    with pytest.raises(ValueError):
+        anterior.buscar_codigo("1001")  # fechado após a troca
+
+    # Mantém a versão atual e a anterior; as mais antigas são removidas
+    compilar_catalogo([_produto("3003")], destino)
+    assert sorted(p.name for p in tmp_path.glob("produtos.*.bin")) == ["produtos.2.bin", "produtos.3.bin"]
+
+
+def test_gtin_em_qualquer_grafia_e_indicador_de_embalagem():
+    validador = ValidadorProduto(CacheLRU(max_itens=10))
+    validador.catalogo = CatalogoProdutos([
+        _produto("1001.01.03X05L", "7896524726150", "17896524726157"),
+        _produto("2002", "012345678905"),
+        _produto("3003", "", "17896524703332"),
+    ])
+
+    assert validador.validar_produto("07896524726150", "", "").codigo == "1001.01.03X05L"
+    assert validador.validar_produto("", "0012345678905", "").codigo == "2002"
+    # DUN14 com outro indicador de embalagem alcança o produto pelo item base
+    assert validador.validar_produto("", "27896524726154", "").codigo == "1001.01.03X05L"
+    assert validador.validar_produto("7896524703335", "", "").codigo == "3003"
+    # Dígito verificador inválido não deriva o item base
+    assert validador.validar_produto("", "27896524726155", "") is None
@@ -0,0 +1,30 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from utils.gtin import digito_verificador, formas_gtin, grafias_gtin, gtin_item_base, gtin_valido, normalizar_gtin
+
+
+def test_digito_verificador_e_validacao():
+    assert digito_verificador("789652472615") == 0
+    assert gtin_valido("7896524726150") and gtin_valido(" 17896524703332 ")
+    assert gtin_valido("012345678905") and gtin_valido("96385074")
+    assert not gtin_valido("7896524726151")
+    assert not gtin_valido("789652472615") and not gtin_valido("ABC") and not gtin_valido("")
+
+
+def test_normaliza_para_gtin14_inteiro():
+    assert normalizar_gtin("7896524726150") == normalizar_gtin("07896524726150") == 7896524726150
+    assert normalizar_gtin("012345678905") == normalizar_gtin("0012345678905") == 12345678905
+    assert normalizar_gtin("7896524726151") is None
+
+
+def test_formas_do_dun14_incluem_item_base():
+    assert gtin_item_base(17896524703332) == 7896524703335
+    assert gtin_item_base(7896524703335) == 7896524703335
+    assert formas_gtin("27896524703339") == [27896524703339, 7896524703335]
+    assert formas_gtin("7896524726150") == [7896524726150]
+    # Dígito inválido: só o próprio valor, sem derivar o item base
+    assert formas_gtin("17896524703331") == [17896524703331]
+    assert formas_gtin("1001.01") == []
+    assert grafias_gtin([12345678905]) == ["00012345678905", "0012345678905", "012345678905"]
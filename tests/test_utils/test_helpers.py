@@ -24,3 +24,12 @@ def test_interpretar_codigo_produto_codigo_interno():
     assert ean == ""
     assert dun == ""
     assert cod == "1001.01.03X05L"
+
+
+def test_interpretar_codigo_produto_gtin_normalizado():
+    # EAN13 completado com zero até 14 dígitos não é DUN14
+    assert interpretar_codigo_produto("07896524726150") == ("7896524726150", "", "")
+    # UPC-12 vira EAN13 e segue como código interno
+    assert interpretar_codigo_produto("012345678905") == ("0012345678905", "", "012345678905")
+    # Dígito verificador inválido: classificado só pelo tamanho
+    assert interpretar_codigo_produto("07896524726151") == ("", "07896524726151", "")
@@ -0,0 +1,53 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from decimal import Decimal
+from types import SimpleNamespace
+from models.cliente import Cliente
+from services.validador_cliente import ValidadorCliente
+from utils.mapeador_linhas import MapeadorLinhas, inteiro, texto
+
+
+def test_conversores():
+    assert texto(None) == "" and texto("  A ") == "A" and texto(12) == "12"
+    assert inteiro(None) == 0 and inteiro(" ") == 0 and inteiro("x") == 0
+    assert inteiro(" 7 ") == 7 and inteiro(Decimal("3")) == 3
+
+
+def test_mapeador_cliente_equivale_a_from_dict():
+    colunas = ["CODIGO", "RAZAOSOCIAL", "CGCCPF", "ESTADO", "CODIGOREGIAO", "CESP_FLAGENTREGAAGENDADA", "COLUNA_EXTRA"]
+    linha = ("276134 ", "LOJA 265  ", "04737552000480", None, " 12", "", "ignorada")
+
+    cliente = ValidadorCliente.MAPEADOR.compilar([(c, str) for c in colunas])(linha)
+    esperado = Cliente.from_dict(dict(zip(colunas, linha)))
+
+    assert cliente == esperado
+    assert vars(cliente) == vars(esperado)
+    assert cliente.codigo_regiao == 12 and cliente.estado == ""
+    assert cliente.qtde_dias_min_entrega == "0"
+    assert cliente.nome == "LOJA 265"
+    assert "codigo_tabela_preco" not in vars(cliente)
+
+
+def test_plano_compilado_uma_vez_por_formato():
+    mapeador = MapeadorLinhas(SimpleNamespace, [("A", "a", None), ("B", "b", texto)], {"c": 0})
+    primeiro = mapeador.compilar(["A", "B"])
+    assert mapeador.compilar((("A",), ("B",))) is primeiro
+
+    invertido = mapeador.compilar(["B", "A"])
+    assert invertido is not primeiro
+    assert vars(invertido((" x ", 1))) == {"a": 1, "b": "x", "c": 0}
+
+    # Objetos independentes: os padrões não são compartilhados
+    obj = primeiro((1, "y"))
+    obj.c = 5
+    assert primeiro((2, "z")).c == 0
+
+
+def test_listagem_usa_padroes_de_cliente_ativo():
+    colunas = ["CODIGO", "RAZAOSOCIAL", "CGCCPF", "NOMEFANTASIA", "ESTADO"]
+    clientes = ValidadorCliente.MAPEADOR_LISTAGEM.mapear_todas(colunas, [("000001", "ACME", "1", "", "SP")])
+    assert clientes[0].codigo_entrega == "000001"
+    assert clientes[0].ativo and clientes[0].codigo_status == "0"
+    assert clientes[0].flag_envia_copia == "N"
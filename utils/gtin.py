@@ -0,0 +1,76 @@
+# utils/gtin.py
+import sys
+import os
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from typing import Iterable, List, Optional
+
+# Normalização de GTIN (EAN-8, UPC-12, EAN-13 e DUN-14/GTIN-14).
+#
+# Todo GTIN válido vira o inteiro do seu GTIN-14: zeros à esquerda não
+# mudam o valor, então 7896524726150 e 07896524726150, ou o UPC-12
+# 012345678905 e o EAN-13 0012345678905, caem na mesma chave. Um DUN-14
+# com indicador de embalagem 1-8 também alcança o item base (indicador 0,
+# dígito verificador recalculado), que é o EAN da unidade.
+
+TAMANHOS_GTIN = (8, 12, 13, 14)
+
+
+def digito_verificador(corpo: str) -> int:
+    """Dígito verificador GS1 (módulo 10, pesos 3 e 1 a partir da direita)"""
+    soma = sum(int(digito) * (3 if posicao % 2 == 0 else 1) for posicao, digito in enumerate(reversed(corpo)))
+    return (10 - soma % 10) % 10
+
+
+def gtin_valido(codigo: str) -> bool:
+    """Tamanho de GTIN e dígito verificador correto"""
+    codigo = codigo.strip() if codigo else ""
+    return (
+        len(codigo) in TAMANHOS_GTIN and codigo.isdigit()
+        and digito_verificador(codigo[:-1]) == int(codigo[-1])
+    )
+
+
+def normalizar_gtin(codigo: str) -> Optional[int]:
+    """GTIN-14 como inteiro; ``None`` se o código não for um GTIN válido"""
+    codigo = codigo.strip() if codigo else ""
+    return int(codigo) if gtin_valido(codigo) else None
+
+
+def gtin_item_base(gtin: int) -> int:
+    """
+    Item base de um GTIN-14 com indicador de embalagem 1-8 (indicador 0 e
+    novo dígito verificador); os demais GTINs são devolvidos como estão.
+    """
+    indicador = gtin // 10 ** 13
+    if not 1 <= indicador <= 8:
+        return gtin
+    corpo = f"{gtin % 10 ** 13 // 10:012d}"
+    return int(corpo + str(digito_verificador(corpo)))
+
+
+def formas_gtin(codigo: str) -> List[int]:
+    """
+    Chaves em que o código pode estar indexado, da mais exata para a
+    derivada: o GTIN-14 e, para DUN-14, o item base. Código numérico com
+    dígito verificador inválido fica só com o próprio valor (cadastros
+    antigos); código não numérico não tem formas.
+    """
+    codigo = codigo.strip() if codigo else ""
+    if not codigo.isdigit():
+        return []
+    gtin = int(codigo)
+    if not gtin_valido(codigo):
+        return [gtin]
+    base = gtin_item_base(gtin)
+    return [gtin] if base == gtin else [gtin, base]
+
+
+def grafias_gtin(gtins: Iterable[int]) -> List[str]:
+    """Textos com zeros à esquerda (8, 12, 13 e 14 dígitos) com que os GTINs podem estar gravados"""
+    grafias = set()
+    for gtin in gtins:
+        minimo = len(str(gtin))
+        grafias.update(f"{gtin:0{tamanho}d}" for tamanho in TAMANHOS_GTIN if tamanho >= minimo)
+    return sorted(grafias)
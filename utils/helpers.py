@@ -2,10 +2,17 @@ import re
 from datetime import datetime
 from decimal import Decimal
 from typing import Tuple, Optional
+from utils.gtin import gtin_valido
 
 def interpretar_codigo_produto(codigo: str) -> Tuple[str, str, str]:
     """Interpreta o valor informado em codigoProduto e devolve
-    ean13, dun14 ou codigo interno conforme o formato."""
+    ean13, dun14 ou codigo interno conforme o formato.
+
+    GTINs com dígito verificador válido são classificados pelo conteúdo:
+    GTIN-14 com indicador 0 (EAN13 completado com zero) vira EAN13, com
+    indicador 1-9 é DUN14; UPC-12 e EAN-8 viram EAN13 completado com
+    zeros e seguem também como código interno, que pode ter o mesmo
+    formato. Sem dígito verificador válido vale só o tamanho."""
     if not codigo:
         return "", "", ""
     
@@ -14,7 +21,14 @@ def interpretar_codigo_produto(codigo: str) -> Tuple[str, str, str]:
     dun14 = ""
     codprod = ""
 
-    if codigo.isdigit():
+    if gtin_valido(codigo):
+        if len(codigo) == 14 and codigo[0] != "0":
+            dun14 = codigo
+        else:
+            ean13 = f"{int(codigo):013d}"
+            if len(codigo) < 13:
+                codprod = codigo
+    elif codigo.isdigit():
         if len(codigo) == 13:
             ean13 = codigo
         elif len(codigo) == 14:
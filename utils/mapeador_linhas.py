@@ -0,0 +1,99 @@
+# utils/mapeador_linhas.py
+import sys
+import os
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import operator
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+
+def texto(valor) -> str:
+    """``None`` vira ``""``; demais valores viram ``str`` sem espaços nas pontas"""
+    if valor is None:
+        return ""
+    if valor.__class__ is str:
+        return valor.strip()
+    return str(valor).strip()
+
+
+def inteiro(valor) -> int:
+    """Inteiro ou 0 para ``None``, texto vazio ou valor inválido"""
+    if valor is None:
+        return 0
+    if valor.__class__ is int:
+        return valor
+    try:
+        return int(valor.strip() if isinstance(valor, str) else valor)
+    except (ValueError, TypeError):
+        return 0
+
+
+# (coluna do SELECT, atributo do objeto, conversor ou None para usar o valor como veio)
+Campo = Tuple[str, str, Optional[Callable[[Any], Any]]]
+
+
+class MapeadorLinhas:
+    """
+    Converte linhas do pyodbc direto em objetos do modelo.
+
+    Para cada formato de consulta (nomes das colunas do
+    ``cursor.description``) calcula uma única vez a lista de
+    ``(posição, atributo, conversor)`` dos campos presentes; a função de
+    mapeamento percorre essa lista e preenche o ``__dict__`` do objeto
+    sem passar pelo ``__init__``: ``padroes`` traz os atributos das
+    colunas ausentes. Uma coluna pode alimentar mais de um atributo.
+    """
+
+    def __init__(self, classe: type, campos: Iterable[Campo], padroes: Optional[Dict[str, Any]] = None):
+        self.classe = classe
+        self.campos: Tuple[Campo, ...] = tuple(campos)
+        self.padroes = dict(padroes or {})
+        self._planos: Dict[Tuple[str, ...], Callable[[Any], Any]] = {}
+        self._por_nome: Optional[Callable[[Any], Any]] = None
+        self._lock = threading.Lock()
+
+    def compilar(self, description: Sequence) -> Callable[[Any], Any]:
+        """Função ``linha -> objeto`` para o ``cursor.description`` (ou lista de nomes) informado"""
+        colunas = tuple(c if isinstance(c, str) else c[0] for c in description)
+        mapear = self._planos.get(colunas)
+        if mapear is None:
+            posicoes = {coluna: i for i, coluna in enumerate(colunas)}
+            plano = [
+                (posicoes[coluna], atributo, conversor)
+                for coluna, atributo, conversor in self.campos
+                if coluna in posicoes
+            ]
+            mapear = self._gerar(plano, operator.getitem)
+            with self._lock:
+                mapear = self._planos.setdefault(colunas, mapear)
+        return mapear
+
+    def mapear_por_nome(self, row) -> Any:
+        """Mapeia uma linha lendo as colunas por atributo (``row.CODIGO``), sem ``description``"""
+        if self._por_nome is None:
+            self._por_nome = self._gerar(list(self.campos), getattr)
+        return self._por_nome(row)
+
+    def mapear_todas(self, description: Sequence, linhas: Iterable) -> list:
+        mapear = self.compilar(description)
+        return [mapear(linha) for linha in linhas]
+
+    def _gerar(
+        self, plano: Sequence[Tuple[Any, str, Optional[Callable[[Any], Any]]]], ler: Callable[[Any, Any], Any]
+    ) -> Callable[[Any], Any]:
+        """Função de mapeamento sobre o ``plano`` de ``(coluna, atributo, conversor)``; ``ler(row, coluna)`` lê o valor"""
+        classe, novo, padroes = self.classe, self.classe.__new__, self.padroes
+        plano = tuple(plano)
+
+        def mapear(row):
+            obj = novo(classe)
+            valores = obj.__dict__
+            valores.update(padroes)
+            for coluna, atributo, conversor in plano:
+                valor = ler(row, coluna)
+                valores[atributo] = valor if conversor is None else conversor(valor)
+            return obj
+
+        return mapear